@@ -0,0 +1,64 @@
+import re
+from typing import List, Optional, Tuple
+import numpy as np
+
+from app.config import settings
+
+
+WORD_RE = re.compile(r"\w+")
+SENTENCE_END_RE = re.compile(r"(?<=[.!?…])\s+")
+MIN_SENTENCE_WORDS = 4
+
+
+class ExtractiveSummarizer:
+    """Local summarizer picking the most central sentences of an article by TF-IDF, with no API calls."""
+    
+    def __init__(self, sentences: Optional[int] = None, max_sentences: Optional[int] = None):
+        self.sentences = sentences or settings.summary_extractive_sentences
+        self.max_sentences = max_sentences or settings.summary_extractive_max_sentences
+    
+    def summarize(self, title: str, content: str) -> str:
+        """Top-ranked sentences of the article in their original order."""
+        sentences, words = self.split_sentences(content)
+        if len(sentences) <= self.sentences:
+            return " ".join(sentences) or title
+        
+        scores = self.rank(words)
+        # Stable sort keeps the earlier sentence on ties, which favours the article lead.
+        best = np.sort(np.argsort(-scores, kind="stable")[:self.sentences])
+        return " ".join(sentences[index] for index in best)
+    
+    def split_sentences(self, content: str) -> Tuple[List[str], List[List[str]]]:
+        """Sentences of the content with their lowercased words, skipping headings and fragments shorter than MIN_SENTENCE_WORDS words."""
+        sentences = []
+        words = []
+        for paragraph in content.split("\n"):
+            for sentence in SENTENCE_END_RE.split(paragraph.strip()):
+                sentence_words = WORD_RE.findall(sentence.lower())
+                if len(sentence_words) >= MIN_SENTENCE_WORDS:
+                    sentences.append(sentence)
+                    words.append(sentence_words)
+                    if len(sentences) >= self.max_sentences:
+                        return sentences, words
+        return sentences, words
+    
+    @staticmethod
+    def rank(words: List[List[str]]) -> np.ndarray:
+        """Score each sentence by its summed cosine similarity to all sentences over TF-IDF vectors."""
+        vocabulary = {}
+        columns = [vocabulary.setdefault(word, len(vocabulary)) for sentence_words in words for word in sentence_words]
+        rows = np.repeat(np.arange(len(words), dtype=np.int64), [len(sentence_words) for sentence_words in words])
+        
+        size = len(vocabulary)
+        pairs, counts = np.unique(rows * size + np.array(columns, dtype=np.int64), return_counts=True)
+        row = pairs // size
+        column = pairs % size
+        
+        document_frequency = np.bincount(column, minlength=size)
+        idf = np.log((1 + len(words)) / (1 + document_frequency)) + 1
+        weights = (1 + np.log(counts)) * idf[column]
+        norms = np.sqrt(np.bincount(row, weights=weights * weights, minlength=len(words)))
+        # Summed similarities equal the similarity to the sum of normalized vectors, so TextRank's degree
+        # centrality comes from the (sentence, word) pairs in linear time instead of a sentences x sentences matrix.
+        centroid = np.bincount(column, weights=weights / norms[row], minlength=size)
+        return np.bincount(row, weights=weights * centroid[column], minlength=len(words)) / norms
\ No newline at end of file
@@ -0,0 +1,55 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """Token buckets enforcing a requests-per-minute and a tokens-per-minute budget."""
+    
+    def __init__(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        self.requests_per_minute = requests_per_minute or 0
+        self.tokens_per_minute = tokens_per_minute or 0
+        self._requests = float(self.requests_per_minute)
+        self._tokens = float(self.tokens_per_minute)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self, tokens: int = 0) -> float:
+        """Wait until one request of the given token cost fits both budgets; returns seconds waited."""
+        if tokens > self.tokens_per_minute > 0:
+            tokens = self.tokens_per_minute
+        
+        waited = 0.0
+        # Callers queue on the lock, so budget is handed out in arrival order.
+        async with self._lock:
+            while True:
+                self._refill()
+                delay = max(
+                    self._shortfall(self._requests, 1, self.requests_per_minute),
+                    self._shortfall(self._tokens, tokens, self.tokens_per_minute)
+                )
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+                waited += delay
+            
+            if self.requests_per_minute:
+                self._requests -= 1
+            if self.tokens_per_minute:
+                self._tokens -= tokens
+        return waited
+    
+    def _refill(self) -> None:
+        """Add the budget earned since the last call, up to one minute's worth."""
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+    
+    @staticmethod
+    def _shortfall(available: float, needed: float, per_minute: int) -> float:
+        """Seconds until a bucket holds the needed amount; 0 when it already does or is unlimited."""
+        if not per_minute or available >= needed:
+            return 0.0
+        return (needed - available) * 60 / per_minute
\ No newline at end of file
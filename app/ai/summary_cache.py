@@ -0,0 +1,121 @@
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Optional
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.repositories.summary_cache_repository import SummaryCacheRepository
+
+
+@dataclass
+class SummaryCacheStats:
+    """Hit and miss counters of the summary cache with the latency and tokens they account for."""
+    
+    hits: int = 0
+    memory_hits: int = 0
+    misses: int = 0
+    tokens_saved: int = 0
+    hit_seconds: float = 0.0
+    miss_seconds: float = 0.0
+    
+    def record_hit(self, seconds: float, tokens: int) -> None:
+        """Count a summary served from the cache instead of the API."""
+        self.hits += 1
+        self.hit_seconds += seconds
+        self.tokens_saved += tokens
+    
+    def record_miss(self, seconds: float) -> None:
+        """Count a summary that had to be generated by the API."""
+        self.misses += 1
+        self.miss_seconds += seconds
+    
+    @property
+    def hit_ratio(self) -> float:
+        """Share of lookups answered from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+    
+    @property
+    def seconds_saved(self) -> float:
+        """API time the hits would have taken at the average miss latency, minus the lookups themselves."""
+        if not self.misses:
+            return 0.0
+        return max(0.0, self.hits * self.miss_seconds / self.misses - self.hit_seconds)
+    
+    def as_dict(self) -> dict:
+        """Serialize stats for the API."""
+        return {
+            **asdict(self),
+            "hit_ratio": round(self.hit_ratio, 4),
+            "seconds_saved": round(self.seconds_saved, 3)
+        }
+
+
+class SummaryCache:
+    """Summaries keyed by content hash, persisted in the database behind an optional in-process LRU tier."""
+    
+    def __init__(
+        self,
+        session_maker: Optional[async_sessionmaker[AsyncSession]] = None,
+        memory_size: Optional[int] = None
+    ):
+        self.session_maker = session_maker
+        self.memory_size = settings.summary_cache_memory_size if memory_size is None else memory_size
+        self.stats = SummaryCacheStats()
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+    
+    @staticmethod
+    def key(model: str, system_prompt: str, prompt: str) -> str:
+        """SHA-256 of the model and the full request text, which embeds the template and truncated content."""
+        payload = json.dumps([model, system_prompt, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    async def get(self, key: str) -> Optional[str]:
+        """Look up a summary in memory, then in the database; database errors count as a miss."""
+        summary = self._memory.get(key)
+        if summary is not None:
+            self._memory.move_to_end(key)
+            self.stats.memory_hits += 1
+            return summary
+        
+        if self.session_maker is None:
+            return None
+        try:
+            async with self.session_maker() as session:
+                summary = await SummaryCacheRepository(session).get(key)
+        except Exception as e:
+            logger.warning(f"Summary cache lookup failed: {str(e)}")
+            return None
+        if summary is not None:
+            self._remember(key, summary)
+        return summary
+    
+    async def put(self, key: str, model: str, summary: str) -> None:
+        """Store a generated summary in both tiers; a database error only loses the persistent copy."""
+        self._remember(key, summary)
+        if self.session_maker is None:
+            return
+        try:
+            async with self.session_maker() as session:
+                await SummaryCacheRepository(session).put(key, model, summary)
+        except Exception as e:
+            logger.warning(f"Summary cache write failed: {str(e)}")
+    
+    def _remember(self, key: str, summary: str) -> None:
+        """Put a summary into the LRU tier, evicting the least recently used ones."""
+        if self.memory_size <= 0:
+            return
+        self._memory[key] = summary
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+
+def create_summary_cache(session_maker: Optional[async_sessionmaker[AsyncSession]] = None) -> Optional[SummaryCache]:
+    """Create the summary cache, or None when SUMMARY_CACHE is off."""
+    if not settings.summary_cache:
+        return None
+    return SummaryCache(session_maker)
\ No newline at end of file
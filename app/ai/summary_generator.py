@@ -1,45 +1,537 @@
-from openai import AsyncOpenAI
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from loguru import logger
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError, InternalServerError, RateLimitError
+
+from app.ai.extractive_summarizer import ExtractiveSummarizer
+from app.ai.rate_limiter import RateLimiter
+from app.ai.summary_cache import SummaryCache
+from app.ai.tokenizer import get_tokenizer
 from app.config import settings
 
 
+RETRYABLE_ERRORS = (RateLimitError, InternalServerError, APIConnectionError)
+MAX_TOKENS = 300
+MAX_RETRY_DELAY = 60.0
+MAX_REDUCE_ROUNDS = 3
+MODEL = "gpt-4o-mini"
+SUMMARY_ENGINE_LLM = "llm"
+SUMMARY_ENGINE_EXTRACTIVE = "extractive"
+SUMMARY_ENGINE_AUTO = "auto"
+SUMMARY_ENGINES = (SUMMARY_ENGINE_LLM, SUMMARY_ENGINE_EXTRACTIVE, SUMMARY_ENGINE_AUTO)
+SYSTEM_PROMPT = "You are a helpful assistant that creates concise summaries of Wikipedia articles. Provide clear, informative summaries in Russian language."
+REDUCE_PROMPT_TEMPLATE = """
+        Создай краткое содержание для статьи Википедии по кратким пересказам её фрагментов:
+        
+        Название: {title}
+        
+        Пересказы фрагментов:
+        {notes}
+        
+        Требования к резюме:
+        - Объем: 3-5 предложений
+        - Язык: русский
+        - Стиль: информативный и понятный
+        - Включи основные факты и ключевую информацию
+        """
+BATCH_SYSTEM_PROMPT = (
+    "You are a helpful assistant that creates concise summaries of Wikipedia articles. "
+    "The user sends a JSON object whose \"articles\" list holds objects with id, title and content. "
+    "Answer with a JSON object {\"summaries\": [{\"id\": ..., \"summary\": ...}]} with one entry per article, "
+    "each a clear, informative summary of 3-5 sentences in Russian language."
+)
+
+
+@dataclass
+class TokenUsage:
+    """Tokens reported by the API across all requests made for one summary."""
+    
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    requests: int = 0
+    extractive: bool = False
+    
+    @property
+    def total_tokens(self) -> int:
+        """Prompt and completion tokens together."""
+        return self.prompt_tokens + self.completion_tokens
+    
+    def record(self, response) -> None:
+        """Add the usage block of one completions response."""
+        self.requests += 1
+        if response.usage is not None:
+            self.prompt_tokens += response.usage.prompt_tokens or 0
+            self.completion_tokens += response.usage.completion_tokens or 0
+
+
 class SummaryGenerator:
     """AI-powered summary generator using OpenAI API."""
     
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: Optional[int] = None,
+        retry_base_delay: Optional[float] = None,
+        cache: Optional[SummaryCache] = None,
+        batch_max_articles: Optional[int] = None,
+        batch_max_tokens: Optional[int] = None,
+        chunk_tokens: Optional[int] = None,
+        chunk_concurrency: Optional[int] = None,
+        article_token_budget: Optional[int] = None,
+        engine: Optional[str] = None,
+        latency_budget: Optional[float] = None,
+        extractive: Optional[ExtractiveSummarizer] = None
+    ):
+        self.api_key = api_key or settings.openai_api_key
+        self.base_url = base_url
+        self.rate_limiter = rate_limiter or RateLimiter(settings.openai_requests_per_minute, settings.openai_tokens_per_minute)
+        self.max_retries = settings.summary_max_retries if max_retries is None else max_retries
+        self.retry_base_delay = settings.summary_retry_base_delay if retry_base_delay is None else retry_base_delay
+        self.retries = 0
+        self.cache = cache
+        self.batch_max_articles = batch_max_articles or settings.summary_batch_max_articles
+        self.batch_max_tokens = batch_max_tokens or settings.summary_batch_max_tokens
+        self.chunk_tokens = chunk_tokens or settings.summary_chunk_tokens
+        self.chunk_concurrency = chunk_concurrency or settings.summary_chunk_concurrency
+        self.article_token_budget = article_token_budget or settings.summary_article_token_budget
+        self.engine = engine or settings.summary_engine
+        self.latency_budget = settings.summary_latency_budget if latency_budget is None else latency_budget
+        self.extractive = extractive or ExtractiveSummarizer()
+        self.tokenizer = get_tokenizer(MODEL)
+        self._client: Optional[AsyncOpenAI] = None
+    
+    @property
+    def client(self) -> AsyncOpenAI:
+        """OpenAI client, created on first use so a generator without a key never builds one."""
+        if self._client is None:
+            # Retries are done here, so they go through the rate limiter and use jittered backoff.
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url or settings.openai_base_url or None,
+                max_retries=0
+            )
+        return self._client
+    
+    async def close(self) -> None:
+        """Close the HTTP connections of the OpenAI client."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
     
-    async def generate_summary(self, title: str, content: str) -> str:
-        """Generate summary for article content using AI."""
-        if not settings.openai_api_key:
+    async def generate_summary(
+        self,
+        title: str,
+        content: str,
+        engine: Optional[str] = None,
+        usage: Optional[TokenUsage] = None
+    ) -> str:
+        """Generate summary for article content using AI, filling usage when given."""
+        engine = engine or self.engine
+        if not self.api_key and engine not in (SUMMARY_ENGINE_EXTRACTIVE, SUMMARY_ENGINE_AUTO):
             return "Summary generation unavailable: API key not configured"
         
         try:
-            prompt = self._create_prompt(title, content)
-            
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant that creates concise summaries of Wikipedia articles. Provide clear, informative summaries in Russian language."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=300,
-                temperature=0.3
+            summary, article_usage = await self.summarize_article(title, content, engine)
+        except Exception as e:
+            return f"Error generating summary: {str(e)}"
+        if usage is not None:
+            usage.prompt_tokens += article_usage.prompt_tokens
+            usage.completion_tokens += article_usage.completion_tokens
+            usage.requests += article_usage.requests
+            usage.extractive = article_usage.extractive
+        return summary
+    
+    async def summarize(self, title: str, content: str) -> str:
+        """Generate a summary, retrying rate limits and server errors; raises once retries are exhausted."""
+        summary, _ = await self.summarize_article(title, content)
+        return summary
+    
+    async def summarize_article(self, title: str, content: str, engine: Optional[str] = None) -> Tuple[str, TokenUsage]:
+        """Summarize an article with the given engine, by default the configured one; returns its token usage."""
+        engine = engine or self.engine
+        if engine not in SUMMARY_ENGINES:
+            raise ValueError(f"Unknown summary engine: {engine}")
+        
+        usage = TokenUsage()
+        if engine == SUMMARY_ENGINE_EXTRACTIVE or (engine == SUMMARY_ENGINE_AUTO and not self.api_key):
+            return self.extract(title, content, usage), usage
+        if engine == SUMMARY_ENGINE_LLM:
+            return await self._summarize_llm(title, content, usage), usage
+        
+        try:
+            summary = await asyncio.wait_for(self._summarize_llm(title, content, usage), self.latency_budget or None)
+        except Exception as e:
+            reason = f"exceeded {self.latency_budget}s" if isinstance(e, asyncio.TimeoutError) else f"failed: {str(e)}"
+            logger.warning(f"Summary request for {title} {reason}, using the extractive summary")
+            return self.extract(title, content, usage), usage
+        return summary, usage
+    
+    def extract(self, title: str, content: str, usage: Optional[TokenUsage] = None) -> str:
+        """Summarize locally from the article's own sentences, marking usage as extractive."""
+        if usage is not None:
+            usage.extractive = True
+        return self.extractive.summarize(title, content)
+    
+    async def _summarize_llm(self, title: str, content: str, usage: TokenUsage) -> str:
+        """Summarize in one request, or map-reduce over chunks when the article exceeds chunk_tokens."""
+        if not self.api_key:
+            raise ValueError("OpenAI API key is not configured")
+        
+        identity, chunks = self._plan(title, content)
+        summary = await self._from_cache(identity)
+        if summary is not None:
+            return summary
+        
+        started = time.perf_counter()
+        if chunks is None:
+            summary = await self._complete(title, identity, usage)
+        else:
+            notes = await self._map(title, chunks, usage)
+            summary = await self._complete(title, self._create_reduce_prompt(title, notes), usage)
+        await self._to_cache(identity, summary, time.perf_counter() - started)
+        return summary
+    
+    async def stream_summary(self, title: str, content: str, usage: Optional[TokenUsage] = None) -> AsyncIterator[str]:
+        """Yield the summary text as the model produces it, adding the tokens spent to usage; a cached summary comes as one piece."""
+        if not self.api_key:
+            raise ValueError("OpenAI API key is not configured")
+        
+        identity, chunks = self._plan(title, content)
+        summary = await self._from_cache(identity)
+        if summary is not None:
+            yield summary
+            return
+        
+        usage = usage if usage is not None else TokenUsage()
+        started = time.perf_counter()
+        prompt = identity
+        if chunks is not None:
+            # Chunk summaries are needed in full before the reduce step can stream.
+            prompt = self._create_reduce_prompt(title, await self._map(title, chunks, usage))
+        parts = []
+        async for text in self._stream(title, prompt, usage):
+            parts.append(text)
+            yield text
+        await self._to_cache(identity, "".join(parts).strip(), time.perf_counter() - started)
+    
+    async def summarize_many(self, articles: Sequence[Tuple[int, str, str]]) -> Dict[int, str]:
+        """Summarize one pack of (id, title, content) in a single request; articles the answer leaves out are sent alone."""
+        if not self.api_key:
+            raise ValueError("OpenAI API key is not configured")
+        
+        summaries = {}
+        pending = []
+        over_long = []
+        for article_id, title, content in articles:
+            if self.tokenizer.count(content) > self.chunk_tokens:
+                over_long.append((article_id, title, content))
+                continue
+            summary = await self._from_cache(self._create_prompt(title, content))
+            if summary is not None:
+                summaries[article_id] = summary
+            else:
+                pending.append((article_id, title, content))
+        
+        semaphore = asyncio.Semaphore(self.chunk_concurrency)
+        
+        async def summarize_alone(article_id: int, title: str, request: Awaitable[str]) -> None:
+            async with semaphore:
+                try:
+                    summaries[article_id] = await request
+                except Exception as e:
+                    logger.error(f"Error generating summary for {title}: {str(e)}")
+        
+        # Over-long articles are map-reduced concurrently while the pack request is answered.
+        alone = asyncio.gather(
+            *(summarize_alone(article_id, title, self.summarize(title, content)) for article_id, title, content in over_long)
+        )
+        try:
+            if pending:
+                body = self.batch_request_body(pending)
+                started = time.perf_counter()
+                answer = await self._request(
+                    f"{len(pending)} articles",
+                    body["messages"],
+                    self._pack_tokens(pending),
+                    max_tokens=body["max_tokens"],
+                    response_format=body["response_format"]
+                )
+                seconds = (time.perf_counter() - started) / len(pending)
+                answers = self._parse_batch_answer(answer)
+                
+                missing = []
+                for article_id, title, content in pending:
+                    prompt = self._create_prompt(title, content)
+                    summary = answers.get(article_id)
+                    if summary is None:
+                        logger.warning(f"Batch answer has no summary for {title}, requesting it alone")
+                        missing.append(summarize_alone(article_id, title, self._generate(title, prompt)))
+                        continue
+                    await self._to_cache(prompt, summary, seconds)
+                    summaries[article_id] = summary
+                await asyncio.gather(*missing)
+        finally:
+            await alone
+        return summaries
+    
+    def pack_articles(self, articles: Sequence[Tuple[int, str, str]]) -> List[List[Tuple[int, str, str]]]:
+        """Group articles, in order, into packs that fit the per-request article count and token budget."""
+        packs = []
+        pack = []
+        pack_tokens = 0
+        for article in articles:
+            tokens = self._pack_tokens([article])
+            if pack and (len(pack) >= self.batch_max_articles or pack_tokens + tokens > self.batch_max_tokens):
+                packs.append(pack)
+                pack = []
+                pack_tokens = 0
+            pack.append(article)
+            pack_tokens += tokens
+        if pack:
+            packs.append(pack)
+        return packs
+    
+    def batch_request_body(self, articles: Sequence[Tuple[int, str, str]]) -> dict:
+        """Chat completions body asking for structured summaries of several articles."""
+        payload = {
+            "articles": [
+                {"id": str(article_id), "title": title, "content": self.tokenizer.truncate(content, self.chunk_tokens)}
+                for article_id, title, content in articles
+            ]
+        }
+        return {
+            "model": MODEL,
+            "messages": [
+                {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": json.dumps(payload, ensure_ascii=False)}
+            ],
+            "max_tokens": MAX_TOKENS * len(articles),
+            "temperature": 0.3,
+            "response_format": {"type": "json_object"}
+        }
+    
+    def batch_request_lines(self, articles: Sequence[Tuple[int, str, str]]) -> Iterator[str]:
+        """Lines of an OpenAI Batch API input file, one packed request per line."""
+        for pack in self.pack_articles(articles):
+            yield json.dumps(
+                {
+                    "custom_id": f"articles-{pack[0][0]}-{pack[-1][0]}",
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": self.batch_request_body(pack)
+                },
+                ensure_ascii=False
+            )
+    
+    @classmethod
+    def parse_batch_results(cls, lines: Iterable[str]) -> Dict[int, str]:
+        """Summaries by article id from a Batch API output file; failed requests are logged and skipped."""
+        summaries = {}
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if record.get("error") or response.get("status_code") != 200:
+                    logger.warning(
+                        f"Batch request {record.get('custom_id')} failed: {record.get('error') or response.get('status_code')}"
+                    )
+                    continue
+                answer = response["body"]["choices"][0]["message"]["content"]
+            except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+                logger.warning(f"Skipping unreadable batch result line: {str(e)}")
+                continue
+            summaries.update(cls._parse_batch_answer(answer))
+        return summaries
+    
+    async def _from_cache(self, prompt: str) -> Optional[str]:
+        """Cached summary for a prompt, counted as a hit; None without a cache or on a miss."""
+        if self.cache is None:
+            return None
+        started = time.perf_counter()
+        summary = await self.cache.get(self.cache.key(MODEL, SYSTEM_PROMPT, prompt))
+        if summary is not None:
+            self.cache.stats.record_hit(time.perf_counter() - started, self._estimate_tokens(prompt))
+        return summary
+    
+    async def _to_cache(self, prompt: str, summary: str, seconds: float) -> None:
+        """Count a generated summary as a miss and store it under its prompt."""
+        if self.cache is None:
+            return
+        self.cache.stats.record_miss(seconds)
+        await self.cache.put(self.cache.key(MODEL, SYSTEM_PROMPT, prompt), MODEL, summary)
+    
+    async def _generate(self, title: str, prompt: str, usage: Optional[TokenUsage] = None) -> str:
+        """Request a summary of one article and store it in the cache as a miss."""
+        started = time.perf_counter()
+        summary = await self._complete(title, prompt, usage)
+        await self._to_cache(prompt, summary, time.perf_counter() - started)
+        return summary
+    
+    def _plan(self, title: str, content: str) -> Tuple[str, Optional[List[str]]]:
+        """Cache identity of an article's summary and its chunks, or None for chunks when one prompt holds it."""
+        content = self.tokenizer.truncate(content, self.article_token_budget)
+        if self.tokenizer.count(content) <= self.chunk_tokens:
+            return self._create_prompt(title, content), None
+        
+        chunks = self.tokenizer.split(content, self.chunk_tokens)
+        prompts = [self._create_chunk_prompt(title, index, len(chunks), chunk) for index, chunk in enumerate(chunks, 1)]
+        return "\n".join([REDUCE_PROMPT_TEMPLATE] + prompts), chunks
+    
+    async def _map(self, title: str, chunks: List[str], usage: TokenUsage) -> str:
+        """Summarize chunks concurrently into notes short enough for the reduce prompt."""
+        semaphore = asyncio.Semaphore(self.chunk_concurrency)
+        
+        async def summarize_chunk(index: int, total: int, chunk: str) -> str:
+            async with semaphore:
+                return await self._complete(
+                    f"{title} [{index}/{total}]", self._create_chunk_prompt(title, index, total, chunk), usage
+                )
+        
+        for _ in range(MAX_REDUCE_ROUNDS):
+            partials = await asyncio.gather(
+                *(summarize_chunk(index, len(chunks), chunk) for index, chunk in enumerate(chunks, 1))
             )
+            notes = "\n\n".join(partials)
+            if self.tokenizer.count(notes) <= self.chunk_tokens:
+                break
+            chunks = self.tokenizer.split(notes, self.chunk_tokens)
+        
+        return self.tokenizer.truncate(notes, self.chunk_tokens)
+    
+    async def _complete(self, label: str, prompt: str, usage: Optional[TokenUsage] = None) -> str:
+        """Send one user prompt with the system prompt."""
+        return await self._request(label, self._messages(prompt), self._estimate_tokens(prompt), usage=usage)
+    
+    async def _stream(self, label: str, prompt: str, usage: TokenUsage) -> AsyncIterator[str]:
+        """Stream one completion, retrying rate limits and server errors until the response starts; usage comes in the last chunk."""
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire(self._estimate_tokens(prompt))
+            try:
+                stream = await self.client.chat.completions.create(
+                    model=MODEL,
+                    messages=self._messages(prompt),
+                    max_tokens=MAX_TOKENS,
+                    temperature=0.3,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+                break
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                await self._backoff(label, attempt, e)
+        
+        try:
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    usage.record(chunk)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+    
+    @staticmethod
+    def _messages(prompt: str) -> List[dict]:
+        """Messages of a request with the system prompt and one user prompt."""
+        return [
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    async def _request(
+        self,
+        label: str,
+        messages: List[dict],
+        cost: int,
+        max_tokens: int = MAX_TOKENS,
+        usage: Optional[TokenUsage] = None,
+        **options
+    ) -> str:
+        """Call the completions API under the rate limiter, retrying rate limits and server errors."""
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire(cost)
+            try:
+                response = await self.client.chat.completions.create(
+                    model=MODEL,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=0.3,
+                    **options
+                )
+                if usage is not None:
+                    usage.record(response)
+                return response.choices[0].message.content.strip()
             
-            return response.choices[0].message.content.strip()
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                await self._backoff(label, attempt, e)
+    
+    async def _backoff(self, label: str, attempt: int, error: Exception) -> None:
+        """Count a retry and sleep before it."""
+        delay = self._retry_delay(attempt, error)
+        self.retries += 1
+        logger.warning(f"Summary request for {label} failed ({str(error)}), retry {attempt + 1} in {delay:.2f}s")
+        await asyncio.sleep(delay)
+    
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """Exponential backoff with full jitter, never shorter than the server's Retry-After."""
+        delay = random.uniform(0, min(MAX_RETRY_DELAY, self.retry_base_delay * 2 ** attempt))
+        if isinstance(error, APIStatusError):
+            retry_after = error.response.headers.get("retry-after")
+            try:
+                delay = max(delay, min(MAX_RETRY_DELAY, float(retry_after)))
+            except (TypeError, ValueError):
+                pass
+        return delay
+    
+    def _estimate_tokens(self, prompt: str) -> int:
+        """Token cost of one request for the rate limiter: prompt tokens plus the completion limit."""
+        return self.tokenizer.count(prompt) + MAX_TOKENS
+    
+    def _pack_tokens(self, articles: Sequence[Tuple[int, str, str]]) -> int:
+        """Token cost of a packed request for the given articles, without the shared system prompt."""
+        return sum(
+            self.tokenizer.count(title) + self.tokenizer.count(self.tokenizer.truncate(content, self.chunk_tokens)) + MAX_TOKENS
+            for _, title, content in articles
+        )
+    
+    @staticmethod
+    def _parse_batch_answer(answer: str) -> Dict[int, str]:
+        """Summaries by article id from a structured batch answer; malformed entries are dropped."""
+        try:
+            entries = json.loads(answer).get("summaries", [])
+        except (ValueError, AttributeError) as e:
+            logger.warning(f"Unreadable batch answer: {str(e)}")
+            return {}
         
-        except Exception as e:
-            return f"Error generating summary: {str(e)}"
+        summaries = {}
+        for entry in entries if isinstance(entries, list) else []:
+            try:
+                summary = str(entry["summary"]).strip()
+                if summary:
+                    summaries[int(entry["id"])] = summary
+            except (KeyError, TypeError, ValueError):
+                continue
+        return summaries
     
     def _create_prompt(self, title: str, content: str) -> str:
         """Create prompt for AI summary generation."""
-        truncated_content = content[:3000] if len(content) > 3000 else content
+        truncated_content = self.tokenizer.truncate(content, self.chunk_tokens)
         
         return f"""
         Создай краткое содержание для статьи Википедии:
@@ -54,4 +546,24 @@ class SummaryGenerator:
         - Язык: русский
         - Стиль: информативный и понятный
         - Включи основные факты и ключевую информацию
-        """ 
\ No newline at end of file
+        """
+    
+    def _create_chunk_prompt(self, title: str, index: int, total: int, chunk: str) -> str:
+        """Create prompt summarizing one chunk of a long article."""
+        return f"""
+        Перескажи кратко фрагмент {index} из {total} статьи Википедии:
+        
+        Название: {title}
+        
+        Фрагмент:
+        {chunk}
+        
+        Требования:
+        - Объем: 2-4 предложения
+        - Язык: русский
+        - Сохрани факты, даты и имена
+        """
+    
+    def _create_reduce_prompt(self, title: str, notes: str) -> str:
+        """Create prompt combining chunk summaries into the article summary."""
+        return REDUCE_PROMPT_TEMPLATE.format(title=title, notes=notes)
\ No newline at end of file
@@ -0,0 +1,90 @@
+import math
+from functools import lru_cache
+from typing import List
+from loguru import logger
+
+
+BYTES_PER_TOKEN = 4
+
+
+class Tokenizer:
+    """Token counting with tiktoken when it is installed, otherwise an estimate from the UTF-8 size of the text."""
+    
+    def __init__(self, model: str):
+        self.model = model
+        self.encoding = _load_encoding(model)
+    
+    def count(self, text: str) -> int:
+        """Number of tokens in text."""
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        # Four bytes per token: Latin text at about four characters per token, Cyrillic at about two.
+        return math.ceil(len(text.encode("utf-8")) / BYTES_PER_TOKEN)
+    
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Longest prefix of text that fits max_tokens."""
+        if self.count(text) <= max_tokens:
+            return text
+        return self._pieces(text, max_tokens)[0]
+    
+    def split(self, text: str, chunk_tokens: int) -> List[str]:
+        """Cut text into chunks of at most chunk_tokens, breaking between paragraphs where possible."""
+        chunks = []
+        current = []
+        current_tokens = 0
+        for paragraph in text.split("\n"):
+            if not paragraph.strip():
+                continue
+            tokens = self.count(paragraph)
+            parts = self._pieces(paragraph, chunk_tokens) if tokens > chunk_tokens else [paragraph]
+            for part in parts:
+                part_tokens = tokens if len(parts) == 1 else self.count(part)
+                if current and current_tokens + part_tokens > chunk_tokens:
+                    chunks.append("\n".join(current))
+                    current = []
+                    current_tokens = 0
+                current.append(part)
+                current_tokens += part_tokens
+        if current:
+            chunks.append("\n".join(current))
+        return chunks
+    
+    def _pieces(self, text: str, max_tokens: int) -> List[str]:
+        """Cut text into consecutive pieces of at most max_tokens each, ignoring paragraph boundaries."""
+        max_tokens = max(1, max_tokens)
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            return [self.encoding.decode(tokens[start:start + max_tokens]) for start in range(0, len(tokens), max_tokens)]
+        
+        pieces = []
+        start = 0
+        size = 0
+        limit = max_tokens * BYTES_PER_TOKEN
+        for index, char in enumerate(text):
+            char_size = len(char.encode("utf-8"))
+            if size + char_size > limit:
+                pieces.append(text[start:index])
+                start = index
+                size = 0
+            size += char_size
+        pieces.append(text[start:])
+        return pieces
+
+
+def _load_encoding(model: str):
+    """tiktoken encoding of the model, or None when tiktoken is not installed."""
+    try:
+        import tiktoken
+    except ImportError:
+        logger.info("tiktoken is not installed, token counts are estimated from text size")
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(model: str) -> Tokenizer:
+    """Get the tokenizer of a model, loading its encoding once per process."""
+    return Tokenizer(model)
\ No newline at end of file
@@ -1,31 +1,32 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Annotated, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, File, Query, UploadFile
+from fastapi.responses import StreamingResponse
 from dependency_injector.wiring import inject, Provide
 
-from app.schemas import ParseRequest, SummaryResponse, ArticleResponse
+from app.schemas import ArticlePage, ArticleResponse, ParseRequest, SearchPage, SummaryResponse, CrawlJobResponse
 from app.services.article_service import ArticleService
+from app.services.crawl_job_manager import CrawlJobManager
+from app.config import settings
 from app.containers import Container
 
 router = APIRouter(prefix="/api/v1", tags=["articles"])
 
 
-@router.post("/parse", response_model=ArticleResponse)
+@router.post("/parse", response_model=CrawlJobResponse, status_code=202)
 @inject
 async def parse_article(
     request: ParseRequest,
-    background_tasks: BackgroundTasks,
-    article_service: Annotated[ArticleService, Depends(Provide[Container.article_service])]
+    crawl_job_manager: Annotated[CrawlJobManager, Depends(Provide[Container.crawl_job_manager])]
 ):
     """
-    Запуск парсинга статьи Википедии с рекурсивным парсингом связанных статей.
+    Постановка в очередь парсинга статьи Википедии с рекурсивным парсингом связанных статей.
     """
     try:
-        article = await article_service.parse_and_save_article(str(request.url))
-        
-        if not article:
-            raise HTTPException(status_code=404, detail="Не удалось спарсить статью")
-        
-        return ArticleResponse.model_validate(article)
+        job = await crawl_job_manager.submit(str(request.url))
+        return CrawlJobResponse.model_validate(job)
     
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -33,6 +34,48 @@ async def parse_article(
         raise HTTPException(status_code=500, detail=f"Внутренняя ошибка сервера: {str(e)}")
 
 
+@router.get("/jobs/{job_id}", response_model=CrawlJobResponse)
+@inject
+async def get_crawl_job(
+    job_id: int,
+    crawl_job_manager: Annotated[CrawlJobManager, Depends(Provide[Container.crawl_job_manager])]
+):
+    """
+    Получение состояния задачи парсинга: число загруженных, ожидающих и неудачных страниц.
+    """
+    try:
+        job = await crawl_job_manager.get_job(job_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Внутренняя ошибка сервера: {str(e)}")
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    
+    return CrawlJobResponse.model_validate(job)
+
+
+@router.post("/jobs/{job_id}/resume", response_model=CrawlJobResponse, status_code=202)
+@inject
+async def resume_crawl_job(
+    job_id: int,
+    crawl_job_manager: Annotated[CrawlJobManager, Depends(Provide[Container.crawl_job_manager])]
+):
+    """
+    Возобновление прерванной или завершившейся ошибкой задачи парсинга с последней контрольной точки.
+    """
+    try:
+        job = await crawl_job_manager.resume(job_id)
+    except ValueError:
+        raise HTTPException(status_code=409, detail="Задача уже выполняется или завершена успешно")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Внутренняя ошибка сервера: {str(e)}")
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    
+    return CrawlJobResponse.model_validate(job)
+
+
 @router.get("/summary", response_model=SummaryResponse)
 @inject
 async def get_article_summary(
@@ -54,18 +97,154 @@ async def get_article_summary(
         raise HTTPException(status_code=500, detail=f"Внутренняя ошибка сервера: {str(e)}")
 
 
+@router.get("/articles", response_model=ArticlePage, response_model_exclude_unset=True)
+@inject
+async def list_articles(
+    cursor: Optional[int] = Query(None, description="next_cursor предыдущей страницы"),
+    limit: int = Query(100, ge=1, le=1000),
+    depth_level: Optional[int] = None,
+    parent_id: Optional[int] = None,
+    summary_generated: Optional[bool] = None,
+    fields: Optional[str] = Query(None, description="Поля через запятую; по умолчанию id, url, title, depth_level, parent_id, summary_generated"),
+    article_service: ArticleService = Depends(Provide[Container.article_service])
+):
+    """
+    Постраничный список статей с курсором по id и выбором полей; текст статьи возвращается, только если он указан в fields.
+    """
+    try:
+        selected = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+        return await article_service.list_articles(selected, cursor, limit, depth_level, parent_id, summary_generated)
+    
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Внутренняя ошибка сервера: {str(e)}")
+
+
+@router.get("/search", response_model=SearchPage)
+@inject
+async def search_articles(
+    q: str = Query(..., min_length=1, description="Поисковый запрос"),
+    cursor: Optional[str] = Query(None, description="next_cursor предыдущей страницы"),
+    limit: int = Query(20, ge=1, le=100),
+    article_service: ArticleService = Depends(Provide[Container.article_service])
+):
+    """
+    Полнотекстовый поиск по статьям с учётом морфологии, ранжированием и подсветкой совпадений во фрагменте текста.
+    """
+    try:
+        return await article_service.search_articles(q, cursor, limit)
+    
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Внутренняя ошибка сервера: {str(e)}")
+
+
+@router.get("/tree", response_model=ArticleResponse)
+@inject
+async def get_article_tree(
+    url: str,
+    max_depth: Optional[int] = Query(None, ge=0, description="Сколько уровней потомков вернуть; по умолчанию MAX_RECURSION_DEPTH"),
+    include_content: bool = Query(False, description="Включить текст статей в ответ"),
+    article_service: ArticleService = Depends(Provide[Container.article_service])
+):
+    """
+    Статья со всем деревом обхода во вложенных children, прочитанным одним рекурсивным запросом.
+    """
+    try:
+        tree = await article_service.get_article_tree(url, max_depth, include_content)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Внутренняя ошибка сервера: {str(e)}")
+    
+    if tree is None:
+        raise HTTPException(status_code=404, detail="Статья не найдена в базе данных")
+    return tree
+
+
+@router.get("/summary/stream")
+@inject
+async def stream_article_summary(
+    url: str,
+    article_service: ArticleService = Depends(Provide[Container.article_service])
+):
+    """
+    Краткое содержание статьи потоком Server-Sent Events.
+    
+    Сохранённое краткое содержание отдаётся сразу событием summary; иначе текст передаётся
+    событиями token по мере генерации и сохраняется в базе после завершающего события done.
+    """
+    try:
+        events = await article_service.stream_article_summary(url)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Внутренняя ошибка сервера: {str(e)}")
+    
+    if events is None:
+        raise HTTPException(status_code=404, detail="Статья не найдена в базе данных")
+    
+    async def stream():
+        async for event, data in events:
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/generate-summaries")
 @inject
 async def generate_pending_summaries(
     background_tasks: BackgroundTasks,
+    mode: Optional[Literal["single", "batch", "offline"]] = Query(None, description="single, batch или offline; по умолчанию SUMMARY_MODE"),
+    engine: Optional[Literal["llm", "extractive", "auto"]] = Query(None, description="llm, extractive или auto; по умолчанию SUMMARY_ENGINE"),
     article_service: ArticleService = Depends(Provide[Container.article_service])
 ):
     """
     Генерация краткого содержания для всех статей, у которых его ещё нет.
+    
+    В режиме batch несколько коротких статей отправляются в одном запросе, а в режиме offline
+    формируется JSONL-файл запросов для OpenAI Batch API, результаты которого загружаются через /summary-results.
+    Движок extractive составляет summary из предложений самой статьи без обращения к OpenAI, а auto
+    переходит на него, если нет ключа API, запрос завершился ошибкой или не уложился в SUMMARY_LATENCY_BUDGET.
     """
     try:
-        background_tasks.add_task(article_service.generate_pending_summaries)
+        mode = mode or settings.summary_mode
+        if mode == "offline":
+            path = _offline_path("summary-requests")
+            background_tasks.add_task(article_service.export_summary_requests, str(path))
+            return {"message": "Файл запросов для пакетной обработки формируется в фоновом режиме", "requests_file": str(path)}
+        
+        background_tasks.add_task(article_service.generate_pending_summaries, mode=mode, engine=engine)
         return {"message": "Генерация краткого содержания запущена в фоновом режиме"}
     
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Внутренняя ошибка сервера: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Внутренняя ошибка сервера: {str(e)}")
+
+
+@router.post("/summary-results")
+@inject
+async def import_summary_results(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="Файл результатов OpenAI Batch API (JSONL)"),
+    article_service: ArticleService = Depends(Provide[Container.article_service])
+):
+    """
+    Загрузка краткого содержания из файла результатов пакетной обработки.
+    """
+    try:
+        path = _offline_path("summary-results")
+        path.write_bytes(await file.read())
+        background_tasks.add_task(article_service.import_summary_results, str(path))
+        return {"message": "Результаты пакетной обработки загружаются в фоновом режиме", "results_file": str(path)}
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Внутренняя ошибка сервера: {str(e)}")
+
+
+def _offline_path(prefix: str) -> Path:
+    """New timestamped JSONL path in the offline summaries directory."""
+    directory = Path(settings.summary_offline_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"{prefix}-{datetime.now():%Y%m%d-%H%M%S-%f}.jsonl"
\ No newline at end of file
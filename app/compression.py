@@ -0,0 +1,83 @@
+import hashlib
+import zlib
+from functools import lru_cache
+from typing import Optional
+from loguru import logger
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from app.config import settings
+
+
+# One tag byte in front of every stored body names the codec, so rows written with different settings stay readable.
+CODEC_TAGS = {"none": b"n", "zlib": b"z", "zstd": b"s"}
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of the UTF-8 text, the key of its stored body."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def compress_text(text: str, codec: Optional[str] = None) -> bytes:
+    """Encode text with the given codec, by default CONTENT_COMPRESSION, behind its tag byte."""
+    codec = codec or settings.content_compression
+    if codec not in CODEC_TAGS:
+        raise ValueError(f"Unknown content compression: {codec}")
+    if codec == "zstd" and _load_zstd() is None:
+        codec = "zlib"
+    
+    data = text.encode("utf-8")
+    if codec == "zstd":
+        data = _zstd_compressor().compress(data)
+    elif codec == "zlib":
+        data = zlib.compress(data, ZLIB_LEVEL)
+    return CODEC_TAGS[codec] + data
+
+
+def decompress_text(data: bytes) -> str:
+    """Decode a body written by compress_text."""
+    tag, payload = data[:1], data[1:]
+    if tag == CODEC_TAGS["zlib"]:
+        payload = zlib.decompress(payload)
+    elif tag == CODEC_TAGS["zstd"]:
+        zstd = _load_zstd()
+        if zstd is None:
+            raise RuntimeError("Article body is zstd-compressed but zstandard is not installed")
+        payload = zstd.ZstdDecompressor().decompress(payload)
+    elif tag != CODEC_TAGS["none"]:
+        raise ValueError(f"Unknown article body codec tag: {tag!r}")
+    return payload.decode("utf-8")
+
+
+class CompressedText(TypeDecorator):
+    """Text column stored as a compressed blob and read back as str."""
+    
+    impl = LargeBinary
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        """Compress text on the way into the database."""
+        return compress_text(value) if value is not None else None
+    
+    def process_result_value(self, value, dialect):
+        """Decompress a blob on the way out."""
+        return decompress_text(bytes(value)) if value is not None else None
+
+
+@lru_cache(maxsize=None)
+def _load_zstd():
+    """zstandard module, or None when it is not installed."""
+    try:
+        import zstandard
+    except ImportError:
+        logger.info("zstandard is not installed, article bodies are compressed with zlib")
+        return None
+    return zstandard
+
+
+@lru_cache(maxsize=None)
+def _zstd_compressor():
+    """Shared zstd compressor of this process."""
+    return _load_zstd().ZstdCompressor(level=ZSTD_LEVEL)
\ No newline at end of file
@@ -14,10 +14,70 @@ class Settings:
     db_name: str = os.getenv("DB_NAME", "investera")
     db_user: str = os.getenv("DB_USER", "postgres")
     db_password: str = os.getenv("DB_PASSWORD", "postgres")
+    content_compression: str = os.getenv("CONTENT_COMPRESSION", "zstd")
+    search_config: str = os.getenv("SEARCH_CONFIG", "russian")
     
     openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
+    openai_base_url: str = os.getenv("OPENAI_BASE_URL", "")
+    openai_requests_per_minute: int = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+    openai_tokens_per_minute: int = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "200000"))
+    summary_concurrency: int = int(os.getenv("SUMMARY_CONCURRENCY", "8"))
+    summary_batch_size: int = int(os.getenv("SUMMARY_BATCH_SIZE", "50"))
+    summary_max_retries: int = int(os.getenv("SUMMARY_MAX_RETRIES", "5"))
+    summary_retry_base_delay: float = float(os.getenv("SUMMARY_RETRY_BASE_DELAY", "1.0"))
+    summary_chunk_tokens: int = int(os.getenv("SUMMARY_CHUNK_TOKENS", "2000"))
+    summary_chunk_concurrency: int = int(os.getenv("SUMMARY_CHUNK_CONCURRENCY", "4"))
+    summary_article_token_budget: int = int(os.getenv("SUMMARY_ARTICLE_TOKEN_BUDGET", "16000"))
+    summary_mode: str = os.getenv("SUMMARY_MODE", "single")
+    summary_engine: str = os.getenv("SUMMARY_ENGINE", "llm")
+    summary_latency_budget: float = float(os.getenv("SUMMARY_LATENCY_BUDGET", "20.0"))
+    summary_extractive_sentences: int = int(os.getenv("SUMMARY_EXTRACTIVE_SENTENCES", "3"))
+    summary_extractive_max_sentences: int = int(os.getenv("SUMMARY_EXTRACTIVE_MAX_SENTENCES", "200"))
+    summary_batch_max_articles: int = int(os.getenv("SUMMARY_BATCH_MAX_ARTICLES", "10"))
+    summary_batch_max_tokens: int = int(os.getenv("SUMMARY_BATCH_MAX_TOKENS", "8000"))
+    summary_offline_dir: str = os.getenv("SUMMARY_OFFLINE_DIR", "summary_batches")
+    summary_cache: bool = os.getenv("SUMMARY_CACHE", "true").lower() == "true"
+    summary_cache_memory_size: int = int(os.getenv("SUMMARY_CACHE_MEMORY_SIZE", "1024"))
     
     max_recursion_depth: int = int(os.getenv("MAX_RECURSION_DEPTH", "5"))
+    crawl_concurrency: int = int(os.getenv("CRAWL_CONCURRENCY", "8"))
+    crawl_batch_size: int = int(os.getenv("CRAWL_BATCH_SIZE", "100"))
+    crawl_visited_backend: str = os.getenv("CRAWL_VISITED_BACKEND", "fingerprint")
+    crawl_bloom_capacity: int = int(os.getenv("CRAWL_BLOOM_CAPACITY", "10000000"))
+    crawl_bloom_error_rate: float = float(os.getenv("CRAWL_BLOOM_ERROR_RATE", "0.001"))
+    crawl_warm_start: bool = os.getenv("CRAWL_WARM_START", "false").lower() == "true"
+    crawl_job_workers: int = int(os.getenv("CRAWL_JOB_WORKERS", "2"))
+    crawl_job_progress_interval: float = float(os.getenv("CRAWL_JOB_PROGRESS_INTERVAL", "1.0"))
+    crawl_job_lease_seconds: float = float(os.getenv("CRAWL_JOB_LEASE_SECONDS", "60"))
+    crawl_job_owner: str = os.getenv("CRAWL_JOB_OWNER", "")
+    crawl_checkpoint_interval: float = float(os.getenv("CRAWL_CHECKPOINT_INTERVAL", "10"))
+    
+    frontier_batch_size: int = int(os.getenv("FRONTIER_BATCH_SIZE", "20"))
+    frontier_lease_seconds: float = float(os.getenv("FRONTIER_LEASE_SECONDS", "300"))
+    frontier_max_attempts: int = int(os.getenv("FRONTIER_MAX_ATTEMPTS", "3"))
+    frontier_poll_interval: float = float(os.getenv("FRONTIER_POLL_INTERVAL", "1.0"))
+    
+    parser_backend: str = os.getenv("PARSER_BACKEND", "bs4")
+    parser_streaming: bool = os.getenv("PARSER_STREAMING", "false").lower() == "true"
+    parser_executor: str = os.getenv("PARSER_EXECUTOR", "none")
+    parser_executor_workers: int = int(os.getenv("PARSER_EXECUTOR_WORKERS", "0"))
+    
+    fetch_backend: str = os.getenv("FETCH_BACKEND", "html")
+    mediawiki_api_path: str = os.getenv("MEDIAWIKI_API_PATH", "/w/api.php")
+    mediawiki_api_batch_size: int = int(os.getenv("MEDIAWIKI_API_BATCH_SIZE", "50"))
+    
+    dump_batch_size: int = int(os.getenv("DUMP_BATCH_SIZE", "1000"))
+    dump_workers: int = int(os.getenv("DUMP_WORKERS", "0"))
+    
+    http_pool_limit: int = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+    http_limit_per_host: int = int(os.getenv("HTTP_LIMIT_PER_HOST", "20"))
+    http_keepalive_timeout: float = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+    http_dns_cache_ttl: int = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+    http_timeout: float = float(os.getenv("HTTP_TIMEOUT", "30"))
+    
+    http_cache_dir: str = os.getenv("HTTP_CACHE_DIR", "")
+    http_cache_max_bytes: int = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+    http_cache_ttl: float = float(os.getenv("HTTP_CACHE_TTL", "86400"))
     
     @property
     def database_url(self) -> str:
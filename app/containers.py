@@ -2,9 +2,13 @@ from dependency_injector import containers, providers
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.database import get_async_session
+from app.database import get_async_session, get_async_session_maker
 from app.repositories.article_repository import ArticleRepository
+from app.parsers.http_client import HttpClient
+from app.parsers.wikipedia_parser import WikipediaParser
 from app.services.article_service import ArticleService
+from app.services.crawl_job_manager import CrawlJobManager
+from app.ai.summary_cache import create_summary_cache
 from app.ai.summary_generator import SummaryGenerator
 
 
@@ -20,10 +24,33 @@ class Container(containers.DeclarativeContainer):
         session=db_session
     )
     
-    summary_generator = providers.Singleton(SummaryGenerator)
+    summary_cache = providers.Singleton(
+        create_summary_cache,
+        session_maker=providers.Callable(get_async_session_maker)
+    )
+    
+    summary_generator = providers.Singleton(
+        SummaryGenerator,
+        cache=summary_cache
+    )
+    
+    http_client = providers.Singleton(HttpClient)
+    
+    wikipedia_parser = providers.Factory(
+        WikipediaParser,
+        http_client=http_client
+    )
     
     article_service = providers.Factory(
         ArticleService,
         article_repository=article_repository,
-        summary_generator=summary_generator
+        summary_generator=summary_generator,
+        parser_factory=wikipedia_parser.provider
+    )
+    
+    crawl_job_manager = providers.Singleton(
+        CrawlJobManager,
+        session_factory=providers.Callable(get_async_session_maker),
+        summary_generator=summary_generator,
+        parser_factory=wikipedia_parser.provider
     ) 
\ No newline at end of file
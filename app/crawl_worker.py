@@ -0,0 +1,87 @@
+"""Crawl worker leasing pages from the crawl_frontier table shared by all processes and nodes.
+
+Run from the repository root on any number of machines pointing at the same database:
+    
+    python -m app.crawl_worker [--seed URL ...] [--max-depth N] [--processes N] [--batch-size N] [--exit-when-idle]
+"""
+import argparse
+import asyncio
+import multiprocessing
+from typing import List
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.parsers.wikipedia_parser import WikipediaParser
+from app.repositories.frontier_repository import FrontierRepository
+from app.services.frontier_worker import FrontierWorker
+from app.upgrade_schema import upgrade_schema
+
+
+def create_session_maker(database_url: str):
+    """Create an engine and session maker of this process."""
+    connect_args = {"timeout": 30} if database_url.startswith("sqlite") else {}
+    engine = create_async_engine(database_url, connect_args=connect_args, pool_pre_ping=True)
+    return engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def seed(database_url: str, urls: List[str], max_depth: int) -> None:
+    """Create tables if needed and put root URLs into the frontier."""
+    engine, session_maker = create_session_maker(database_url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(upgrade_schema)
+        async with session_maker() as session:
+            await FrontierRepository(session).enqueue([{"url": url, "depth": 0, "max_depth": max_depth} for url in urls])
+    finally:
+        await engine.dispose()
+
+
+async def work(database_url: str, batch_size: int, lease_seconds: float, exit_when_idle: bool) -> None:
+    """Run one worker until the frontier is drained or the process is stopped."""
+    engine, session_maker = create_session_maker(database_url)
+    try:
+        async with WikipediaParser() as parser:
+            worker = FrontierWorker(session_maker, parser, batch_size=batch_size, lease_seconds=lease_seconds)
+            await worker.run(exit_when_idle=exit_when_idle)
+    finally:
+        await engine.dispose()
+
+
+def run_process(database_url: str, batch_size: int, lease_seconds: float, exit_when_idle: bool) -> None:
+    """Entry point of one worker process."""
+    asyncio.run(work(database_url, batch_size, lease_seconds, exit_when_idle))
+
+
+def main() -> None:
+    """Parse command line arguments, seed the frontier and start worker processes."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", action="append", default=[], help="Wikipedia article URL to crawl, may repeat")
+    parser.add_argument("--max-depth", type=int, default=settings.max_recursion_depth)
+    parser.add_argument("--processes", type=int, default=1, help="worker processes on this node")
+    parser.add_argument("--batch-size", type=int, default=settings.frontier_batch_size)
+    parser.add_argument("--lease-seconds", type=float, default=settings.frontier_lease_seconds)
+    parser.add_argument("--exit-when-idle", action="store_true", help="stop once no page is pending or leased")
+    parser.add_argument("--database-url", default=settings.database_url)
+    args = parser.parse_args()
+    
+    for url in args.seed:
+        if not WikipediaParser.is_wikipedia_url(url):
+            parser.error(f"not a Wikipedia article URL: {url}")
+    
+    asyncio.run(seed(args.database_url, args.seed, args.max_depth))
+    
+    worker_args = (args.database_url, args.batch_size, args.lease_seconds, args.exit_when_idle)
+    if args.processes <= 1:
+        run_process(*worker_args)
+        return
+    
+    processes = [multiprocessing.Process(target=run_process, args=worker_args) for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""Add articles stored before full-text search existed to the search index.
+
+Run from the repository root; articles saved afterwards are indexed on insert:
+    
+    python -m app.index_search [--batch-size N] [--database-url URL]
+"""
+import argparse
+import asyncio
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.repositories.article_repository import ArticleRepository
+from app.upgrade_schema import upgrade_schema
+
+
+async def index_missing(engine: AsyncEngine, batch_size: int = 500) -> int:
+    """Index every article missing from the search index in keyset batches; returns how many were added."""
+    async with engine.begin() as conn:
+        await conn.run_sync(upgrade_schema)
+    
+    indexed = 0
+    last_id = 0
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        repository = ArticleRepository(session)
+        while True:
+            rows = await repository.get_unindexed_documents(last_id, batch_size)
+            if not rows:
+                break
+            
+            await repository.index_search([(row.id, row.title, row.content or "") for row in rows])
+            await session.commit()
+            indexed += len(rows)
+            last_id = rows[-1].id
+            logger.info(f"Indexed {indexed} articles")
+    return indexed
+
+
+async def run(database_url: str, batch_size: int) -> None:
+    """Index one database."""
+    engine = create_async_engine(database_url)
+    try:
+        indexed = await index_missing(engine, batch_size)
+        logger.info(f"Search index is up to date, {indexed} articles added")
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Parse command line arguments and build the index."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--database-url", default=settings.database_url)
+    args = parser.parse_args()
+    
+    asyncio.run(run(args.database_url, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
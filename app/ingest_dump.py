@@ -0,0 +1,46 @@
+"""Bulk-load articles from a Wikipedia pages-articles XML dump.
+
+Run from the repository root:
+    
+    python -m app.ingest_dump ruwiki-latest-pages-articles.xml.bz2 [--base-url URL] [--batch-size N] [--workers N]
+"""
+import argparse
+import asyncio
+
+from app.config import settings
+from app.database import get_async_session_maker, get_engine
+from app.parsers.executor import create_parse_executor
+from app.repositories.article_repository import ArticleRepository
+from app.services.dump_ingestion_service import DumpIngestionService
+from app.upgrade_schema import upgrade_schema
+
+
+async def ingest(path: str, base_url: str, batch_size: int, workers: int) -> None:
+    """Create tables if needed and ingest one dump file."""
+    async with get_engine().begin() as conn:
+        await conn.run_sync(upgrade_schema)
+    
+    executor = create_parse_executor("process", workers)
+    try:
+        async with get_async_session_maker()() as session:
+            service = DumpIngestionService(ArticleRepository(session), executor=executor, batch_size=batch_size)
+            await service.ingest(path, base_url)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        await get_engine().dispose()
+
+
+def main() -> None:
+    """Parse command line arguments and run the ingestion."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("dump", help="path to pages-articles.xml or pages-articles.xml.bz2")
+    parser.add_argument("--base-url", default="https://ru.wikipedia.org", help="site the dump was taken from")
+    parser.add_argument("--batch-size", type=int, default=settings.dump_batch_size)
+    parser.add_argument("--workers", type=int, default=settings.dump_workers, help="extraction processes, 0 for all CPUs")
+    args = parser.parse_args()
+    
+    asyncio.run(ingest(args.dump, args.base_url.rstrip("/"), args.batch_size, args.workers))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
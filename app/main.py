@@ -3,13 +3,26 @@ from contextlib import asynccontextmanager
 from app.config import settings
 from app.containers import Container
 from app.api.endpoints import router
-from app.database import Base, get_engine
+from app.database import get_engine
+from app.parsers.executor import shutdown_parse_executor
+from app.parsers.http_cache import get_http_cache
+from app.upgrade_schema import upgrade_schema
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan."""
+    http_client = app.container.http_client()
+    await http_client.start()
+    crawl_job_manager = app.container.crawl_job_manager()
+    await crawl_job_manager.start()
+    
     yield
+    
+    await crawl_job_manager.stop()
+    await app.container.summary_generator().close()
+    await http_client.close()
+    shutdown_parse_executor()
 
 
 app = FastAPI(
@@ -40,13 +53,32 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/http-stats")
+async def http_stats():
+    """Connection reuse statistics of the shared HTTP client and page cache counters."""
+    stats = app.container.http_client().stats.as_dict()
+    cache = get_http_cache()
+    stats["cache"] = cache.stats.as_dict() if cache is not None else None
+    return stats
+
+
+@app.get("/summary-stats")
+async def summary_stats():
+    """Retry counter of the summary generator and summary cache hits, misses and savings."""
+    generator = app.container.summary_generator()
+    return {
+        "retries": generator.retries,
+        "cache": generator.cache.stats.as_dict() if generator.cache is not None else None
+    }
+
+
 @app.post("/init-db")
 async def init_database():
     """Initialize database tables."""
     try:
         engine = get_engine()
         async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(upgrade_schema)
         return {"message": "✅ Database initialized successfully"}
     except Exception as e:
         return {"error": f"❌ Database initialization failed: {str(e)}"}
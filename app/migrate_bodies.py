@@ -0,0 +1,155 @@
+"""Move article text from articles.content into the deduplicated, compressed article_bodies table.
+
+Run from the repository root once per database, before starting the version that reads article_bodies:
+    
+    python -m app.migrate_bodies [--batch-size N] [--keep-column] [--vacuum] [--database-url URL]
+
+The migration is resumable: rows that already have a content_hash are skipped.
+"""
+import argparse
+import asyncio
+import re
+from dataclasses import dataclass
+
+from loguru import logger
+from sqlalchemy import Column, Integer, MetaData, String, Table, Text, bindparam, func, inspect, select, text, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.models import ArticleBody
+from app.repositories.article_repository import ArticleRepository
+from app.upgrade_schema import upgrade_schema
+
+
+# The articles table as it was before bodies moved out; the model no longer maps the content column.
+legacy_articles = Table(
+    "articles",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("content", Text),
+    Column("content_hash", String(64)),
+)
+
+
+@dataclass
+class MigrationStats:
+    """Counters of one migration run."""
+    
+    articles: int = 0
+    bodies: int = 0
+    text_bytes: int = 0
+    stored_bytes: int = 0
+
+
+async def migrate(engine: AsyncEngine, batch_size: int = 1000, drop_column: bool = True) -> MigrationStats:
+    """Upgrade the schema, copy every body into article_bodies in keyset batches and drop or relax articles.content."""
+    stats = MigrationStats()
+    async with engine.begin() as conn:
+        await conn.run_sync(upgrade_schema)
+        columns = await conn.run_sync(lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns("articles")})
+        if "content_hash" not in columns:
+            await conn.execute(text("ALTER TABLE articles ADD COLUMN content_hash VARCHAR(64) REFERENCES article_bodies (hash)"))
+    if "content" not in columns:
+        logger.info("articles.content is already gone, nothing to migrate")
+        return stats
+    
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    last_id = 0
+    async with session_maker() as session:
+        repository = ArticleRepository(session)
+        while True:
+            rows = (await session.execute(
+                select(legacy_articles.c.id, legacy_articles.c.content)
+                .where(legacy_articles.c.id > last_id, legacy_articles.c.content_hash.is_(None))
+                .order_by(legacy_articles.c.id)
+                .limit(batch_size)
+            )).all()
+            if not rows:
+                break
+            
+            hashes = await repository.store_bodies(row.content or "" for row in rows)
+            await session.execute(
+                update(legacy_articles)
+                .where(legacy_articles.c.id == bindparam("article_id"))
+                .values(content_hash=bindparam("body_hash")),
+                [{"article_id": row.id, "body_hash": body_hash} for row, body_hash in zip(rows, hashes)]
+            )
+            await session.commit()
+            stats.articles += len(rows)
+            stats.text_bytes += sum(len((row.content or "").encode("utf-8")) for row in rows)
+            last_id = rows[-1].id
+            logger.info(f"Moved bodies of {stats.articles} articles")
+        
+        stats.bodies, stats.stored_bytes = (await session.execute(
+            select(func.count(), func.coalesce(func.sum(func.length(ArticleBody.content)), 0))
+        )).one()
+    
+    async with engine.begin() as conn:
+        if drop_column:
+            await conn.execute(text("ALTER TABLE articles DROP COLUMN content"))
+        else:
+            await conn.run_sync(allow_null_content)
+    logger.info(
+        f"Moved {stats.articles} articles ({stats.text_bytes} bytes of text) into {stats.bodies} distinct bodies "
+        f"taking {stats.stored_bytes} bytes"
+    )
+    return stats
+
+
+def allow_null_content(conn: Connection) -> None:
+    """Drop NOT NULL from a kept articles.content, since new rows are written without it."""
+    column = next(column for column in inspect(conn).get_columns("articles") if column["name"] == "content")
+    if column["nullable"]:
+        return
+    if conn.dialect.name != "sqlite":
+        conn.execute(text("ALTER TABLE articles ALTER COLUMN content DROP NOT NULL"))
+        return
+    
+    # SQLite cannot alter a column, so the table is rebuilt from its own definition without the constraint.
+    table_sql = conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'articles'").scalar_one()
+    index_sqls = conn.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'articles' AND sql IS NOT NULL"
+    ).scalars().all()
+    table_sql = re.sub(r"(\bcontent\s+TEXT)\s+NOT\s+NULL", r"\1", table_sql, count=1, flags=re.IGNORECASE)
+    table_sql = re.sub(r"^CREATE TABLE\s+\"?articles\"?", "CREATE TABLE articles_rebuilt", table_sql, count=1)
+    conn.exec_driver_sql(table_sql)
+    conn.exec_driver_sql("INSERT INTO articles_rebuilt SELECT * FROM articles")
+    conn.exec_driver_sql("DROP TABLE articles")
+    conn.exec_driver_sql("ALTER TABLE articles_rebuilt RENAME TO articles")
+    for index_sql in index_sqls:
+        conn.exec_driver_sql(index_sql)
+
+
+async def vacuum(engine: AsyncEngine) -> None:
+    """Return the pages freed by the dropped column to the file system."""
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM" if engine.dialect.name == "sqlite" else "VACUUM FULL articles"))
+
+
+async def run(database_url: str, batch_size: int, drop_column: bool, compact: bool) -> None:
+    """Migrate one database."""
+    engine = create_async_engine(database_url)
+    try:
+        await migrate(engine, batch_size, drop_column)
+        if compact:
+            await vacuum(engine)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Parse command line arguments and run the migration."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--keep-column", action="store_true", help="leave articles.content in place after copying, without its NOT NULL")
+    parser.add_argument("--vacuum", action="store_true", help="rewrite the table afterwards to release the freed space")
+    parser.add_argument("--database-url", default=settings.database_url)
+    args = parser.parse_args()
+    
+    asyncio.run(run(args.database_url, args.batch_size, not args.keep_column, args.vacuum))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
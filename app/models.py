@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean
+from sqlalchemy import DDL, Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Index, column, event, table
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
+from app.compression import CompressedText
 from app.database import Base
 
 
@@ -9,17 +11,131 @@ class Article(Base):
     """Article model for storing Wikipedia articles."""
     
     __tablename__ = "articles"
+    __table_args__ = (
+        Index("ix_articles_parent_id_id", "parent_id", "id"),
+        Index("ix_articles_depth_level_id", "depth_level", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     url = Column(String, unique=True, index=True, nullable=False)
     title = Column(String, nullable=False)
-    content = Column(Text, nullable=False)
+    content_hash = Column(String(64), ForeignKey("article_bodies.hash"), nullable=True)
     depth_level = Column(Integer, nullable=False, default=0)
     summary = Column(Text, nullable=True)
     summary_generated = Column(Boolean, default=False)
+    summary_prompt_tokens = Column(Integer, nullable=True)
+    summary_completion_tokens = Column(Integer, nullable=True)
+    summary_extractive = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     parent_id = Column(Integer, ForeignKey("articles.id"), nullable=True)
     parent = relationship("Article", remote_side=[id], back_populates="children")
-    children = relationship("Article", back_populates="parent") 
\ No newline at end of file
+    children = relationship("Article", back_populates="parent") 
+    # The body is read only where the text is needed, never as a side effect of loading the row.
+    body = relationship("ArticleBody", lazy="raise")
+    
+    @property
+    def content(self) -> str:
+        """Article text; the body must have been loaded with the article."""
+        return self.body.content if self.body is not None else ""
+
+
+class ArticleBody(Base):
+    """Compressed article text stored once per distinct content, keyed by its SHA-256."""
+    
+    __tablename__ = "article_bodies"
+    
+    hash = Column(String(64), primary_key=True)
+    content = Column(CompressedText, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ArticleLink(Base):
+    """Link found on an article page, kept for every extracted link whether or not its target was crawled."""
+    
+    __tablename__ = "article_links"
+    __table_args__ = (Index("ix_article_links_target_url", "target_url"),)
+    
+    source_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    # Targets are joined to articles by URL, so edges to pages stored later resolve without an update.
+    target_url = Column(String, nullable=False)
+
+
+class ArticleSearch(Base):
+    """Full-text search document of an article, a weighted tsvector of its title and text under a GIN index."""
+    
+    __tablename__ = "article_search"
+    __table_args__ = (Index("ix_article_search_document", "document", postgresql_using="gin"),)
+    
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    document = Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=False)
+
+
+# SQLite has no tsvector, so there the index is a contentless FTS5 table whose rowid is the article id;
+# it keeps only the inverted index, the text itself stays compressed in article_bodies.
+article_search_fts = table("article_search_fts", column("rowid"), column("title"), column("content"))
+
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS article_search_fts "
+        "USING fts5(title, content, content = '', tokenize = 'unicode61 remove_diacritics 2')"
+    ).execute_if(dialect="sqlite")
+)
+
+
+class CrawlJob(Base):
+    """Background crawl requested through the API."""
+    
+    __tablename__ = "crawl_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="queued", index=True)
+    pages_fetched = Column(Integer, nullable=False, default=0)
+    pages_queued = Column(Integer, nullable=False, default=0)
+    pages_failed = Column(Integer, nullable=False, default=0)
+    pages_skipped = Column(Integer, nullable=False, default=0)
+    root_article_id = Column(Integer, ForeignKey("articles.id"), nullable=True)
+    error = Column(Text, nullable=True)
+    checkpoint = Column(Text, nullable=True)
+    checkpointed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    # A running job whose lease is not renewed in time belongs to a dead worker and may be queued again.
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class FrontierItem(Base):
+    """URL in the shared crawl frontier, leased by one worker process at a time."""
+    
+    __tablename__ = "crawl_frontier"
+    __table_args__ = (Index("ix_crawl_frontier_claim", "status", "depth", "id"),)
+    
+    id = Column(Integer, primary_key=True)
+    url = Column(String, unique=True, nullable=False)
+    depth = Column(Integer, nullable=False, default=0)
+    max_depth = Column(Integer, nullable=False, default=0)
+    parent_id = Column(Integer, ForeignKey("articles.id"), nullable=True)
+    status = Column(String, nullable=False, default="pending")
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class SummaryCacheEntry(Base):
+    """Generated summary keyed by a hash of the model, prompt template and truncated content."""
+    
+    __tablename__ = "summary_cache"
+    
+    key = Column(String(64), primary_key=True)
+    model = Column(String, nullable=False)
+    summary = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
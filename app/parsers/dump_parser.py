@@ -0,0 +1,134 @@
+import bz2
+import html
+import re
+from typing import Iterator, List, Optional, Tuple
+from lxml import etree
+
+from app.parsers.lxml_extractor import (
+    MAX_LINKS,
+    MAX_PARAGRAPHS,
+    MIN_PARAGRAPH_LENGTH,
+    is_valid_wikipedia_link,
+)
+from app.parsers.mediawiki_api import article_url
+
+
+ARTICLE_NAMESPACE = "0"
+
+# Namespaces whose links embed media or assign categories instead of rendering text.
+FILE_LINK_PREFIXES = ("file", "image", "category", "файл", "изображение", "категория")
+
+_comment = re.compile(r"<!--.*?-->", re.DOTALL)
+_ref = re.compile(r"<ref[^>]*/>|<ref[^>]*>.*?</ref>", re.DOTALL | re.IGNORECASE)
+_innermost_template = re.compile(r"\{\{[^{}]*\}\}")
+_innermost_table = re.compile(r"\{\|(?:(?!\{\|).)*?\|\}", re.DOTALL)
+_heading = re.compile(r"^=+[^=\n].*?=+\s*$", re.MULTILINE)
+_wikilink = re.compile(r"\[\[([^\[\]|]*)(?:\|([^\[\]]*))?\]\]")
+_file_link = re.compile(
+    r"\[\[\s*(?:" + "|".join(FILE_LINK_PREFIXES) + r")\s*:[^\[\]]*(?:\[\[[^\[\]]*\]\][^\[\]]*)*\]\]",
+    re.IGNORECASE
+)
+_external_link = re.compile(r"\[(?:https?:)?//[^\s\]]+(?:\s+([^\]]*))?\]")
+_emphasis = re.compile(r"'{2,}")
+_tag = re.compile(r"<[^>]+>")
+_magic_word = re.compile(r"__[A-ZА-ЯЁ_]+__")
+_spaces = re.compile(r"[ \t]+")
+_blank_line = re.compile(r"\n\s*\n")
+
+DumpPage = Tuple[str, str]
+DumpArticle = Tuple[str, str, List[str]]
+
+
+def iter_dump_pages(path: str) -> Iterator[DumpPage]:
+    """Stream (title, wikitext) of main-namespace, non-redirect pages from an XML dump."""
+    opener = bz2.open if str(path).endswith(".bz2") else open
+    with opener(path, "rb") as stream:
+        for _, page in etree.iterparse(stream, events=("end",), tag="{*}page"):
+            title = page.findtext("{*}title")
+            namespace = page.findtext("{*}ns")
+            is_redirect = page.find("{*}redirect") is not None
+            text = page.findtext("{*}revision/{*}text")
+            
+            # Drop the finished page and everything parsed before it to keep memory flat.
+            page.clear()
+            while page.getprevious() is not None:
+                del page.getparent()[0]
+            
+            if title and namespace == ARTICLE_NAMESPACE and not is_redirect and text:
+                yield title, text
+
+
+def _strip_nested(text: str, pattern: re.Pattern) -> str:
+    """Remove nested constructs by deleting innermost matches until none are left."""
+    while True:
+        text, count = pattern.subn("", text)
+        if not count:
+            return text
+
+
+def _link_target(target: str) -> Optional[str]:
+    """Normalize a wikilink target to a page title, or None for non-article links."""
+    target = target.strip().replace("_", " ")
+    if not target or target.startswith(":") or "#" in target:
+        return None
+    return target[0].upper() + target[1:]
+
+
+def _extract_links(wikitext: str, base_url: str) -> List[str]:
+    """Collect the first internal article links in document order."""
+    links = []
+    seen_links = set()
+    for match in _wikilink.finditer(wikitext):
+        title = _link_target(match.group(1))
+        if title is None:
+            continue
+        url = article_url(base_url, title)
+        if not is_valid_wikipedia_link(url[len(base_url):]) or url in seen_links:
+            continue
+        seen_links.add(url)
+        links.append(url)
+        if len(links) >= MAX_LINKS:
+            break
+    return links
+
+
+def _plain_text(wikitext: str) -> str:
+    """Render wikitext markup of a lead section down to plain text."""
+    text = _strip_nested(wikitext, _innermost_template)
+    text = _strip_nested(text, _innermost_table)
+    text = _strip_nested(text, _file_link)
+    
+    text = _wikilink.sub(lambda m: m.group(2) if m.group(2) is not None else m.group(1), text)
+    text = _external_link.sub(lambda m: m.group(1) or "", text)
+    text = _emphasis.sub("", text)
+    text = _tag.sub("", text)
+    text = _magic_word.sub("", text)
+    return html.unescape(text)
+
+
+def _extract_content(wikitext: str) -> str:
+    """Keep the first long paragraphs of the lead section."""
+    heading = _heading.search(wikitext)
+    lead = _plain_text(wikitext[:heading.start()] if heading else wikitext)
+    
+    paragraphs = []
+    for block in _blank_line.split(lead):
+        lines = [line.strip() for line in block.split("\n")]
+        lines = [line for line in lines if line and line[0] not in "*#:;|!"]
+        text = _spaces.sub(" ", " ".join(lines)).strip()
+        if text and len(text) > MIN_PARAGRAPH_LENGTH:
+            paragraphs.append(text)
+            if len(paragraphs) >= MAX_PARAGRAPHS:
+                break
+    return "\n\n".join(paragraphs)
+
+
+def extract_wikitext(title: str, wikitext: str, base_url: str) -> DumpArticle:
+    """Extract (title, content, links) from raw wikitext."""
+    wikitext = _ref.sub("", _comment.sub("", wikitext))
+    return title, _extract_content(wikitext), _extract_links(wikitext, base_url)
+
+
+def extract_pages(pages: List[DumpPage], base_url: str) -> List[DumpArticle]:
+    """Extract a chunk of dump pages; module level so process pools can pickle it."""
+    return [extract_wikitext(title, wikitext, base_url) for title, wikitext in pages]
\ No newline at end of file
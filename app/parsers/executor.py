@@ -0,0 +1,41 @@
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+from loguru import logger
+
+from app.config import settings
+
+
+PARSER_EXECUTORS = ("none", "thread", "process")
+
+_executor: Optional[Executor] = None
+
+
+def create_parse_executor(mode: str, workers: Optional[int] = None) -> Optional[Executor]:
+    """Create an executor for HTML parsing, or None to parse on the event loop."""
+    if mode not in PARSER_EXECUTORS:
+        raise ValueError(f"Unknown parser executor: {mode}")
+    if mode == "none":
+        return None
+    
+    workers = workers or os.cpu_count() or 1
+    if mode == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="html-parser")
+
+
+def get_parse_executor() -> Optional[Executor]:
+    """Get the process-wide parse executor with lazy initialization."""
+    global _executor
+    if _executor is None and settings.parser_executor != "none":
+        _executor = create_parse_executor(settings.parser_executor, settings.parser_executor_workers)
+        logger.info(f"Started {settings.parser_executor} parse executor")
+    return _executor
+
+
+def shutdown_parse_executor() -> None:
+    """Shut down the process-wide parse executor if it was started."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
\ No newline at end of file
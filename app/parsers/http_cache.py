@@ -0,0 +1,259 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+
+from app.config import settings
+
+
+@dataclass
+class CacheEntry:
+    """Validators, parse result and body reference of one cached page."""
+    
+    url: str
+    body_hash: str
+    size: int
+    encoding: str
+    parsed: Tuple[str, str, List[str]]
+    stored_at: float = field(default_factory=time.time)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers that turn a GET into a revalidation request."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+@dataclass
+class HttpCacheStats:
+    """Hit, miss and byte counters of the page cache."""
+    
+    hits: int = 0
+    misses: int = 0
+    revalidated: int = 0
+    evictions: int = 0
+    bytes_served: int = 0
+    bytes_downloaded: int = 0
+    bytes_stored: int = 0
+    entries: int = 0
+    
+    @property
+    def hit_ratio(self) -> float:
+        """Share of lookups answered without downloading the body."""
+        total = self.hits + self.revalidated + self.misses
+        return (self.hits + self.revalidated) / total if total else 0.0
+    
+    def as_dict(self) -> dict:
+        """Serialize stats for the API."""
+        return {**asdict(self), "hit_ratio": round(self.hit_ratio, 4)}
+
+
+def _url_key(url: str) -> str:
+    """File name of the metadata record for url."""
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+class HttpCache:
+    """Content-addressed on-disk cache of page bodies with LRU eviction by size."""
+    
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None, ttl: Optional[float] = None):
+        self.directory = Path(directory or settings.http_cache_dir)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.http_cache_max_bytes
+        self.ttl = ttl if ttl is not None else settings.http_cache_ttl
+        self.stats = HttpCacheStats()
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._body_refs: Dict[str, int] = {}
+        self._body_sizes: Dict[str, int] = {}
+        self._writing: Dict[str, int] = {}
+        
+        (self.directory / 'meta').mkdir(parents=True, exist_ok=True)
+        (self.directory / 'bodies').mkdir(parents=True, exist_ok=True)
+        self._load()
+    
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Look up a cached page and mark it as recently used."""
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+        return entry
+    
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Whether the entry can be served without asking the server."""
+        return time.time() - entry.stored_at < self.ttl
+    
+    def record_hit(self, entry: CacheEntry) -> None:
+        """Count a fresh entry served straight from disk."""
+        self.stats.hits += 1
+        self.stats.bytes_served += entry.size
+    
+    async def revalidate(self, entry: CacheEntry, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Extend the lifetime of an entry the server answered 304 for."""
+        entry.stored_at = time.time()
+        entry.etag = etag or entry.etag
+        entry.last_modified = last_modified or entry.last_modified
+        self.stats.revalidated += 1
+        self.stats.bytes_served += entry.size
+        await asyncio.to_thread(self._write_meta, entry)
+    
+    async def store(
+        self,
+        url: str,
+        body: bytes,
+        encoding: str,
+        parsed: Tuple[str, str, List[str]],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> Optional[CacheEntry]:
+        """Save a downloaded body and its parse result, evicting old entries if needed."""
+        self.stats.misses += 1
+        self.stats.bytes_downloaded += len(body)
+        if len(body) > self.max_bytes:
+            return None
+        
+        entry = CacheEntry(
+            url=url,
+            body_hash=hashlib.sha256(body).hexdigest(),
+            size=len(body),
+            encoding=encoding,
+            parsed=parsed,
+            etag=etag,
+            last_modified=last_modified
+        )
+        # The body is referenced and the record marked as written before the thread starts,
+        # so an eviction meanwhile cannot delete a body or record this store still points to.
+        self._retain(entry.body_hash, entry.size)
+        self._writing[url] = self._writing.get(url, 0) + 1
+        try:
+            await asyncio.to_thread(self._write_files, entry, body)
+        except BaseException:
+            self._release(entry.body_hash)
+            raise
+        finally:
+            self._writing[url] -= 1
+            if not self._writing[url]:
+                del self._writing[url]
+        
+        previous = self._entries.pop(url, None)
+        self._entries[url] = entry
+        self.stats.entries = len(self._entries)
+        if previous is not None:
+            self._release(previous.body_hash)
+        self._evict()
+        return entry
+    
+    def read_body(self, entry: CacheEntry) -> bytes:
+        """Read the stored body of an entry."""
+        return self._body_path(entry.body_hash).read_bytes()
+    
+    def _load(self) -> None:
+        """Rebuild the in-memory index from metadata files, oldest first."""
+        entries = []
+        for path in (self.directory / 'meta').glob('*.json'):
+            try:
+                data = json.loads(path.read_text(encoding='utf-8'))
+                data['parsed'] = tuple(data['parsed'])
+                entry = CacheEntry(**data)
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                logger.warning(f"Dropping unreadable cache record {path.name}: {str(e)}")
+                path.unlink(missing_ok=True)
+                continue
+            if self._body_path(entry.body_hash).is_file():
+                entries.append(entry)
+        
+        for entry in sorted(entries, key=lambda item: item.stored_at):
+            self._add(entry)
+        self._evict()
+    
+    def _add(self, entry: CacheEntry) -> None:
+        """Put an entry into the index and the body reference counts."""
+        self._entries[entry.url] = entry
+        self._retain(entry.body_hash, entry.size)
+        self.stats.entries = len(self._entries)
+    
+    def _retain(self, body_hash: str, size: int) -> None:
+        """Add one reference to a body."""
+        if body_hash not in self._body_refs:
+            self._body_sizes[body_hash] = size
+            self.stats.bytes_stored += size
+        self._body_refs[body_hash] = self._body_refs.get(body_hash, 0) + 1
+    
+    def _remove(self, url: str) -> None:
+        """Drop an entry from the index together with its metadata record."""
+        entry = self._entries.pop(url, None)
+        if entry is None:
+            return
+        self._release(entry.body_hash)
+        if url not in self._writing:
+            self._meta_path(url).unlink(missing_ok=True)
+        self.stats.entries = len(self._entries)
+    
+    def _release(self, body_hash: str) -> None:
+        """Drop one reference to a body, deleting it once nothing refers to it."""
+        self._body_refs[body_hash] -= 1
+        if not self._body_refs[body_hash]:
+            del self._body_refs[body_hash]
+            self.stats.bytes_stored -= self._body_sizes.pop(body_hash)
+            self._body_path(body_hash).unlink(missing_ok=True)
+    
+    def _evict(self) -> None:
+        """Remove least recently used entries until the bodies fit into max_bytes."""
+        while self.stats.bytes_stored > self.max_bytes and self._entries:
+            url = next(iter(self._entries))
+            self._remove(url)
+            self.stats.evictions += 1
+    
+    def _write_files(self, entry: CacheEntry, body: bytes) -> None:
+        """Persist the body, unless an identical one is stored, and the metadata record."""
+        self._atomic_write(self._body_path(entry.body_hash), body, overwrite=False)
+        self._write_meta(entry)
+    
+    def _write_meta(self, entry: CacheEntry) -> None:
+        """Persist the metadata record of an entry."""
+        self._atomic_write(self._meta_path(entry.url), json.dumps(asdict(entry), ensure_ascii=False).encode('utf-8'))
+    
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes, overwrite: bool = True) -> None:
+        """Write through a temporary file of its own so concurrent writers and readers never see a partial file."""
+        if not overwrite and path.is_file():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{path.name}.", suffix='.tmp', delete=False) as temp_file:
+            temp_file.write(data)
+        temp_path = Path(temp_file.name)
+        if not overwrite and path.is_file():
+            # A content-addressed file written meanwhile by another thread already holds these bytes.
+            temp_path.unlink()
+            return
+        os.replace(temp_path, path)
+    
+    def _body_path(self, body_hash: str) -> Path:
+        """Location of a body named by its content hash."""
+        return self.directory / 'bodies' / body_hash[:2] / body_hash
+    
+    def _meta_path(self, url: str) -> Path:
+        """Location of the metadata record of url."""
+        return self.directory / 'meta' / f"{_url_key(url)}.json"
+
+
+_cache: Optional[HttpCache] = None
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """Get the process-wide page cache with lazy initialization, or None when disabled."""
+    global _cache
+    if _cache is None and settings.http_cache_dir:
+        _cache = HttpCache()
+        logger.info(f"Opened HTTP cache at {settings.http_cache_dir} with {_cache.stats.entries} entries")
+    return _cache
\ No newline at end of file
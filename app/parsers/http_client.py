@@ -0,0 +1,117 @@
+import aiohttp
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+from app.config import settings
+
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+def _accept_encoding() -> str:
+    """Advertise brotli only when aiohttp has a decoder for it."""
+    try:
+        from aiohttp.compression_utils import HAS_BROTLI
+    except ImportError:
+        HAS_BROTLI = False
+    return "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+
+
+@dataclass
+class HttpClientStats:
+    """Connection pool counters collected through aiohttp tracing."""
+    
+    requests: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    dns_cache_hits: int = 0
+    dns_cache_misses: int = 0
+    
+    @property
+    def reuse_ratio(self) -> float:
+        """Share of requests served over an already open connection."""
+        total = self.connections_created + self.connections_reused
+        return self.connections_reused / total if total else 0.0
+    
+    def as_dict(self) -> dict:
+        """Serialize stats for the API."""
+        return {**asdict(self), "reuse_ratio": round(self.reuse_ratio, 4)}
+
+
+class HttpClient:
+    """Long-lived pooled HTTP client shared by all Wikipedia parsers."""
+    
+    def __init__(
+        self,
+        limit: Optional[int] = None,
+        limit_per_host: Optional[int] = None,
+        keepalive_timeout: Optional[float] = None,
+        dns_cache_ttl: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
+        self.limit = limit if limit is not None else settings.http_pool_limit
+        self.limit_per_host = limit_per_host if limit_per_host is not None else settings.http_limit_per_host
+        self.keepalive_timeout = keepalive_timeout if keepalive_timeout is not None else settings.http_keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl if dns_cache_ttl is not None else settings.http_dns_cache_ttl
+        self.timeout = timeout if timeout is not None else settings.http_timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.stats = HttpClientStats()
+    
+    @property
+    def closed(self) -> bool:
+        """Whether the underlying session is unavailable."""
+        return self.session is None or self.session.closed
+    
+    async def start(self) -> None:
+        """Open the pooled session."""
+        if not self.closed:
+            return
+        
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={
+                'User-Agent': USER_AGENT,
+                'Accept-Encoding': _accept_encoding()
+            },
+            trace_configs=[self._trace_config()]
+        )
+    
+    async def close(self) -> None:
+        """Close the pooled session and its connections."""
+        if self.session:
+            await self.session.close()
+        self.session = None
+    
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        """Build tracing hooks that feed the pool statistics."""
+        trace_config = aiohttp.TraceConfig()
+        
+        async def on_request_start(session, context, params):
+            self.stats.requests += 1
+        
+        async def on_connection_create_end(session, context, params):
+            self.stats.connections_created += 1
+        
+        async def on_connection_reuseconn(session, context, params):
+            self.stats.connections_reused += 1
+        
+        async def on_dns_cache_hit(session, context, params):
+            self.stats.dns_cache_hits += 1
+        
+        async def on_dns_cache_miss(session, context, params):
+            self.stats.dns_cache_misses += 1
+        
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace_config
\ No newline at end of file
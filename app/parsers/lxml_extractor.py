@@ -0,0 +1,201 @@
+from typing import List, Optional, Set, Tuple
+from urllib.parse import urljoin
+from lxml import etree, html as lxml_html
+
+
+MAX_PARAGRAPHS = 10
+MIN_PARAGRAPH_LENGTH = 50
+MAX_LINKS = 10
+
+INVALID_LINK_PATTERNS = [
+    ':', '#', 'File:', 'Category:', 'Template:', 'Help:', 'Special:',
+    'Talk:', 'User:', 'Wikipedia:', 'Portal:', 'MediaWiki:'
+]
+
+# BeautifulSoup keeps strings of these tags out of get_text(), so must we.
+NON_TEXT_TAGS = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+
+_find_title = etree.XPath(
+    "//h1[contains(concat(' ', normalize-space(@class), ' '), ' firstHeading ')][1]"
+)
+_find_content_div = etree.XPath("//div[@id='mw-content-text'][1]")
+
+
+def is_valid_wikipedia_link(href: str) -> bool:
+    """Check if link is a valid Wikipedia article link."""
+    if not href or not href.startswith('/wiki/'):
+        return False
+    
+    return not any(pattern in href for pattern in INVALID_LINK_PATTERNS)
+
+
+def element_text(element) -> str:
+    """Concatenate element text the way BeautifulSoup's get_text() does."""
+    parts: List[str] = []
+    _collect_text(element, parts)
+    return "".join(parts)
+
+
+def _collect_text(element, parts: List[str]) -> None:
+    """Append text of element and its descendants, skipping non-text nodes."""
+    if element.text:
+        parts.append(element.text)
+    for child in element:
+        if isinstance(child.tag, str) and child.tag not in NON_TEXT_TAGS:
+            _collect_text(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+
+
+def _inside_non_text(element, stop) -> bool:
+    """Check whether element is nested in a tag whose text is ignored."""
+    for ancestor in element.iterancestors():
+        if ancestor is stop:
+            return False
+        if ancestor.tag in NON_TEXT_TAGS:
+            return True
+    return False
+
+
+def parse_document(html: str):
+    """Parse an HTML page into an lxml tree."""
+    try:
+        return lxml_html.document_fromstring(html)
+    except ValueError:
+        return lxml_html.document_fromstring(html.encode('utf-8'))
+
+
+def extract_article(html: str, base_url: str) -> Tuple[str, str, List[str]]:
+    """Extract title, content and links in a single walk over the content div."""
+    try:
+        root = parse_document(html)
+    except etree.ParserError:
+        return "Unknown Title", "", []
+    
+    title_elements = _find_title(root)
+    title = element_text(title_elements[0]).strip() if title_elements else "Unknown Title"
+    
+    content_divs = _find_content_div(root)
+    if not content_divs:
+        return title, "", []
+    content_div = content_divs[0]
+    
+    paragraphs: List[str] = []
+    links: List[str] = []
+    seen_links: Set[str] = set()
+    
+    for element in content_div.iter('p', 'a'):
+        if element.tag == 'p':
+            if len(paragraphs) < MAX_PARAGRAPHS and not _inside_non_text(element, content_div):
+                text = element_text(element).strip()
+                if text and len(text) > MIN_PARAGRAPH_LENGTH:
+                    paragraphs.append(text)
+        elif len(links) < MAX_LINKS:
+            href = element.get('href')
+            if href is not None and is_valid_wikipedia_link(href):
+                full_url = urljoin(base_url, href)
+                if full_url not in seen_links:
+                    seen_links.add(full_url)
+                    links.append(full_url)
+        
+        if len(paragraphs) >= MAX_PARAGRAPHS and len(links) >= MAX_LINKS:
+            break
+    
+    return title, "\n\n".join(paragraphs), links
+
+
+class StreamingExtractor:
+    """Incremental extractor fed with response chunks as they arrive."""
+    
+    def __init__(self, base_url: str, encoding: Optional[str] = None):
+        self.base_url = base_url
+        self.title: Optional[str] = None
+        self.paragraphs: List[str] = []
+        self.links: List[str] = []
+        self.done = False
+        
+        self._parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding)
+        self._seen_links: Set[str] = set()
+        self._title_element = None
+        self._content_div = None
+        self._content_closed = False
+        self._open_text_elements = 0
+    
+    def feed(self, chunk: bytes) -> bool:
+        """Feed the next chunk; return True once nothing later can change the result."""
+        if not self.done:
+            self._parser.feed(chunk)
+            self._process_events()
+        return self.done
+    
+    def close(self) -> Tuple[str, str, List[str]]:
+        """Finish parsing and return the same tuple as extract_article."""
+        if not self.done:
+            try:
+                self._parser.close()
+            except etree.XMLSyntaxError:
+                pass
+            self._process_events()
+        
+        title = self.title if self.title is not None else "Unknown Title"
+        return title, "\n\n".join(self.paragraphs), self.links
+    
+    def _process_events(self) -> None:
+        """Consume pending parser events."""
+        for event, element in self._parser.read_events():
+            if event == 'start':
+                self._on_start(element)
+            else:
+                self._on_end(element)
+            
+            if self._is_complete():
+                self.done = True
+                return
+    
+    def _on_start(self, element) -> None:
+        """Track title, content div, paragraphs and links as they open."""
+        tag = element.tag
+        if tag == 'h1' and self._title_element is None and 'firstHeading' in (element.get('class') or '').split():
+            self._title_element = element
+            self._open_text_elements += 1
+        elif tag == 'div' and self._content_div is None and element.get('id') == 'mw-content-text':
+            self._content_div = element
+        elif self._in_content():
+            if tag == 'p':
+                self._open_text_elements += 1
+            elif tag == 'a' and len(self.links) < MAX_LINKS:
+                href = element.get('href')
+                if href is not None and is_valid_wikipedia_link(href):
+                    full_url = urljoin(self.base_url, href)
+                    if full_url not in self._seen_links:
+                        self._seen_links.add(full_url)
+                        self.links.append(full_url)
+    
+    def _on_end(self, element) -> None:
+        """Collect finished text elements and drop subtrees nobody needs."""
+        if element is self._title_element:
+            self.title = element_text(element).strip()
+            self._open_text_elements -= 1
+        elif element is self._content_div:
+            self._content_closed = True
+        elif element.tag == 'p' and self._in_content():
+            self._open_text_elements -= 1
+            if len(self.paragraphs) < MAX_PARAGRAPHS and not _inside_non_text(element, self._content_div):
+                text = element_text(element).strip()
+                if text and len(text) > MIN_PARAGRAPH_LENGTH:
+                    self.paragraphs.append(text)
+        
+        if self._open_text_elements == 0 and element is not self._content_div:
+            element.clear(keep_tail=True)
+    
+    def _in_content(self) -> bool:
+        """Whether the parser is currently inside the content div."""
+        return self._content_div is not None and not self._content_closed
+    
+    def _is_complete(self) -> bool:
+        """Whether the title and every needed paragraph and link are known."""
+        if self.title is None:
+            return False
+        if self._content_closed:
+            return True
+        return len(self.paragraphs) >= MAX_PARAGRAPHS and len(self.links) >= MAX_LINKS
\ No newline at end of file
@@ -0,0 +1,152 @@
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote, urlparse
+from loguru import logger
+
+from app.config import settings
+from app.parsers.lxml_extractor import (
+    MAX_LINKS,
+    MAX_PARAGRAPHS,
+    MIN_PARAGRAPH_LENGTH,
+    is_valid_wikipedia_link,
+)
+
+
+API_BATCH_SIZE = 50
+TITLE_SAFE_CHARS = "()_,!'*:;@$/~"
+
+
+def split_article_url(url: str) -> Tuple[str, str]:
+    """Split an article URL into its site base URL and page title."""
+    parsed = urlparse(url)
+    base_url = f"{parsed.scheme}://{parsed.netloc}"
+    title = unquote(parsed.path[len('/wiki/'):]).replace('_', ' ')
+    return base_url, title
+
+
+def article_url(base_url: str, title: str) -> str:
+    """Build the article URL MediaWiki renders for a page title."""
+    return f"{base_url}/wiki/{quote(title.replace(' ', '_'), safe=TITLE_SAFE_CHARS)}"
+
+
+class MediaWikiApi:
+    """Fetch plain-text extracts and links of many pages through api.php."""
+    
+    def __init__(self, session, api_path: Optional[str] = None, batch_size: int = API_BATCH_SIZE):
+        self.session = session
+        self.api_path = api_path or settings.mediawiki_api_path
+        self.batch_size = batch_size
+        self.requests = 0
+    
+    async def fetch(self, urls: List[str]) -> Dict[str, Tuple[str, str, List[str]]]:
+        """Resolve article URLs to (title, content, links); missing pages are left out."""
+        titles_by_site: Dict[str, Dict[str, str]] = {}
+        for url in urls:
+            base_url, title = split_article_url(url)
+            titles_by_site.setdefault(base_url, {})[title] = url
+        
+        results: Dict[str, Tuple[str, str, List[str]]] = {}
+        for base_url, urls_by_title in titles_by_site.items():
+            titles = list(urls_by_title)
+            for start in range(0, len(titles), self.batch_size):
+                batch = titles[start:start + self.batch_size]
+                pages = await self._query(base_url, batch)
+                for title in batch:
+                    if title in pages:
+                        results[urls_by_title[title]] = pages[title]
+        return results
+    
+    async def _query(self, base_url: str, titles: List[str]) -> Dict[str, Tuple[str, str, List[str]]]:
+        """Run one multi-title query, following continuations until complete."""
+        params = {
+            'action': 'query',
+            'format': 'json',
+            'formatversion': '2',
+            'prop': 'extracts|links',
+            'titles': '|'.join(titles),
+            'redirects': '1',
+            'exintro': '1',
+            'explaintext': '1',
+            'exsectionformat': 'plain',
+            'exlimit': 'max',
+            'plnamespace': '0',
+            'pllimit': 'max',
+        }
+        extracts: Dict[str, str] = {}
+        links: Dict[str, List[str]] = {}
+        missing = set()
+        aliases: Dict[str, str] = {}
+        continuation: Dict[str, str] = {}
+        
+        while True:
+            self.requests += 1
+            async with self.session.get(f"{base_url}{self.api_path}", params={**params, **continuation}) as response:
+                if response.status != 200:
+                    raise ValueError(f"MediaWiki API request failed: {response.status}")
+                data = await response.json(content_type=None)
+            
+            if 'error' in data:
+                raise ValueError(f"MediaWiki API error: {data['error'].get('info', data['error'])}")
+            
+            query = data.get('query', {})
+            for mapping in query.get('normalized', []) + query.get('redirects', []):
+                aliases[mapping['from']] = mapping['to']
+            
+            for page in query.get('pages', []):
+                title = page['title']
+                if page.get('missing') or page.get('invalid'):
+                    missing.add(title)
+                    continue
+                if page.get('extract') is not None:
+                    extracts[title] = page['extract']
+                for link in page.get('links', []):
+                    links.setdefault(title, []).append(link['title'])
+            
+            if 'continue' not in data:
+                break
+            continuation = data['continue']
+        
+        results = {}
+        for requested in titles:
+            title = requested
+            seen = {title}
+            while title in aliases and aliases[title] not in seen:
+                title = aliases[title]
+                seen.add(title)
+            
+            if title in missing or (title not in extracts and title not in links):
+                logger.warning(f"MediaWiki API returned no page for {requested}")
+                continue
+            
+            results[requested] = (
+                title,
+                self._build_content(extracts.get(title, "")),
+                self._build_links(base_url, links.get(title, []))
+            )
+        return results
+    
+    @staticmethod
+    def _build_content(extract: str) -> str:
+        """Keep the first long paragraphs of a plain-text extract."""
+        paragraphs = []
+        for line in extract.split('\n'):
+            text = line.strip()
+            if text and len(text) > MIN_PARAGRAPH_LENGTH:
+                paragraphs.append(text)
+                if len(paragraphs) >= MAX_PARAGRAPHS:
+                    break
+        return "\n\n".join(paragraphs)
+    
+    @staticmethod
+    def _build_links(base_url: str, titles: List[str]) -> List[str]:
+        """Turn linked page titles into article URLs using the HTML link rules."""
+        links = []
+        seen_links = set()
+        for title in titles:
+            url = article_url(base_url, title)
+            if not is_valid_wikipedia_link(url[len(base_url):]) or url in seen_links:
+                continue
+            seen_links.add(url)
+            links.append(url)
+            if len(links) >= MAX_LINKS:
+                break
+        return links
\ No newline at end of file
@@ -1,26 +1,96 @@
-import aiohttp
+import asyncio
 from bs4 import BeautifulSoup
-from typing import List, Set, Tuple
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
 import re
 from urllib.parse import urljoin, urlparse
+from aiohttp.compression_utils import HAS_BROTLI, BrotliDecompressor, ZLibDecompressor
+
+from app.config import settings
+from app.parsers.http_client import HttpClient
+from app.parsers import lxml_extractor
+from app.parsers.executor import get_parse_executor
+from app.parsers.http_cache import HttpCache, get_http_cache
+from app.parsers.mediawiki_api import MediaWikiApi
+
+
+PARSER_BACKENDS = ("bs4", "lxml")
+FETCH_BACKENDS = ("html", "api")
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+@dataclass
+class ParserStats:
+    """Download counters of streamed pages, in bytes as sent over the wire, compressed or not."""
+    
+    pages_streamed: int = 0
+    pages_truncated: int = 0
+    bytes_read: int = 0
+    bytes_saved: int = 0
+
+
+def _body_decoder(content_encoding: str):
+    """Incremental decoder of a Content-Encoding, as aiohttp would apply it; None for an unencoded body."""
+    content_encoding = content_encoding.strip().lower()
+    if content_encoding in ('', 'identity'):
+        return None
+    if content_encoding in ('gzip', 'deflate'):
+        return ZLibDecompressor(encoding=content_encoding)
+    if content_encoding == 'br' and HAS_BROTLI:
+        return BrotliDecompressor()
+    raise ValueError(f"Unsupported Content-Encoding: {content_encoding}")
 
 
 class WikipediaParser:
     """Parser for extracting content from Wikipedia articles."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        http_client: Optional[HttpClient] = None,
+        backend: Optional[str] = None,
+        streaming: Optional[bool] = None,
+        executor: Optional[Executor] = None,
+        fetch_backend: Optional[str] = None,
+        cache: Optional[HttpCache] = None
+    ):
         self.session = None
         self.base_url = None
+        self.http_client = http_client
+        self.backend = backend or settings.parser_backend
+        self.streaming = settings.parser_streaming if streaming is None else streaming
+        self.stats = ParserStats()
+        self.executor = executor
+        self.fetch_backend = fetch_backend or settings.fetch_backend
+        self.cache = cache
+        self._own_client: Optional[HttpClient] = None
+        
+        if self.backend not in PARSER_BACKENDS:
+            raise ValueError(f"Unknown parser backend: {self.backend}")
+        if self.fetch_backend not in FETCH_BACKENDS:
+            raise ValueError(f"Unknown fetch backend: {self.fetch_backend}")
+    
+    @property
+    def batch_size(self) -> int:
+        """How many articles one parse_articles call can resolve in a round trip."""
+        return settings.mediawiki_api_batch_size if self.fetch_backend == "api" else 1
     
     async def __aenter__(self):
         """Async context manager entry."""
-        self.session = aiohttp.ClientSession()
+        if self.http_client and not self.http_client.closed:
+            self.session = self.http_client.session
+        else:
+            self._own_client = HttpClient()
+            await self._own_client.start()
+            self.session = self._own_client.session
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
-        if self.session:
-            await self.session.close()
+        if self._own_client:
+            await self._own_client.close()
+            self._own_client = None
+        self.session = None
     
     async def parse_article(self, url: str) -> Tuple[str, str, List[str]]:
         """Parse Wikipedia article and extract title, content, and links."""
@@ -28,30 +98,145 @@ class WikipediaParser:
             raise RuntimeError("Parser must be used as async context manager")
         
         parsed_url = urlparse(url)
-        self.base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+        self.base_url = base_url
+        
+        if self.fetch_backend == "api":
+            results = await self.parse_articles([url])
+            if url not in results:
+                raise ValueError(f"Error parsing article {url}: page not found")
+            return results[url]
         
         try:
-            timeout = aiohttp.ClientTimeout(total=30)
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
+            cache = self.cache or get_http_cache()
+            if cache is not None:
+                return await self._parse_cached(cache, url, base_url)
             
-            async with self.session.get(url, timeout=timeout, headers=headers) as response:
+            # A streamed body is decoded here, so the bytes read can be counted before decompression.
+            async with self.session.get(url, auto_decompress=not self.streaming) as response:
                 if response.status != 200:
                     raise ValueError(f"Failed to fetch article: {response.status}")
                 
-                html_content = await response.text()
-                soup = BeautifulSoup(html_content, 'lxml')
+                if self.streaming:
+                    return await self._extract_streaming(response, base_url)
                 
-                title = self._extract_title(soup)
-                content = self._extract_content(soup)
-                links = self._extract_links(soup)
+                executor = self.executor or get_parse_executor()
+                if executor is not None:
+                    body = await response.read()
+                    return await self.extract_in_executor(executor, body, response.get_encoding(), base_url)
                 
-                return title, content, links
+                html_content = await response.text()
+                return self.extract(html_content, base_url)
         
         except Exception as e:
             raise ValueError(f"Error parsing article {url}: {str(e)}")
     
+    async def parse_articles(self, urls: List[str]) -> Dict[str, Tuple[str, str, List[str]]]:
+        """Parse several articles; URLs that could not be parsed are left out."""
+        if not self.session:
+            raise RuntimeError("Parser must be used as async context manager")
+        
+        if self.fetch_backend == "api":
+            try:
+                return await MediaWikiApi(self.session, batch_size=self.batch_size).fetch(urls)
+            except Exception as e:
+                raise ValueError(f"Error fetching articles through MediaWiki API: {str(e)}")
+        
+        results = await asyncio.gather(*(self.parse_article(url) for url in urls), return_exceptions=True)
+        return {
+            url: result for url, result in zip(urls, results)
+            if not isinstance(result, BaseException)
+        }
+    
+    async def _parse_cached(self, cache: HttpCache, url: str, base_url: str) -> Tuple[str, str, List[str]]:
+        """Serve a page from the on-disk cache, revalidating or downloading it when stale."""
+        entry = cache.get(url)
+        if entry is not None and cache.is_fresh(entry):
+            cache.record_hit(entry)
+            return entry.parsed
+        
+        headers = entry.conditional_headers() if entry is not None else {}
+        async with self.session.get(url, headers=headers) as response:
+            if response.status == 304 and entry is not None:
+                await cache.revalidate(entry, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                return entry.parsed
+            
+            if response.status != 200:
+                raise ValueError(f"Failed to fetch article: {response.status}")
+            
+            body = await response.read()
+            encoding = response.get_encoding()
+        
+        executor = self.executor or get_parse_executor()
+        if executor is not None:
+            parsed = await self.extract_in_executor(executor, body, encoding, base_url)
+        else:
+            parsed = extract_page(body, encoding, base_url, self.backend)
+        
+        await cache.store(
+            url,
+            body,
+            encoding,
+            parsed,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified')
+        )
+        return parsed
+    
+    def extract(self, html_content: str, base_url: str) -> Tuple[str, str, List[str]]:
+        """Extract title, content and links from page HTML with the configured backend."""
+        if self.backend == "lxml":
+            return lxml_extractor.extract_article(html_content, base_url)
+        
+        soup = BeautifulSoup(html_content, 'lxml')
+        
+        title = self._extract_title(soup)
+        content = self._extract_content(soup)
+        links = self._extract_links(soup, base_url)
+        
+        return title, content, links
+    
+    async def extract_in_executor(
+        self,
+        executor: Executor,
+        body: bytes,
+        encoding: str,
+        base_url: str
+    ) -> Tuple[str, str, List[str]]:
+        """Parse raw page bytes off the event loop; only the compact tuple comes back."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, extract_page, body, encoding, base_url, self.backend)
+    
+    async def _extract_streaming(self, response, base_url: str) -> Tuple[str, str, List[str]]:
+        """Parse the body while it downloads and drop the connection once done."""
+        extractor = lxml_extractor.StreamingExtractor(base_url, encoding=response.charset)
+        decoder = _body_decoder(response.headers.get('Content-Encoding', ''))
+        bytes_read = 0
+        
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            bytes_read += len(chunk)
+            if decoder is not None:
+                chunk = decoder.decompress_sync(chunk)
+            if chunk and extractor.feed(chunk):
+                break
+        else:
+            tail = decoder.flush() if decoder is not None else b''
+            if tail:
+                extractor.feed(tail)
+        
+        result = extractor.close()
+        
+        self.stats.pages_streamed += 1
+        self.stats.bytes_read += bytes_read
+        if extractor.done and not response.content.at_eof():
+            self.stats.pages_truncated += 1
+            # Content-Length is the length of the encoded body, the same unit as bytes_read.
+            if response.content_length:
+                self.stats.bytes_saved += max(response.content_length - bytes_read, 0)
+            response.close()
+        
+        return result
+    
     def _extract_title(self, soup: BeautifulSoup) -> str:
         """Extract article title."""
         title_element = soup.find('h1', {'class': 'firstHeading'})
@@ -73,7 +258,7 @@ class WikipediaParser:
         
         return "\n\n".join(content_parts[:10])
     
-    def _extract_links(self, soup: BeautifulSoup) -> List[str]:
+    def _extract_links(self, soup: BeautifulSoup, base_url: Optional[str] = None) -> List[str]:
         """Extract Wikipedia article links from content."""
         content_div = soup.find('div', {'id': 'mw-content-text'})
         if not content_div:
@@ -86,7 +271,7 @@ class WikipediaParser:
             href = link.get('href')
             
             if self._is_valid_wikipedia_link(href):
-                full_url = urljoin(self.base_url, href)
+                full_url = urljoin(base_url or self.base_url, href)
                 
                 if full_url not in seen_links:
                     seen_links.add(full_url)
@@ -99,18 +284,16 @@ class WikipediaParser:
     
     def _is_valid_wikipedia_link(self, href: str) -> bool:
         """Check if link is a valid Wikipedia article link."""
-        if not href or not href.startswith('/wiki/'):
-            return False
-        
-        invalid_patterns = [
-            ':', '#', 'File:', 'Category:', 'Template:', 'Help:', 'Special:', 
-            'Talk:', 'User:', 'Wikipedia:', 'Portal:', 'MediaWiki:'
-        ]
-        
-        return not any(pattern in href for pattern in invalid_patterns)
+        return lxml_extractor.is_valid_wikipedia_link(href)
     
     @staticmethod
     def is_wikipedia_url(url: str) -> bool:
         """Check if URL is a Wikipedia URL."""
         parsed = urlparse(url)
-        return 'wikipedia.org' in parsed.netloc and '/wiki/' in parsed.path 
\ No newline at end of file
+        return 'wikipedia.org' in parsed.netloc and '/wiki/' in parsed.path 
+
+
+def extract_page(body: bytes, encoding: str, base_url: str, backend: str) -> Tuple[str, str, List[str]]:
+    """Decode and extract a page; module-level so process pools can pickle it."""
+    html_content = body.decode(encoding or 'utf-8', errors='replace')
+    return WikipediaParser(backend=backend, streaming=False).extract(html_content, base_url)
\ No newline at end of file
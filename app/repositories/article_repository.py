@@ -1,12 +1,41 @@
-from typing import Optional, List
+import html
+import re
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, List, Sequence, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
-from sqlalchemy.orm import selectinload
+from sqlalchemy import (
+    Integer, Row, String, Text, and_, any_, bindparam, column, delete, func, literal, literal_column, or_, select, update, values
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import aliased, joinedload, selectinload
 
-from app.models import Article
+from app.compression import content_hash
+from app.config import settings
+from app.models import Article, ArticleBody, ArticleLink, ArticleSearch, article_search_fts
 from app.schemas import ArticleCreate
 
 
+ARTICLE_LIST_FIELDS = (
+    "id", "url", "title", "depth_level", "parent_id", "summary", "summary_generated",
+    "summary_extractive", "created_at", "updated_at", "content"
+)
+
+SNIPPET_START = "<b>"
+SNIPPET_STOP = "</b>"
+SNIPPET_WORDS = 24
+# Matches are marked with private-use characters and the text is HTML-escaped before the marks become tags.
+HIGHLIGHT_START = "\ue000"
+HIGHLIGHT_STOP = "\ue001"
+STRIP_HIGHLIGHTS = str.maketrans("", "", HIGHLIGHT_START + HIGHLIGHT_STOP)
+# FTS5 bm25 weight of the title column against the text; tsvector ranking weighs title (A) over text (B) itself.
+FTS_TITLE_WEIGHT = 10.0
+SEARCH_WORD_RE = re.compile(r"\w+")
+# FTS5 has no Russian stemmer, so common inflection endings are cut and the rest matched as a prefix.
+RUSSIAN_ENDING_RE = re.compile(
+    r"(?:иями|ями|ами|ого|его|ому|ему|ыми|ими|ией|ой|ей|ий|ый|ым|им|ых|их|ая|яя|ое|ее|ые|ие|ов|ев|ам|ям|ах|ях|ом|ем|ую|юю|а|я|о|е|ы|и|у|ю|ь)$"
+)
+
+
 class ArticleRepository:
     """Repository for managing articles in database."""
     
@@ -15,19 +44,195 @@ class ArticleRepository:
     
     async def create(self, article_data: ArticleCreate) -> Article:
         """Create a new article in database."""
-        article = Article(**article_data.model_dump())
+        data = article_data.model_dump()
+        data["content_hash"] = (await self.store_bodies([data.pop("content")]))[0]
+        article = Article(**data)
         self.session.add(article)
+        await self.session.flush()
+        await self.index_search([(article.id, article_data.title, article_data.content)])
         await self.session.commit()
-        await self.session.refresh(article)
+        await self.session.refresh(article, ["body"])
         return article
     
-    async def get_by_url(self, url: str) -> Optional[Article]:
-        """Get article by URL."""
+    async def create_many(self, articles_data: List[ArticleCreate], commit: bool = True) -> Dict[str, int]:
+        """Insert articles in one statement, skipping URLs that already exist; returns url -> id of new rows."""
+        if not articles_data:
+            return {}
+        
+        statement = (
+            self._insert(Article)
+            .on_conflict_do_nothing(index_elements=[Article.url])
+            .returning(Article.id, Article.url)
+        )
+        hashes = await self.store_bodies(article_data.content for article_data in articles_data)
+        rows = [
+            {"summary_generated": False, **article_data.model_dump(exclude={"content"}), "content_hash": body_hash}
+            for article_data, body_hash in zip(articles_data, hashes)
+        ]
+        result = await self.session.execute(statement, rows)
+        created = {url: article_id for article_id, url in result.all()}
+        # The first copy of a URL repeated within the batch is the one that got inserted.
+        documents = {}
+        for article_data in articles_data:
+            if article_data.url in created and article_data.url not in documents:
+                documents[article_data.url] = (created[article_data.url], article_data.title, article_data.content)
+        await self.index_search(list(documents.values()))
+        if commit:
+            await self.session.commit()
+        return created
+    
+    async def store_bodies(self, texts: Iterable[str]) -> List[str]:
+        """Store the distinct texts not stored yet in one statement; returns the body hash of every text in order."""
+        texts = list(texts)
+        hashes = [content_hash(text) for text in texts]
+        bodies = dict(zip(hashes, texts))
+        if bodies:
+            await self.session.execute(
+                self._insert(ArticleBody).on_conflict_do_nothing(index_elements=[ArticleBody.hash]),
+                [{"hash": body_hash, "content": text} for body_hash, text in bodies.items()]
+            )
+        return hashes
+    
+    async def index_search(self, documents: Sequence[Tuple[int, str, str]]) -> None:
+        """Add (article_id, title, content) documents to the full-text index in one statement."""
+        if not documents:
+            return
+        
+        if self.session.bind.dialect.name == "sqlite":
+            await self.session.execute(
+                sqlite.insert(article_search_fts),
+                [{"rowid": article_id, "title": title, "content": text} for article_id, title, text in documents]
+            )
+            return
+        
+        document = func.setweight(func.to_tsvector(settings.search_config, bindparam("search_title")), "A").op("||")(
+            func.setweight(func.to_tsvector(settings.search_config, bindparam("search_content")), "B")
+        )
+        await self.session.execute(
+            postgresql.insert(ArticleSearch)
+            .values(article_id=bindparam("search_article_id"), document=document)
+            .on_conflict_do_nothing(index_elements=[ArticleSearch.article_id]),
+            [
+                {"search_article_id": article_id, "search_title": title, "search_content": text}
+                for article_id, title, text in documents
+            ]
+        )
+    
+    async def get_unindexed_documents(self, after_id: int, limit: int) -> List[Row]:
+        """Select (id, title, content) of up to limit articles above after_id that are missing from the full-text index."""
+        if self.session.bind.dialect.name == "sqlite":
+            indexed = select(article_search_fts.c.rowid)
+        else:
+            indexed = select(ArticleSearch.article_id)
+        result = await self.session.execute(
+            select(Article.id, Article.title, ArticleBody.content)
+            .outerjoin(ArticleBody, ArticleBody.hash == Article.content_hash)
+            .where(Article.id > after_id, Article.id.not_in(indexed))
+            .order_by(Article.id)
+            .limit(limit)
+        )
+        return result.all()
+    
+    async def add_links(self, links: Dict[int, Sequence[str]], commit: bool = True) -> int:
+        """Store the extracted links of several source articles in page order, replacing links stored under their ids before."""
+        records = [(source_id, position, url) for source_id, urls in links.items() for position, url in enumerate(urls)]
+        if records:
+            await self.session.execute(delete(ArticleLink).where(ArticleLink.source_id.in_(list(links))))
+            if self.session.bind.dialect.driver == "asyncpg":
+                # COPY streams the rows in one round trip without planning a statement per row; it runs on the
+                # driver connection inside the transaction the DELETE above has opened.
+                connection = await (await self.session.connection()).get_raw_connection()
+                await connection.driver_connection.copy_records_to_table(
+                    ArticleLink.__tablename__, records=records, columns=["source_id", "position", "target_url"]
+                )
+            else:
+                await self.session.execute(
+                    self._insert(ArticleLink),
+                    [{"source_id": source_id, "position": position, "target_url": url} for source_id, position, url in records]
+                )
+        if commit:
+            await self.session.commit()
+        return len(records)
+    
+    async def get_out_links(self, article_id: int) -> List[Row]:
+        """Links of one article in page order as (position, target_url, target_id, target_title); targets not stored have no id."""
         result = await self.session.execute(
-            select(Article).where(Article.url == url)
+            select(
+                ArticleLink.position, ArticleLink.target_url, Article.id.label("target_id"), Article.title.label("target_title")
+            )
+            .outerjoin(Article, Article.url == ArticleLink.target_url)
+            .where(ArticleLink.source_id == article_id)
+            .order_by(ArticleLink.position)
+        )
+        return result.all()
+    
+    async def get_in_links(self, url: str, after_id: Optional[int] = None, limit: int = 100) -> List[Row]:
+        """Articles linking to url as (id, url, title, position) rows in id order, continuing after after_id."""
+        statement = (
+            select(Article.id, Article.url, Article.title, ArticleLink.position)
+            .join(ArticleLink, ArticleLink.source_id == Article.id)
+            .where(ArticleLink.target_url == url)
+            .order_by(Article.id)
+            .limit(limit)
         )
+        if after_id is not None:
+            statement = statement.where(Article.id > after_id)
+        result = await self.session.execute(statement)
+        return result.all()
+    
+    async def set_parents(self, parent_links: List[Tuple[int, int]], commit: bool = True) -> None:
+        """Assign parents to already stored articles given (article_id, parent_id) pairs."""
+        await self.session.execute(
+            update(Article),
+            [{"id": article_id, "parent_id": parent_id} for article_id, parent_id in parent_links]
+        )
+        if commit:
+            await self.session.commit()
+    
+    def _insert(self, table):
+        """INSERT construct of the session's dialect, which knows ON CONFLICT."""
+        if self.session.bind.dialect.name == "sqlite":
+            return sqlite.insert(table)
+        return postgresql.insert(table)
+    
+    async def get_by_url(self, url: str, with_content: bool = False) -> Optional[Article]:
+        """Get article by URL, with its body only when asked."""
+        statement = select(Article).where(Article.url == url)
+        if with_content:
+            statement = statement.options(joinedload(Article.body))
+        result = await self.session.execute(statement)
         return result.scalar_one_or_none()
     
+    async def get_content(self, article_id: int) -> Optional[str]:
+        """Load the text of one article."""
+        result = await self.session.execute(
+            select(ArticleBody.content)
+            .join(Article, Article.content_hash == ArticleBody.hash)
+            .where(Article.id == article_id)
+        )
+        return result.scalar_one_or_none()
+    
+    async def get_ids_by_urls(self, urls: List[str]) -> Dict[str, int]:
+        """Resolve URLs to ids of stored articles in one query; unknown URLs are left out."""
+        if not urls:
+            return {}
+        
+        if self.session.bind.dialect.name == "postgresql":
+            condition = Article.url == any_(bindparam("urls", list(urls), type_=ARRAY(String)))
+        else:
+            condition = Article.url.in_(urls)
+        
+        result = await self.session.execute(select(Article.url, Article.id).where(condition))
+        return dict(result.all())
+    
+    async def iter_urls(self, batch_size: int = 10000) -> AsyncIterator[str]:
+        """Stream the URLs of all stored articles without loading the table into memory."""
+        result = await self.session.stream_scalars(
+            select(Article.url).execution_options(yield_per=batch_size)
+        )
+        async for url in result:
+            yield url
+    
     async def get_by_id(self, article_id: int) -> Optional[Article]:
         """Get article by ID with children."""
         result = await self.session.execute(
@@ -37,6 +242,66 @@ class ArticleRepository:
         )
         return result.scalar_one_or_none()
     
+    async def get_tree(self, url: str, max_depth: int, include_content: bool = True) -> List[Row]:
+        """Load an article and its descendants down to max_depth levels below it in one recursive query, parents first."""
+        def columns(table) -> list:
+            selected = [
+                table.id, table.url, table.title, table.depth_level, table.summary, table.summary_generated,
+                table.created_at, table.updated_at, table.parent_id
+            ]
+            return selected + [table.content_hash] if include_content else selected
+        
+        tree = (
+            select(*columns(Article), literal(0).label("level"))
+            .where(Article.url == url)
+            .cte("tree", recursive=True)
+        )
+        child = aliased(Article)
+        tree = tree.union_all(
+            select(*columns(child), (tree.c.level + 1).label("level"))
+            .join(tree, child.parent_id == tree.c.id)
+            .where(tree.c.level < max_depth)
+        )
+        statement = select(tree).order_by(tree.c.level, tree.c.id)
+        if include_content:
+            statement = (
+                select(*(column for column in tree.c if column.name != "content_hash"), ArticleBody.content)
+                .outerjoin(ArticleBody, ArticleBody.hash == tree.c.content_hash)
+                .order_by(tree.c.level, tree.c.id)
+            )
+        result = await self.session.execute(statement)
+        return result.all()
+    
+    async def list_page(
+        self,
+        fields: Sequence[str],
+        after_id: Optional[int] = None,
+        limit: int = 100,
+        depth_level: Optional[int] = None,
+        parent_id: Optional[int] = None,
+        summary_generated: Optional[bool] = None
+    ) -> List[Row]:
+        """Select the given columns of up to limit articles with id above after_id, in id order."""
+        # Seeking past the last id reads only the rows returned, however deep the page; OFFSET would scan all skipped ones.
+        statement = (
+            select(*(ArticleBody.content if field == "content" else getattr(Article, field) for field in fields))
+            .order_by(Article.id)
+            .limit(limit)
+        )
+        if "content" in fields:
+            statement = statement.outerjoin(ArticleBody, ArticleBody.hash == Article.content_hash)
+        if after_id is not None:
+            statement = statement.where(Article.id > after_id)
+        if depth_level is not None:
+            statement = statement.where(Article.depth_level == depth_level)
+        if parent_id is not None:
+            statement = statement.where(Article.parent_id == parent_id)
+        if summary_generated is not None:
+            statement = statement.where(Article.summary_generated == summary_generated)
+        
+        result = await self.session.execute(statement)
+        return result.all()
+    
     async def get_root_articles_without_summary(self) -> List[Article]:
         """Get root articles that don't have summary generated."""
         result = await self.session.execute(
@@ -47,12 +312,166 @@ class ArticleRepository:
         )
         return result.scalars().all()
     
-    async def update_summary(self, article_id: int, summary: str) -> None:
-        """Update article summary."""
+    async def search(
+        self,
+        query: str,
+        limit: int = 20,
+        after: Optional[Tuple[float, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """Rank articles matching the query, best first, with highlighted snippets; after is the (rank, id) of the last hit seen."""
+        if self.session.bind.dialect.name == "sqlite":
+            return await self._search_fts(query, limit, after)
+        
+        tsquery = func.websearch_to_tsquery(settings.search_config, query)
+        rank = func.ts_rank_cd(ArticleSearch.document, tsquery)
+        statement = (
+            select(Article.id, Article.url, Article.title, rank.label("rank"))
+            .join(ArticleSearch, ArticleSearch.article_id == Article.id)
+            .where(ArticleSearch.document.op("@@")(tsquery))
+        )
+        result = await self.session.execute(self._after_hit(statement, rank, Article.id, after, limit))
+        hits = [dict(row._mapping) for row in result.all()]
+        if not hits:
+            return hits
+        
+        # Bodies are compressed, so only the text of this page is decompressed and handed back for ts_headline.
+        texts = await self._texts([hit["id"] for hit in hits])
+        page = values(column("id", Integer), column("body", Text), name="page").data(
+            [(hit["id"], texts.get(hit["id"], "").translate(STRIP_HIGHLIGHTS)) for hit in hits]
+        )
+        options = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}"
+        snippets = dict((await self.session.execute(
+            select(page.c.id, func.ts_headline(settings.search_config, page.c.body, tsquery, options))
+        )).all())
+        for hit in hits:
+            hit["snippet"] = _snippet_html(snippets[hit["id"]])
+        return hits
+    
+    async def _search_fts(self, query: str, limit: int, after: Optional[Tuple[float, int]]) -> List[Dict[str, Any]]:
+        """SQLite search: bm25 ranking over the FTS5 index, then snippets of the returned page only."""
+        stems = [_stem(word) for word in SEARCH_WORD_RE.findall(query.lower())]
+        if not stems:
+            return []
+        
+        fts = literal_column(article_search_fts.name)
+        # bm25 is lower for better matches; negated it orders like ts_rank_cd.
+        rank = -func.bm25(fts, FTS_TITLE_WEIGHT, 1.0)
+        statement = (
+            select(article_search_fts.c.rowid.label("id"), rank.label("rank"))
+            .where(fts.op("MATCH")(" ".join(f'"{stem}"*' for stem in stems)))
+        )
+        ranked = (await self.session.execute(
+            self._after_hit(statement, rank, article_search_fts.c.rowid, after, limit)
+        )).all()
+        if not ranked:
+            return []
+        
+        # FTS5 would build a snippet for every match before the sort, so the page is highlighted here instead.
+        articles = {
+            row.id: row for row in (await self.session.execute(
+                select(Article.id, Article.url, Article.title, ArticleBody.content)
+                .outerjoin(ArticleBody, ArticleBody.hash == Article.content_hash)
+                .where(Article.id.in_([hit.id for hit in ranked]))
+            )).all()
+        }
+        return [
+            {
+                "id": hit.id,
+                "url": articles[hit.id].url,
+                "title": articles[hit.id].title,
+                "rank": hit.rank,
+                "snippet": _highlight(articles[hit.id].content or "", stems)
+            }
+            for hit in ranked
+        ]
+    
+    async def _texts(self, article_ids: Sequence[int]) -> Dict[int, str]:
+        """Load the text of several articles by id."""
+        result = await self.session.execute(
+            select(Article.id, ArticleBody.content)
+            .join(ArticleBody, ArticleBody.hash == Article.content_hash)
+            .where(Article.id.in_(article_ids))
+        )
+        return dict(result.all())
+    
+    @staticmethod
+    def _after_hit(statement, rank, article_id, after: Optional[Tuple[float, int]], limit: int):
+        """Order hits by rank then id and continue after the (rank, id) cursor instead of an OFFSET."""
+        if after is not None:
+            after_rank, after_id = after
+            statement = statement.where(or_(rank < after_rank, and_(rank == after_rank, article_id > after_id)))
+        return statement.order_by(rank.desc(), article_id).limit(limit)
+    
+    async def iter_root_articles_without_summary(self, batch_size: int = 100) -> AsyncIterator[Row]:
+        """Stream (id, title, content) of root articles without a summary, one keyset page per query."""
+        # Plain rows stay out of the identity map, and keyset pages survive the commits made between them.
+        last_id = 0
+        while True:
+            result = await self.session.execute(
+                select(Article.id, Article.title, ArticleBody.content)
+                .outerjoin(ArticleBody, ArticleBody.hash == Article.content_hash)
+                .where(
+                    Article.parent_id.is_(None),
+                    Article.summary_generated == False,
+                    Article.id > last_id
+                )
+                .order_by(Article.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            for row in rows:
+                yield row
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1].id
+    
+    async def update_summaries(
+        self,
+        summaries: Dict[int, str],
+        usage: Optional[Dict[int, Tuple[int, int]]] = None,
+        extractive: Optional[Set[int]] = None
+    ) -> None:
+        """Store several summaries with their (prompt, completion) token usage in one statement and commit once."""
+        if not summaries:
+            return
+        
+        usage = usage or {}
+        extractive = extractive or set()
+        await self.session.execute(
+            update(Article),
+            [
+                {
+                    "id": article_id,
+                    "summary": summary,
+                    "summary_generated": True,
+                    "summary_prompt_tokens": usage[article_id][0] if article_id in usage else None,
+                    "summary_completion_tokens": usage[article_id][1] if article_id in usage else None,
+                    "summary_extractive": article_id in extractive
+                }
+                for article_id, summary in summaries.items()
+            ]
+        )
+        await self.session.commit()
+    
+    async def update_summary(
+        self,
+        article_id: int,
+        summary: str,
+        extractive: bool = False,
+        usage: Optional[Tuple[int, int]] = None
+    ) -> None:
+        """Update article summary with its (prompt, completion) token usage, if any."""
+        prompt_tokens, completion_tokens = usage if usage is not None else (None, None)
         await self.session.execute(
             update(Article)
             .where(Article.id == article_id)
-            .values(summary=summary, summary_generated=True)
+            .values(
+                summary=summary,
+                summary_generated=True,
+                summary_extractive=extractive,
+                summary_prompt_tokens=prompt_tokens,
+                summary_completion_tokens=completion_tokens
+            )
         )
         await self.session.commit()
     
@@ -61,4 +480,28 @@ class ArticleRepository:
         result = await self.session.execute(
             select(Article.id).where(Article.url == url)
         )
-        return result.scalar_one_or_none() is not None 
\ No newline at end of file
+        return result.scalar_one_or_none() is not None 
+
+
+def _stem(word: str) -> str:
+    """Cut a common Russian inflection ending when at least three letters of the word remain."""
+    stem = RUSSIAN_ENDING_RE.sub("", word)
+    return stem if len(stem) >= 3 else word
+
+
+def _highlight(text: str, stems: Sequence[str]) -> str:
+    """SNIPPET_WORDS words of the text from just before its first match, with words starting with a stem marked."""
+    matcher = re.compile(r"\b(?:" + "|".join(re.escape(stem) for stem in stems) + r")\w*", re.IGNORECASE)
+    first = matcher.search(text)
+    start = first.start() if first else 0
+    # Three words of left context, so the match is not cut out of its phrase.
+    start -= sum(len(word) for word in re.findall(r"\S+\s*", text[max(0, start - 200):start])[-3:])
+    words = re.findall(r"\S+\s*", text[start:start + 40 * SNIPPET_WORDS])[:SNIPPET_WORDS]
+    end = start + len("".join(words).rstrip())
+    snippet = matcher.sub(lambda match: f"{HIGHLIGHT_START}{match.group(0)}{HIGHLIGHT_STOP}", text[start:end].translate(STRIP_HIGHLIGHTS))
+    return ("…" if start > 0 else "") + _snippet_html(snippet) + ("…" if end < len(text) else "")
+
+
+def _snippet_html(snippet: str) -> str:
+    """Escape a snippet of plain text for HTML and turn its highlight marks into SNIPPET_START and SNIPPET_STOP."""
+    return html.escape(snippet).replace(HIGHLIGHT_START, SNIPPET_START).replace(HIGHLIGHT_STOP, SNIPPET_STOP)
\ No newline at end of file
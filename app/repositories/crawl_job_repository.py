@@ -0,0 +1,167 @@
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select, update
+
+from app.models import CrawlJob
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class CrawlJobRepository:
+    """Repository for managing crawl jobs in database."""
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    async def create(self, url: str) -> CrawlJob:
+        """Create a queued crawl job."""
+        job = CrawlJob(url=url, status=JOB_QUEUED)
+        self.session.add(job)
+        await self.session.commit()
+        await self.session.refresh(job)
+        return job
+    
+    async def get_by_id(self, job_id: int) -> Optional[CrawlJob]:
+        """Get crawl job by ID."""
+        result = await self.session.execute(
+            select(CrawlJob).where(CrawlJob.id == job_id).execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+    
+    async def get_ids_by_status(self, status: str) -> List[int]:
+        """Get ids of jobs in a status, oldest first."""
+        result = await self.session.execute(
+            select(CrawlJob.id).where(CrawlJob.status == status).order_by(CrawlJob.id)
+        )
+        return list(result.scalars().all())
+    
+    async def requeue(self, job_id: int, owner: Optional[str] = None) -> bool:
+        """Put a failed job, or a running one whose lease has expired or is held by owner, back into the queue, keeping its checkpoint."""
+        result = await self.session.execute(
+            update(CrawlJob)
+            .where(CrawlJob.id == job_id, or_(CrawlJob.status != JOB_RUNNING, self._lease_released(owner)))
+            .values(status=JOB_QUEUED, error=None, finished_at=None, lease_owner=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount == 1
+    
+    async def requeue_expired(self, owner: Optional[str] = None) -> List[int]:
+        """Put running jobs whose worker stopped renewing the lease, or held by owner, back into the queue; returns their ids."""
+        result = await self.session.execute(
+            update(CrawlJob)
+            .where(CrawlJob.status == JOB_RUNNING, self._lease_released(owner))
+            .values(status=JOB_QUEUED, lease_owner=None, lease_expires_at=None)
+            .returning(CrawlJob.id)
+            .execution_options(synchronize_session=False)
+        )
+        job_ids = sorted(result.scalars().all())
+        await self.session.commit()
+        return job_ids
+    
+    async def claim(self, job_id: int, owner: str, lease_seconds: float) -> bool:
+        """Move a queued job to running under a lease held by owner; False if another worker claimed it first."""
+        now = datetime.now(timezone.utc)
+        # The status check and the update are one statement, so of several workers racing for a job exactly one wins.
+        result = await self.session.execute(
+            update(CrawlJob)
+            .where(CrawlJob.id == job_id, CrawlJob.status == JOB_QUEUED)
+            .values(
+                status=JOB_RUNNING,
+                started_at=now,
+                lease_owner=owner,
+                lease_expires_at=now + timedelta(seconds=lease_seconds)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount == 1
+    
+    async def extend_lease(self, job_id: int, owner: str, lease_seconds: float) -> bool:
+        """Renew the lease of a running job owner holds; False if the lease was lost."""
+        result = await self.session.execute(
+            update(CrawlJob)
+            .where(CrawlJob.id == job_id, CrawlJob.status == JOB_RUNNING, CrawlJob.lease_owner == owner)
+            .values(lease_expires_at=datetime.now(timezone.utc) + timedelta(seconds=lease_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount == 1
+    
+    @staticmethod
+    def _lease_released(owner: Optional[str] = None):
+        """Condition matching jobs whose lease has run out, that were started before leases existed, or held by owner."""
+        conditions = [CrawlJob.lease_expires_at.is_(None), CrawlJob.lease_expires_at < datetime.now(timezone.utc)]
+        if owner is not None:
+            conditions.append(CrawlJob.lease_owner == owner)
+        return or_(*conditions)
+    
+    async def update_progress(
+        self,
+        job_id: int,
+        pages_fetched: int,
+        pages_queued: int,
+        pages_failed: int,
+        pages_skipped: int
+    ) -> None:
+        """Store the latest crawl counters of a job."""
+        await self._update(
+            job_id,
+            pages_fetched=pages_fetched,
+            pages_queued=pages_queued,
+            pages_failed=pages_failed,
+            pages_skipped=pages_skipped
+        )
+    
+    async def save_checkpoint(self, job_id: int, checkpoint: Dict) -> None:
+        """Store the pending frontier and counters of a running crawl."""
+        await self._update(
+            job_id,
+            checkpoint=json.dumps(checkpoint),
+            checkpointed_at=datetime.now(timezone.utc),
+            pages_fetched=checkpoint["pages_fetched"],
+            pages_queued=len(checkpoint["frontier"]),
+            pages_failed=checkpoint["pages_failed"],
+            pages_skipped=checkpoint["pages_skipped"]
+        )
+    
+    @staticmethod
+    def load_checkpoint(job: CrawlJob) -> Optional[Dict]:
+        """Decode the checkpoint of a job, if it has one."""
+        return json.loads(job.checkpoint) if job.checkpoint else None
+    
+    async def mark_finished(
+        self,
+        job_id: int,
+        status: str,
+        root_article_id: Optional[int] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """Move a job to a final status; a failed job keeps its checkpoint for resuming."""
+        values = {}
+        if status == JOB_SUCCEEDED:
+            values["checkpoint"] = None
+        await self._update(
+            job_id,
+            status=status,
+            root_article_id=root_article_id,
+            error=error,
+            pages_queued=0,
+            finished_at=datetime.now(timezone.utc),
+            lease_owner=None,
+            lease_expires_at=None,
+            **values
+        )
+    
+    async def _update(self, job_id: int, **values) -> None:
+        """Update columns of one job and commit."""
+        await self.session.execute(
+            update(CrawlJob).where(CrawlJob.id == job_id).values(**values)
+        )
+        await self.session.commit()
\ No newline at end of file
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models import FrontierItem
+
+
+FRONTIER_PENDING = "pending"
+FRONTIER_LEASED = "leased"
+FRONTIER_DONE = "done"
+FRONTIER_FAILED = "failed"
+
+
+class FrontierRepository:
+    """Repository for the crawl frontier shared by worker processes."""
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    async def enqueue(self, items: List[Dict], commit: bool = True) -> int:
+        """Add url/depth/max_depth/parent_id rows, skipping URLs already in the frontier; returns rows added."""
+        if not items:
+            return 0
+        
+        statement = (
+            self._insert(FrontierItem)
+            .on_conflict_do_nothing(index_elements=[FrontierItem.url])
+            .returning(FrontierItem.id)
+        )
+        rows = [{"status": FRONTIER_PENDING, "attempts": 0, "depth": 0, "max_depth": 0, "parent_id": None, **item} for item in items]
+        result = await self.session.execute(statement, rows)
+        added = len(result.all())
+        if commit:
+            await self.session.commit()
+        return added
+    
+    def _insert(self, table):
+        """INSERT construct of the session's dialect, which knows ON CONFLICT."""
+        if self.session.bind.dialect.name == "sqlite":
+            return sqlite.insert(table)
+        return postgresql.insert(table)
+    
+    async def claim(self, owner: str, limit: int, lease_seconds: float) -> List[FrontierItem]:
+        """Lease up to limit pending or expired items, shallowest first, skipping rows other workers hold."""
+        now = datetime.now(timezone.utc)
+        claimable = (
+            select(FrontierItem.id)
+            .where(or_(
+                FrontierItem.status == FRONTIER_PENDING,
+                and_(FrontierItem.status == FRONTIER_LEASED, FrontierItem.lease_expires_at < now)
+            ))
+            .order_by(FrontierItem.depth, FrontierItem.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(
+            update(FrontierItem)
+            .where(FrontierItem.id.in_(claimable.scalar_subquery()))
+            .values(
+                status=FRONTIER_LEASED,
+                lease_owner=owner,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                attempts=FrontierItem.attempts + 1
+            )
+            .returning(FrontierItem)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        items = list(result.scalars().all())
+        await self.session.commit()
+        return sorted(items, key=lambda item: (item.depth, item.id))
+    
+    async def complete(self, item_ids: List[int], commit: bool = True) -> None:
+        """Mark leased items done."""
+        if item_ids:
+            await self.session.execute(
+                update(FrontierItem)
+                .where(FrontierItem.id.in_(item_ids))
+                .values(status=FRONTIER_DONE, lease_owner=None, lease_expires_at=None)
+            )
+        if commit:
+            await self.session.commit()
+    
+    async def release(self, item_ids: List[int], error: str, max_attempts: int) -> None:
+        """Return failed items to the queue, or mark them failed once they ran out of attempts."""
+        if not item_ids:
+            return
+        
+        await self.session.execute(
+            update(FrontierItem)
+            .where(FrontierItem.id.in_(item_ids))
+            .values(
+                status=case((FrontierItem.attempts >= max_attempts, FRONTIER_FAILED), else_=FRONTIER_PENDING),
+                lease_owner=None,
+                lease_expires_at=None,
+                error=error
+            )
+        )
+        await self.session.commit()
+    
+    async def counts(self) -> Dict[str, int]:
+        """Number of frontier items in each status."""
+        result = await self.session.execute(
+            select(FrontierItem.status, func.count()).group_by(FrontierItem.status)
+        )
+        return dict(result.all())
+    
+    async def get_by_url(self, url: str) -> Optional[FrontierItem]:
+        """Get frontier item by URL."""
+        result = await self.session.execute(
+            select(FrontierItem).where(FrontierItem.url == url).execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
\ No newline at end of file
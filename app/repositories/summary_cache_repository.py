@@ -0,0 +1,30 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models import SummaryCacheEntry
+
+
+class SummaryCacheRepository:
+    """Repository for summaries cached by content hash."""
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    async def get(self, key: str) -> Optional[str]:
+        """Get the cached summary for a key."""
+        result = await self.session.execute(
+            select(SummaryCacheEntry.summary).where(SummaryCacheEntry.key == key)
+        )
+        return result.scalar_one_or_none()
+    
+    async def put(self, key: str, model: str, summary: str) -> None:
+        """Store a summary, keeping the existing one if another request cached the key first."""
+        insert = sqlite.insert if self.session.bind.dialect.name == "sqlite" else postgresql.insert
+        await self.session.execute(
+            insert(SummaryCacheEntry)
+            .values(key=key, model=model, summary=summary)
+            .on_conflict_do_nothing(index_elements=[SummaryCacheEntry.key])
+        )
+        await self.session.commit()
\ No newline at end of file
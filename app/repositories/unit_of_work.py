@@ -0,0 +1,87 @@
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+
+from app.repositories.article_repository import ArticleRepository
+from app.schemas import ArticleCreate
+from app.config import settings
+
+
+class ArticleUnitOfWork:
+    """Buffer the articles of a crawl and write them with batched inserts."""
+    
+    def __init__(self, article_repository: ArticleRepository, batch_size: Optional[int] = None):
+        self.article_repository = article_repository
+        self.batch_size = max(1, batch_size or settings.crawl_batch_size)
+        self.inserted = 0
+        self.conflicts = 0
+        self.flushes = 0
+        self._pending: List[Tuple[ArticleCreate, Optional[str]]] = []
+        self._links: Dict[str, List[str]] = {}
+        self._ids: Dict[str, int] = {}
+    
+    @property
+    def pending(self) -> int:
+        """Number of buffered articles not written yet."""
+        return len(self._pending)
+    
+    def add(self, article_data: ArticleCreate, parent_url: Optional[str] = None, links: Optional[List[str]] = None) -> bool:
+        """Buffer an article whose parent is given by URL, with the links found on it; returns True once a flush is due."""
+        self._pending.append((article_data, parent_url))
+        if links:
+            self._links[article_data.url] = links
+        return len(self._pending) >= self.batch_size
+    
+    def get_id(self, url: str) -> Optional[int]:
+        """Id of an article written by this unit of work."""
+        return self._ids.get(url)
+    
+    async def flush(self) -> int:
+        """Write buffered articles parents first, one INSERT per tree level, each with its links; returns rows inserted."""
+        pending, self._pending = self._pending, []
+        links, self._links = self._links, {}
+        inserted = 0
+        
+        while pending:
+            pending_urls = {article_data.url for article_data, _ in pending}
+            unknown_parents = {
+                parent_url for _, parent_url in pending
+                if parent_url is not None and parent_url not in pending_urls and parent_url not in self._ids
+            }
+            if unknown_parents:
+                self._ids.update(await self.article_repository.get_ids_by_urls(list(unknown_parents)))
+            
+            ready, waiting = [], []
+            for article_data, parent_url in pending:
+                if parent_url is not None and parent_url in pending_urls:
+                    waiting.append((article_data, parent_url))
+                    continue
+                parent_id = self._ids.get(parent_url) if parent_url is not None else None
+                ready.append(article_data.model_copy(update={"parent_id": parent_id}))
+            
+            if not ready:
+                raise ValueError("Buffered articles reference each other as parents")
+            
+            # Articles and their links of one level are written in one transaction, committed here.
+            try:
+                created = await self.article_repository.create_many(ready, commit=False)
+                await self.article_repository.add_links({
+                    created[article_data.url]: links[article_data.url]
+                    for article_data in ready if article_data.url in created and article_data.url in links
+                }, commit=False)
+                await self.article_repository.session.commit()
+            except Exception:
+                await self.article_repository.session.rollback()
+                raise
+            self._ids.update(created)
+            inserted += len(created)
+            self.flushes += 1
+            
+            conflicts = [article_data.url for article_data in ready if article_data.url not in created]
+            if conflicts:
+                self.conflicts += len(conflicts)
+                logger.warning(f"Skipped {len(conflicts)} articles stored concurrently by another writer")
+            
+            pending = waiting
+        
+        self.inserted += inserted
+        return inserted
\ No newline at end of file
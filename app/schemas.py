@@ -22,17 +22,58 @@ class ArticleResponse(ArticleBase):
     """Schema for article response."""
     
     id: int
+    content: Optional[str] = None
     summary: Optional[str] = None
     summary_generated: bool = False
     created_at: datetime
     updated_at: Optional[datetime] = None
     parent_id: Optional[int] = None
-    # children: List["ArticleResponse"] = []  # Временно отключено из-за async проблем
+    children: List["ArticleResponse"] = []
     
     class Config:
         from_attributes = True
 
 
+class ArticleListItem(BaseModel):
+    """Schema for one article of a listing; only the requested fields are set."""
+    
+    id: int
+    url: Optional[str] = None
+    title: Optional[str] = None
+    content: Optional[str] = None
+    depth_level: Optional[int] = None
+    parent_id: Optional[int] = None
+    summary: Optional[str] = None
+    summary_generated: Optional[bool] = None
+    summary_extractive: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class ArticlePage(BaseModel):
+    """Schema for a page of articles with the cursor of the next one."""
+    
+    items: List[ArticleListItem]
+    next_cursor: Optional[int] = None
+
+
+class SearchHit(BaseModel):
+    """Schema for one search result with its highlighted snippet."""
+    
+    id: int
+    url: str
+    title: str
+    rank: float
+    snippet: str
+
+
+class SearchPage(BaseModel):
+    """Schema for a page of search results with the cursor of the next one."""
+    
+    items: List[SearchHit]
+    next_cursor: Optional[str] = None
+
+
 class ParseRequest(BaseModel):
     """Schema for parsing request."""
     
@@ -46,6 +87,30 @@ class SummaryResponse(BaseModel):
     title: str
     summary: Optional[str] = None
     summary_generated: bool = False
+    summary_prompt_tokens: Optional[int] = None
+    summary_completion_tokens: Optional[int] = None
+    summary_extractive: bool = False
+
+
+class CrawlJobResponse(BaseModel):
+    """Schema for crawl job status response."""
+    
+    id: int
+    url: str
+    status: str
+    pages_fetched: int = 0
+    pages_queued: int = 0
+    pages_failed: int = 0
+    pages_skipped: int = 0
+    root_article_id: Optional[int] = None
+    error: Optional[str] = None
+    checkpointed_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
 
 
 ArticleResponse.model_rebuild() 
\ No newline at end of file
@@ -1,42 +1,102 @@
-from typing import Optional, List
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Callable, Sequence, Set, Tuple
 from loguru import logger
 
-from app.repositories.article_repository import ArticleRepository
+from app.repositories.article_repository import ArticleRepository, ARTICLE_LIST_FIELDS
 from app.parsers.wikipedia_parser import WikipediaParser
-from app.ai.summary_generator import SummaryGenerator
-from app.schemas import ArticleCreate, SummaryResponse
+from app.ai.summary_generator import (
+    SummaryGenerator,
+    TokenUsage,
+    SUMMARY_ENGINES,
+    SUMMARY_ENGINE_AUTO,
+    SUMMARY_ENGINE_EXTRACTIVE,
+)
+from app.services.crawl_engine import CrawlEngine
+from app.schemas import ArticleListItem, ArticlePage, ArticleResponse, SearchHit, SearchPage, SummaryResponse
 from app.models import Article
 from app.config import settings
 
 
+SUMMARY_MODE_SINGLE = "single"
+SUMMARY_MODE_BATCH = "batch"
+DEFAULT_LIST_FIELDS = ("id", "url", "title", "depth_level", "parent_id", "summary_generated")
+
+
+@dataclass
+class SummaryStats:
+    """Counters of one generate_pending_summaries run."""
+    
+    generated: int = 0
+    failed: int = 0
+    retries: int = 0
+    cache_hits: int = 0
+    extractive: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    write_batches: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent so far."""
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+    
+    @property
+    def summaries_per_second(self) -> float:
+        """Throughput of the run."""
+        elapsed = self.elapsed
+        return self.generated / elapsed if elapsed > 0 else 0.0
+
+
 class ArticleService:
     """Service for managing articles, parsing, and summary generation."""
     
     def __init__(
         self,
         article_repository: ArticleRepository,
-        summary_generator: SummaryGenerator
+        summary_generator: SummaryGenerator,
+        parser_factory: Optional[Callable[[], WikipediaParser]] = None
     ):
         self.article_repository = article_repository
         self.summary_generator = summary_generator
+        self.parser_factory = parser_factory
     
-    async def parse_and_save_article(self, url: str) -> Article:
-        """Parse article and save to database with recursive parsing."""
+    async def parse_and_save_article(
+        self,
+        url: str,
+        on_crawl_start: Optional[Callable[[CrawlEngine], None]] = None,
+        checkpoint: Optional[Dict] = None
+    ) -> Article:
+        """Parse article and save to database with recursive parsing, resuming from a checkpoint if given."""
         if not WikipediaParser.is_wikipedia_url(url):
             raise ValueError("URL must be a Wikipedia article URL")
         
-        existing_article = await self.article_repository.get_by_url(url)
-        if existing_article:
-            return existing_article
+        if checkpoint is None:
+            existing_article = await self.article_repository.get_by_url(url)
+            if existing_article:
+                return existing_article
         
-        async with WikipediaParser() as parser:
-            root_article = await self._parse_recursive(parser, url, depth=0, parent_id=None)
+        async with self._create_parser() as parser:
+            engine = CrawlEngine(parser, self.article_repository)
+            if on_crawl_start:
+                on_crawl_start(engine)
+            root_article = await engine.crawl(url, checkpoint=checkpoint)
         
         if root_article:
             await self._generate_summary_for_root_article(root_article)
         
         return root_article
     
+    def _create_parser(self) -> WikipediaParser:
+        """Create a parser bound to the shared HTTP client when one is configured."""
+        if self.parser_factory:
+            return self.parser_factory()
+        return WikipediaParser()
+    
     async def get_article_summary(self, url: str) -> Optional[SummaryResponse]:
         """Get article summary by URL."""
         article = await self.article_repository.get_by_url(url)
@@ -47,94 +107,323 @@ class ArticleService:
             url=article.url,
             title=article.title,
             summary=article.summary,
-            summary_generated=article.summary_generated
+            summary_generated=article.summary_generated,
+            summary_prompt_tokens=article.summary_prompt_tokens,
+            summary_completion_tokens=article.summary_completion_tokens,
+            summary_extractive=bool(article.summary_extractive)
         )
     
-    async def _parse_recursive(
+    async def list_articles(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        cursor: Optional[int] = None,
+        limit: int = 100,
+        depth_level: Optional[int] = None,
+        parent_id: Optional[int] = None,
+        summary_generated: Optional[bool] = None
+    ) -> ArticlePage:
+        """List articles after the cursor id with only the requested fields; id is always included."""
+        fields = list(dict.fromkeys(["id", *(fields or DEFAULT_LIST_FIELDS)]))
+        unknown = [field for field in fields if field not in ARTICLE_LIST_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown article fields: {', '.join(unknown)}")
+        
+        # One extra row tells whether another page follows without a second query.
+        rows = await self.article_repository.list_page(
+            fields, cursor, limit + 1, depth_level=depth_level, parent_id=parent_id, summary_generated=summary_generated
+        )
+        return ArticlePage(
+            items=[ArticleListItem.model_validate(dict(row._mapping)) for row in rows[:limit]],
+            next_cursor=rows[limit - 1].id if len(rows) > limit else None
+        )
+    
+    async def search_articles(self, query: str, cursor: Optional[str] = None, limit: int = 20) -> SearchPage:
+        """Full-text search ranked best first; the cursor is the "rank:id" of the last hit of the previous page."""
+        after = None
+        if cursor:
+            rank, _, article_id = cursor.rpartition(":")
+            try:
+                after = (float(rank), int(article_id))
+            except ValueError:
+                raise ValueError(f"Invalid search cursor: {cursor}")
+        
+        hits = await self.article_repository.search(query, limit + 1, after)
+        last = hits[limit - 1] if len(hits) > limit else None
+        return SearchPage(
+            items=[SearchHit.model_validate(hit) for hit in hits[:limit]],
+            next_cursor=f"{last['rank']!r}:{last['id']}" if last else None
+        )
+    
+    async def get_article_tree(
         self,
-        parser: WikipediaParser,
         url: str,
-        depth: int,
-        parent_id: Optional[int]
-    ) -> Optional[Article]:
-        """Recursively parse article and its linked articles."""
-        if depth > settings.max_recursion_depth:
+        max_depth: Optional[int] = None,
+        include_content: bool = False
+    ) -> Optional[ArticleResponse]:
+        """Get an article with its crawl tree nested in children, read by one query and assembled in one pass."""
+        max_depth = settings.max_recursion_depth if max_depth is None else max_depth
+        rows = await self.article_repository.get_tree(url, max_depth, include_content)
+        if not rows:
             return None
         
-        existing_article = await self.article_repository.get_by_url(url)
-        if existing_article:
-            return existing_article
+        nodes = {}
+        for row in rows:
+            node = {**row._mapping, "children": []}
+            del node["level"]
+            nodes[row.id] = node
+            # Rows arrive parents first, so every parent below the root is already in the map.
+            if row.level:
+                nodes[row.parent_id]["children"].append(node)
+        return ArticleResponse.model_validate(nodes[rows[0].id])
+    
+    async def stream_article_summary(self, url: str) -> Optional[AsyncIterator[Tuple[str, dict]]]:
+        """Stream (event, data) pairs of an article's summary, or None when the article is not stored."""
+        article = await self.article_repository.get_by_url(url)
+        if not article:
+            return None
+        return self._summary_events(article)
+    
+    async def _summary_events(self, article: Article) -> AsyncIterator[Tuple[str, dict]]:
+        """Serve a stored summary at once, or stream a new one token by token and save it when it is complete."""
+        if article.summary_generated and article.summary:
+            yield "summary", {"summary": article.summary}
+            return
         
+        parts = []
+        usage = TokenUsage()
         try:
-            logger.info(f"Parsing article at depth {depth}: {url}")
-            title, content, links = await parser.parse_article(url)
-            
-            article_data = ArticleCreate(
-                url=url,
-                title=title,
-                content=content,
-                depth_level=depth,
-                parent_id=parent_id
-            )
-            
-            article = await self.article_repository.create(article_data)
-            
-            if depth < settings.max_recursion_depth:
-                await self._parse_child_articles(parser, links, depth + 1, article.id)
-            
-            return article
-        
+            content = await self.article_repository.get_content(article.id)
+            async for text in self.summary_generator.stream_summary(article.title, content or "", usage=usage):
+                parts.append(text)
+                yield "token", {"text": text}
         except Exception as e:
-            logger.error(f"Error parsing article {url}: {str(e)}")
-            return None
-    
-    async def _parse_child_articles(
-        self,
-        parser: WikipediaParser,
-        links: List[str],
-        depth: int,
-        parent_id: int
-    ) -> None:
-        """Parse child articles from links."""
-        for link in links[:5]:
-            if await self.article_repository.exists_by_url(link):
-                continue
-            
-            try:
-                await self._parse_recursive(parser, link, depth, parent_id)
-            except Exception as e:
-                logger.error(f"Error parsing child article {link}: {str(e)}")
-                continue
+            logger.error(f"Error streaming summary for {article.title}: {str(e)}")
+            yield "error", {"detail": str(e)}
+            return
+        
+        summary = "".join(parts).strip()
+        await self.article_repository.update_summary(
+            article.id,
+            summary,
+            usage=(usage.prompt_tokens, usage.completion_tokens) if usage.requests else None
+        )
+        logger.info(f"Summary streamed for article: {article.title}")
+        yield "done", {"summary": summary}
     
     async def _generate_summary_for_root_article(self, article: Article) -> None:
         """Generate summary for root article."""
         if article.depth_level == 0 and not article.summary_generated:
             try:
                 logger.info(f"Generating summary for article: {article.title}")
+                usage = TokenUsage()
+                content = await self.article_repository.get_content(article.id)
                 summary = await self.summary_generator.generate_summary(
                     article.title, 
-                    article.content
+                    content or "",
+                    usage=usage
+                )
+                await self.article_repository.update_summary(
+                    article.id,
+                    summary,
+                    extractive=usage.extractive,
+                    usage=(usage.prompt_tokens, usage.completion_tokens) if usage.requests else None
                 )
-                await self.article_repository.update_summary(article.id, summary)
                 logger.info(f"Summary generated for article: {article.title}")
             except Exception as e:
                 logger.error(f"Error generating summary for {article.title}: {str(e)}")
     
-    async def generate_pending_summaries(self) -> int:
-        """Generate summaries for articles that don't have them yet."""
-        articles = await self.article_repository.get_root_articles_without_summary()
-        count = 0
+    async def generate_pending_summaries(
+        self,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        mode: Optional[str] = None,
+        engine: Optional[str] = None
+    ) -> SummaryStats:
+        """Generate summaries for articles that don't have them yet, one article or one pack of articles per request."""
+        concurrency = max(1, concurrency or settings.summary_concurrency)
+        batch_size = max(1, batch_size or settings.summary_batch_size)
+        mode = mode or settings.summary_mode
+        engine = engine or settings.summary_engine
+        if mode not in (SUMMARY_MODE_SINGLE, SUMMARY_MODE_BATCH):
+            raise ValueError(f"Unknown summary mode: {mode}")
+        if engine not in SUMMARY_ENGINES:
+            raise ValueError(f"Unknown summary engine: {engine}")
+        if engine == SUMMARY_ENGINE_EXTRACTIVE:
+            # Packing only saves API requests, and the extractive engine makes none.
+            mode = SUMMARY_MODE_SINGLE
+        stats = SummaryStats()
+        semaphore = asyncio.Semaphore(concurrency)
+        summaries: Dict[int, str] = {}
+        usage: Dict[int, Tuple[int, int]] = {}
+        extractive: Set[int] = set()
+        tasks = set()
+        retries_before = getattr(self.summary_generator, "retries", 0)
+        cache_hits_before = self._cache_hits()
+        
+        async def summarize(pack: List[Tuple[int, str, str]]) -> List[Tuple[int, str, Optional[str], Optional[TokenUsage]]]:
+            async with semaphore:
+                if mode == SUMMARY_MODE_SINGLE:
+                    article_id, title, content = pack[0]
+                    try:
+                        summary, article_usage = await self.summary_generator.summarize_article(title, content, engine)
+                        return [(article_id, title, summary, article_usage)]
+                    except Exception as e:
+                        logger.error(f"Error generating summary for {title}: {str(e)}")
+                        return [(article_id, title, None, None)]
+                
+                # A packed request's usage covers several articles, so it is not attributed to any of them.
+                try:
+                    results = await self.summary_generator.summarize_many(pack)
+                except Exception as e:
+                    logger.error(f"Error generating summaries for a pack of {len(pack)} articles: {str(e)}")
+                    results = {}
+                answers = []
+                for article_id, title, content in pack:
+                    summary = results.get(article_id)
+                    article_usage = None
+                    if summary is None and engine == SUMMARY_ENGINE_AUTO:
+                        # Articles the pack could not answer get the extractive summary instead of failing.
+                        article_usage = TokenUsage()
+                        summary = self.summary_generator.extract(title, content, article_usage)
+                    answers.append((article_id, title, summary, article_usage))
+                return answers
+        
+        async def submit(pack: List[Tuple[int, str, str]]) -> None:
+            nonlocal tasks
+            # At most two requests per slot wait in memory, however long the backlog is.
+            while len(tasks) >= 2 * concurrency:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                await collect(done)
+            tasks.add(asyncio.create_task(summarize(pack)))
+        
+        async def collect(done) -> None:
+            for task in done:
+                for article_id, title, summary, article_usage in task.result():
+                    if summary is None:
+                        stats.failed += 1
+                        continue
+                    summaries[article_id] = summary
+                    if article_usage is not None and article_usage.extractive:
+                        extractive.add(article_id)
+                        stats.extractive += 1
+                    if article_usage is not None and article_usage.requests:
+                        usage[article_id] = (article_usage.prompt_tokens, article_usage.completion_tokens)
+                        stats.prompt_tokens += article_usage.prompt_tokens
+                        stats.completion_tokens += article_usage.completion_tokens
+                    logger.info(f"Summary generated for article: {title}")
+            if len(summaries) >= batch_size:
+                await write()
+        
+        async def write() -> None:
+            pending = dict(summaries)
+            pending_usage = dict(usage)
+            pending_extractive = set(extractive)
+            summaries.clear()
+            usage.clear()
+            extractive.clear()
+            saved, batches = await self._save_summaries(pending, batch_size, pending_usage, pending_extractive)
+            stats.generated += saved
+            stats.failed += len(pending) - saved
+            stats.write_batches += batches
+        
+        chunk = []
+        async for article in self.article_repository.iter_root_articles_without_summary(batch_size):
+            chunk.append((article.id, article.title, article.content))
+            if mode == SUMMARY_MODE_SINGLE or len(chunk) >= batch_size:
+                for pack in self._pack(chunk, mode):
+                    await submit(pack)
+                chunk = []
+        for pack in self._pack(chunk, mode):
+            await submit(pack)
+        
+        if tasks:
+            done, _ = await asyncio.wait(tasks)
+            await collect(done)
+        if summaries:
+            await write()
+        
+        stats.retries = getattr(self.summary_generator, "retries", 0) - retries_before
+        stats.cache_hits = self._cache_hits() - cache_hits_before
+        stats.finished_at = time.monotonic()
+        logger.info(
+            f"Generated {stats.generated} summaries, {stats.failed} failed in {stats.elapsed:.2f}s "
+            f"({stats.summaries_per_second:.2f} summaries/sec, {mode} mode, {engine} engine, {concurrency} concurrent requests, "
+            f"{stats.cache_hits} cache hits, {stats.extractive} extractive, {stats.prompt_tokens} prompt and {stats.completion_tokens} completion tokens, "
+            f"{stats.write_batches} batched updates)"
+        )
+        return stats
+    
+    async def export_summary_requests(self, path: str, batch_size: Optional[int] = None) -> int:
+        """Write pending root articles as packed Batch API requests to a JSONL file; returns articles written."""
+        batch_size = max(1, batch_size or settings.summary_batch_size)
+        written = 0
+        chunk = []
+        with open(path, "w", encoding="utf-8") as file:
+            async for article in self.article_repository.iter_root_articles_without_summary(batch_size):
+                chunk.append((article.id, article.title, article.content))
+                if len(chunk) >= batch_size:
+                    await asyncio.to_thread(file.writelines, self._request_lines(chunk))
+                    written += len(chunk)
+                    chunk = []
+            if chunk:
+                await asyncio.to_thread(file.writelines, self._request_lines(chunk))
+                written += len(chunk)
         
-        for article in articles:
+        logger.info(f"Wrote summary requests for {written} articles to {path}")
+        return written
+    
+    async def import_summary_results(self, path: str, batch_size: Optional[int] = None) -> int:
+        """Store summaries from a Batch API output file; returns how many were saved."""
+        batch_size = max(1, batch_size or settings.summary_batch_size)
+        summaries = await asyncio.to_thread(self._read_results, path)
+        saved, _ = await self._save_summaries(summaries, batch_size)
+        
+        logger.info(f"Imported {saved} of {len(summaries)} summaries from {path}")
+        return saved
+    
+    async def _save_summaries(
+        self,
+        summaries: Dict[int, str],
+        batch_size: int,
+        usage: Optional[Dict[int, Tuple[int, int]]] = None,
+        extractive: Optional[Set[int]] = None
+    ) -> Tuple[int, int]:
+        """Store summaries in UPDATE batches of at most batch_size rows; returns summaries saved and batches written."""
+        items = list(summaries.items())
+        saved = 0
+        batches = 0
+        for start in range(0, len(items), batch_size):
+            batch = dict(items[start:start + batch_size])
+            batch_extractive = {key for key in batch if key in extractive} if extractive else set()
+            options = {"extractive": batch_extractive} if batch_extractive else {}
             try:
-                summary = await self.summary_generator.generate_summary(
-                    article.title, 
-                    article.content
-                )
-                await self.article_repository.update_summary(article.id, summary)
-                count += 1
-                logger.info(f"Summary generated for article: {article.title}")
+                if usage:
+                    await self.article_repository.update_summaries(batch, {key: usage[key] for key in batch if key in usage}, **options)
+                else:
+                    await self.article_repository.update_summaries(batch, **options)
+                saved += len(batch)
+                batches += 1
             except Exception as e:
-                logger.error(f"Error generating summary for {article.title}: {str(e)}")
-        
-        return count 
\ No newline at end of file
+                logger.error(f"Error saving {len(batch)} summaries: {str(e)}")
+        return saved, batches
+    
+    def _pack(self, chunk: List[Tuple[int, str, str]], mode: str) -> List[List[Tuple[int, str, str]]]:
+        """Requests to send for a chunk of articles: one per article, or packs under the batch budget."""
+        if mode == SUMMARY_MODE_SINGLE:
+            return [[article] for article in chunk]
+        return self.summary_generator.pack_articles(chunk)
+    
+    def _request_lines(self, chunk: List[Tuple[int, str, str]]) -> List[str]:
+        """Batch API input lines for a chunk of articles."""
+        return [line + "\n" for line in self.summary_generator.batch_request_lines(chunk)]
+    
+    @staticmethod
+    def _read_results(path: str) -> Dict[int, str]:
+        """Parse a Batch API output file."""
+        with open(path, encoding="utf-8") as file:
+            return SummaryGenerator.parse_batch_results(file)
+    
+    def _cache_hits(self) -> int:
+        """Hits of the generator's summary cache so far, 0 without one."""
+        cache = getattr(self.summary_generator, "cache", None)
+        return cache.stats.hits if cache is not None else 0
\ No newline at end of file
@@ -0,0 +1,298 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional, List, Tuple
+from loguru import logger
+
+from app.repositories.article_repository import ArticleRepository
+from app.repositories.unit_of_work import ArticleUnitOfWork
+from app.services.crawl_state import CrawlState, FrontierEntry
+from app.parsers.wikipedia_parser import WikipediaParser, ParserStats
+from app.schemas import ArticleCreate
+from app.models import Article
+from app.config import settings
+
+
+@dataclass
+class CrawlStats:
+    """Counters collected while a crawl is running."""
+    
+    pages_fetched: int = 0
+    pages_failed: int = 0
+    pages_skipped: int = 0
+    bytes_read: int = 0
+    bytes_saved: int = 0
+    write_batches: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent crawling so far."""
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+    
+    @property
+    def pages_per_second(self) -> float:
+        """Fetch throughput of the crawl."""
+        elapsed = self.elapsed
+        return self.pages_fetched / elapsed if elapsed > 0 else 0.0
+
+
+class CrawlEngine:
+    """Breadth-first crawler with a shared frontier and a bounded pool of workers."""
+    
+    MAX_CHILDREN = 5
+    
+    def __init__(
+        self,
+        parser: WikipediaParser,
+        article_repository: ArticleRepository,
+        concurrency: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        max_children: int = MAX_CHILDREN,
+        batch_size: Optional[int] = None,
+        write_batch_size: Optional[int] = None,
+        warm_start: Optional[bool] = None,
+        on_checkpoint: Optional[Callable[[Dict], Awaitable[None]]] = None,
+        checkpoint_interval: Optional[float] = None
+    ):
+        self.parser = parser
+        self.article_repository = article_repository
+        self.concurrency = max(1, concurrency or settings.crawl_concurrency)
+        self.max_depth = settings.max_recursion_depth if max_depth is None else max_depth
+        self.max_children = max_children
+        parser_batch_size = getattr(parser, "batch_size", 1)
+        self.batch_size = max(1, batch_size or (parser_batch_size if isinstance(parser_batch_size, int) else 1))
+        self.write_batch_size = max(1, write_batch_size or settings.crawl_batch_size)
+        self.warm_start = settings.crawl_warm_start if warm_start is None else warm_start
+        self.on_checkpoint = on_checkpoint
+        self.checkpoint_interval = settings.crawl_checkpoint_interval if checkpoint_interval is None else checkpoint_interval
+        self.stats = CrawlStats()
+        
+        self._queue: Optional[asyncio.Queue] = None
+        self._state: Optional[CrawlState] = None
+        self._db_lock = asyncio.Lock()
+        self._root: Optional[Article] = None
+        self._unit_of_work: Optional[ArticleUnitOfWork] = None
+        self._open: set = set()
+        self._checkpointed_at = 0.0
+    
+    @property
+    def queued(self) -> int:
+        """Number of pages waiting in the frontier."""
+        return self._queue.qsize() if self._queue is not None else 0
+    
+    def checkpoint(self) -> Dict:
+        """Unfinished frontier entries and counters of the crawl, serializable as JSON."""
+        return {
+            "frontier": sorted(
+                ([entry.url, entry.depth, entry.parent_url] for entry in self._open),
+                key=lambda entry: (entry[1], entry[0])
+            ),
+            "pages_fetched": self.stats.pages_fetched,
+            "pages_failed": self.stats.pages_failed,
+            "pages_skipped": self.stats.pages_skipped,
+        }
+    
+    async def crawl(self, url: str, checkpoint: Optional[Dict] = None) -> Optional[Article]:
+        """Crawl the link tree starting at url, or resume it from a checkpoint, and return the root article."""
+        self.stats = CrawlStats()
+        parser_stats = self._parser_stats()
+        bytes_read_before = parser_stats.bytes_read if parser_stats else 0
+        bytes_saved_before = parser_stats.bytes_saved if parser_stats else 0
+        self._queue = asyncio.Queue()
+        self._state = CrawlState()
+        if self.warm_start:
+            async with self._db_lock:
+                await self._state.warm_start(self.article_repository)
+        self._root = None
+        self._unit_of_work = ArticleUnitOfWork(self.article_repository, self.write_batch_size)
+        self._open = set()
+        self._checkpointed_at = time.monotonic()
+        self._state.claim(url)
+        if checkpoint is None:
+            self._put(FrontierEntry(url, 0))
+        else:
+            self._restore(checkpoint)
+        
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        try:
+            await self._queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await self._flush()
+            self.stats.write_batches = self._unit_of_work.flushes
+            self.stats.finished_at = time.monotonic()
+        
+        if self._root is None and (checkpoint is not None or self._unit_of_work.get_id(url) is not None):
+            self._root = await self.article_repository.get_by_url(url)
+        
+        if parser_stats:
+            self.stats.bytes_read = parser_stats.bytes_read - bytes_read_before
+            self.stats.bytes_saved = parser_stats.bytes_saved - bytes_saved_before
+        
+        logger.info(
+            f"Crawl of {url} finished: {self.stats.pages_fetched} pages, "
+            f"{self.stats.pages_failed} failed in {self.stats.elapsed:.2f}s "
+            f"({self.stats.pages_per_second:.2f} pages/sec, {self.concurrency} workers, "
+            f"{self.stats.write_batches} batched inserts, "
+            f"{self.stats.bytes_saved} bytes saved by streaming)"
+        )
+        return self._root
+    
+    def _restore(self, checkpoint: Dict) -> None:
+        """Refill the frontier and counters saved by checkpoint()."""
+        self.stats.pages_fetched = checkpoint.get("pages_fetched", 0)
+        self.stats.pages_failed = checkpoint.get("pages_failed", 0)
+        self.stats.pages_skipped = checkpoint.get("pages_skipped", 0)
+        for url, depth, parent_url in checkpoint.get("frontier", []):
+            self._state.claim(url)
+            self._put(FrontierEntry(url, depth, parent_url))
+        logger.info(f"Resuming crawl from a checkpoint with {self.queued} pending pages")
+    
+    def _put(self, entry: FrontierEntry) -> None:
+        """Add an entry to the frontier; it stays open until its children are enqueued."""
+        self._open.add(entry)
+        self._queue.put_nowait(entry)
+    
+    def _parser_stats(self) -> Optional[ParserStats]:
+        """Download counters of the parser, if it keeps any."""
+        stats = getattr(self.parser, "stats", None)
+        return stats if isinstance(stats, ParserStats) else None
+    
+    async def _worker(self) -> None:
+        """Take frontier entries until the crawl is cancelled."""
+        while True:
+            entries = [await self._queue.get()]
+            while len(entries) < self.batch_size and not self._queue.empty():
+                entries.append(self._queue.get_nowait())
+            try:
+                await self._process(entries)
+            finally:
+                for entry in entries:
+                    self._open.discard(entry)
+                    self._queue.task_done()
+    
+    async def _process(self, entries: List[FrontierEntry]) -> None:
+        """Fetch and parse a batch of pages, then persist each and enqueue its children."""
+        pending = []
+        for entry in entries:
+            url = entry.url
+            # Children were checked against the database in bulk before they were enqueued.
+            if entry.depth == 0:
+                try:
+                    async with self._db_lock:
+                        existing_article = await self.article_repository.get_by_url(url)
+                except Exception as e:
+                    self.stats.pages_failed += 1
+                    logger.error(f"Error parsing article {url}: {str(e)}")
+                    continue
+                
+                if existing_article:
+                    self.stats.pages_skipped += 1
+                    self._root = existing_article
+                    continue
+            
+            logger.info(f"Parsing article at depth {entry.depth}: {url}")
+            pending.append(entry)
+        
+        if not pending:
+            return
+        
+        results = {}
+        try:
+            if len(pending) == 1:
+                url = pending[0].url
+                results[url] = await self.parser.parse_article(url)
+            else:
+                results = await self.parser.parse_articles([entry.url for entry in pending])
+        except Exception as e:
+            self.stats.pages_failed += len(pending)
+            for entry in pending:
+                logger.error(f"Error parsing article {entry.url}: {str(e)}")
+            return
+        
+        for entry in pending:
+            if entry.url not in results:
+                self.stats.pages_failed += 1
+                logger.error(f"Error parsing article {entry.url}: page was not returned")
+                continue
+            await self._store(entry.url, entry.depth, entry.parent_url, results[entry.url])
+    
+    async def _store(
+        self,
+        url: str,
+        depth: int,
+        parent_url: Optional[str],
+        parsed: Tuple[str, str, List[str]]
+    ) -> None:
+        """Buffer one parsed page for a batched insert and enqueue its children."""
+        try:
+            title, content, links = parsed
+            
+            article_data = ArticleCreate(
+                url=url,
+                title=title,
+                content=content,
+                depth_level=depth
+            )
+            
+            self.stats.pages_fetched += 1
+            async with self._db_lock:
+                if self._unit_of_work.add(article_data, parent_url, links):
+                    await self._flush()
+            
+            if depth < self.max_depth:
+                await self._enqueue_children(links, depth + 1, url)
+        
+        except Exception as e:
+            self.stats.pages_failed += 1
+            logger.error(f"Error parsing article {url}: {str(e)}")
+    
+    async def _flush(self) -> None:
+        """Write buffered articles; pages of a batch that could not be saved count as failed."""
+        pending = self._unit_of_work.pending
+        if not pending:
+            return
+        
+        try:
+            await self._unit_of_work.flush()
+        except Exception as e:
+            self.stats.pages_fetched -= pending
+            self.stats.pages_failed += pending
+            logger.error(f"Error saving {pending} articles: {str(e)}")
+            return
+        
+        await self._save_checkpoint()
+    
+    async def _save_checkpoint(self) -> None:
+        """Hand the checkpoint to on_checkpoint once the interval has passed; called right after a flush."""
+        # Nothing is buffered right after a flush, so every page outside the open entries is stored.
+        if self.on_checkpoint is None or time.monotonic() - self._checkpointed_at < self.checkpoint_interval:
+            return
+        
+        self._checkpointed_at = time.monotonic()
+        try:
+            await self.on_checkpoint(self.checkpoint())
+        except Exception as e:
+            logger.error(f"Error saving crawl checkpoint: {str(e)}")
+    
+    async def _enqueue_children(self, links: List[str], depth: int, parent_url: str) -> None:
+        """Add unseen child links to the shared frontier with one lookup for all of them."""
+        candidates = [link for link in links[:self.max_children] if self._state.claim(link)]
+        if not candidates:
+            return
+        
+        # A warm-started state already holds every stored URL, so unclaimed links are new.
+        existing = {}
+        if not self._state.warm:
+            async with self._db_lock:
+                existing = await self.article_repository.get_ids_by_urls(candidates)
+            self.stats.pages_skipped += len(existing)
+        
+        for link in candidates:
+            if link not in existing:
+                self._put(FrontierEntry(link, depth, parent_url))
\ No newline at end of file
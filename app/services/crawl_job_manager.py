@@ -0,0 +1,247 @@
+import asyncio
+import socket
+from typing import Callable, Dict, List, Optional
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.ai.summary_generator import SummaryGenerator
+from app.models import CrawlJob
+from app.parsers.wikipedia_parser import WikipediaParser
+from app.repositories.article_repository import ArticleRepository
+from app.repositories.crawl_job_repository import (
+    CrawlJobRepository,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_SUCCEEDED,
+)
+from app.services.article_service import ArticleService
+from app.services.crawl_engine import CrawlEngine
+
+
+class CrawlJobManager:
+    """Pool of in-process workers running crawl jobs stored in the crawl_jobs table."""
+    
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        summary_generator: SummaryGenerator,
+        parser_factory: Optional[Callable[[], WikipediaParser]] = None,
+        workers: Optional[int] = None,
+        progress_interval: Optional[float] = None,
+        owner: Optional[str] = None,
+        lease_seconds: Optional[float] = None
+    ):
+        self.session_factory = session_factory
+        self.summary_generator = summary_generator
+        self.parser_factory = parser_factory
+        self.workers = max(1, workers or settings.crawl_job_workers)
+        self.progress_interval = progress_interval or settings.crawl_job_progress_interval
+        # The owner outlives the process, so a restarted replica recognizes the jobs it was running.
+        self.owner = owner or settings.crawl_job_owner or socket.gethostname()
+        self.lease_seconds = lease_seconds or settings.crawl_job_lease_seconds
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._active: set = set()
+    
+    @property
+    def running(self) -> bool:
+        """Whether the worker pool is started."""
+        return bool(self._tasks)
+    
+    async def start(self) -> None:
+        """Start the workers and pick up jobs left queued, running under this owner, or running under an expired lease."""
+        if self._tasks:
+            return
+        
+        async with self.session_factory() as session:
+            jobs = CrawlJobRepository(session)
+            # Nothing runs here yet, so jobs leased to this owner were cut off by a restart; other replicas' live leases are left alone.
+            requeued = await jobs.requeue_expired(self.owner)
+            queued_ids = await jobs.get_ids_by_status(JOB_QUEUED)
+        for job_id in queued_ids:
+            self._queue.put_nowait(job_id)
+        
+        self._tasks = [asyncio.create_task(self._worker(index)) for index in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweep()))
+        logger.info(f"Started {self.workers} crawl job workers as {self.owner}, {len(queued_ids)} jobs queued ({len(requeued)} interrupted)")
+    
+    async def stop(self) -> None:
+        """Cancel the workers; interrupted jobs stay in the table with their last status."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    async def join(self) -> None:
+        """Wait until every submitted job has been processed."""
+        await self._queue.join()
+    
+    async def submit(self, url: str) -> CrawlJob:
+        """Store a queued crawl job and hand it to the workers."""
+        if not WikipediaParser.is_wikipedia_url(url):
+            raise ValueError("URL must be a Wikipedia article URL")
+        
+        async with self.session_factory() as session:
+            job = await CrawlJobRepository(session).create(url)
+        self._queue.put_nowait(job.id)
+        logger.info(f"Queued crawl job {job.id} for {url}")
+        return job
+    
+    async def resume(self, job_id: int) -> Optional[CrawlJob]:
+        """Queue an interrupted or failed job again; it continues from its last checkpoint."""
+        if job_id in self._active:
+            raise ValueError("Job is already running")
+        
+        async with self.session_factory() as session:
+            jobs = CrawlJobRepository(session)
+            job = await jobs.get_by_id(job_id)
+            if job is None:
+                return None
+            if job.status == JOB_SUCCEEDED:
+                raise ValueError("Job has already succeeded")
+            
+            if job.status != JOB_QUEUED and not await jobs.requeue(job_id, self.owner):
+                raise ValueError("Job is already running")
+            self._queue.put_nowait(job_id)
+            logger.info(f"Resuming crawl job {job_id}")
+            return await jobs.get_by_id(job_id)
+    
+    async def get_job(self, job_id: int) -> Optional[CrawlJob]:
+        """Get the current state of a crawl job."""
+        async with self.session_factory() as session:
+            return await CrawlJobRepository(session).get_by_id(job_id)
+    
+    async def _sweep(self) -> None:
+        """Every lease period, queue again jobs whose worker, here or on another replica, stopped renewing the lease."""
+        while True:
+            await asyncio.sleep(self.lease_seconds)
+            try:
+                async with self.session_factory() as session:
+                    job_ids = await CrawlJobRepository(session).requeue_expired()
+            except Exception as e:
+                logger.error(f"Crawl job lease sweep failed: {str(e)}")
+                continue
+            for job_id in job_ids:
+                logger.info(f"Crawl job {job_id} lease expired, queued again")
+                self._queue.put_nowait(job_id)
+    
+    async def _worker(self, index: int) -> None:
+        """Run queued jobs one at a time."""
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                logger.error(f"Crawl job worker {index} failed on job {job_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+    
+    async def _run_job(self, job_id: int) -> None:
+        """Claim the job and crawl its URL, reporting progress until it finishes."""
+        if job_id in self._active:
+            return
+        
+        async with self.session_factory() as job_session, self.session_factory() as crawl_session:
+            jobs = CrawlJobRepository(job_session)
+            if not await jobs.claim(job_id, self.owner, self.lease_seconds):
+                return
+            
+            job = await jobs.get_by_id(job_id)
+            self._active.add(job_id)
+            try:
+                await self._crawl(jobs, crawl_session, job)
+            finally:
+                self._active.discard(job_id)
+    
+    async def _crawl(self, jobs: CrawlJobRepository, crawl_session: AsyncSession, job: CrawlJob) -> None:
+        """Run or resume the crawl of a claimed job and store its outcome."""
+        job_id = job.id
+        checkpoint = CrawlJobRepository.load_checkpoint(job)
+        service = ArticleService(
+            ArticleRepository(crawl_session),
+            self.summary_generator,
+            self.parser_factory
+        )
+        engines: List[CrawlEngine] = []
+        # The progress reporter and the crawl checkpoints share the job session, so writes take turns.
+        job_lock = asyncio.Lock()
+        
+        # Set once another worker holds the lease; from then on this crawl writes nothing to the job.
+        lease_lost = asyncio.Event()
+        
+        async def save_checkpoint(state: Dict) -> None:
+            async with job_lock:
+                if not lease_lost.is_set():
+                    await jobs.save_checkpoint(job_id, state)
+        
+        def attach(engine: CrawlEngine) -> None:
+            engines.append(engine)
+            engine.on_checkpoint = save_checkpoint
+        
+        crawl = asyncio.create_task(service.parse_and_save_article(job.url, on_crawl_start=attach, checkpoint=checkpoint))
+        reporter = asyncio.create_task(self._report_progress(jobs, job_id, engines, job_lock, crawl, lease_lost))
+        article, error = None, None
+        try:
+            article = await crawl
+        except asyncio.CancelledError:
+            if not lease_lost.is_set():
+                raise
+        except Exception as e:
+            error = str(e)
+        finally:
+            reporter.cancel()
+            await asyncio.gather(reporter, return_exceptions=True)
+        
+        if lease_lost.is_set():
+            logger.warning(f"Crawl job {job_id} stopped: its lease was taken over by another worker")
+            return
+        
+        await self._save_progress(jobs, job_id, engines, job_lock)
+        if article is None:
+            error = error or "Не удалось спарсить статью"
+            await jobs.mark_finished(job_id, JOB_FAILED, error=error)
+            logger.error(f"Crawl job {job_id} failed: {error}")
+            return
+        
+        await jobs.mark_finished(job_id, JOB_SUCCEEDED, root_article_id=article.id)
+        logger.info(f"Crawl job {job_id} finished: root article {article.id}")
+    
+    async def _report_progress(
+        self,
+        jobs: CrawlJobRepository,
+        job_id: int,
+        engines: List[CrawlEngine],
+        job_lock: asyncio.Lock,
+        crawl: asyncio.Task,
+        lease_lost: asyncio.Event
+    ) -> None:
+        """Periodically renew the lease of a running job and store its crawl counters; cancel the crawl if the lease is lost."""
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            async with job_lock:
+                if not await jobs.extend_lease(job_id, self.owner, self.lease_seconds):
+                    lease_lost.set()
+                    crawl.cancel()
+                    return
+            await self._save_progress(jobs, job_id, engines, job_lock)
+    
+    async def _save_progress(
+        self,
+        jobs: CrawlJobRepository,
+        job_id: int,
+        engines: List[CrawlEngine],
+        job_lock: asyncio.Lock
+    ) -> None:
+        """Store the counters of the job crawl engine, if it has started."""
+        if not engines:
+            return
+        engine = engines[0]
+        async with job_lock:
+            await jobs.update_progress(
+                job_id,
+                pages_fetched=engine.stats.pages_fetched,
+                pages_queued=engine.queued,
+                pages_failed=engine.stats.pages_failed,
+                pages_skipped=engine.stats.pages_skipped
+            )
\ No newline at end of file
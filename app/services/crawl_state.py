@@ -0,0 +1,192 @@
+import hashlib
+import math
+from array import array
+from typing import Optional
+from loguru import logger
+
+from app.config import settings
+
+
+VISITED_BACKENDS = ("fingerprint", "bloom")
+
+
+def url_fingerprint(url: str) -> int:
+    """Intern a URL as a non-zero 64-bit integer id."""
+    fingerprint = int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+    return fingerprint or 1
+
+
+class FrontierEntry:
+    """One page waiting in the crawl frontier."""
+    
+    __slots__ = ("url", "depth", "parent_url")
+    
+    def __init__(self, url: str, depth: int, parent_url: Optional[str] = None):
+        self.url = url
+        self.depth = depth
+        self.parent_url = parent_url
+    
+    def __repr__(self) -> str:
+        """Readable form for logs and debugging."""
+        return f"FrontierEntry({self.url!r}, {self.depth}, {self.parent_url!r})"
+
+
+class FingerprintSet:
+    """Open-addressing hash set of 64-bit fingerprints stored in a flat array('Q')."""
+    
+    MAX_LOAD = 0.5
+    
+    def __init__(self, capacity: int = 1024):
+        size = 16
+        while size * self.MAX_LOAD < capacity:
+            size *= 2
+        self._slots = array("Q", [0]) * size
+        self._mask = size - 1
+        self._count = 0
+    
+    def __len__(self) -> int:
+        """Number of fingerprints added."""
+        return self._count
+    
+    def __contains__(self, fingerprint: int) -> bool:
+        """Whether the fingerprint was added."""
+        slots, mask = self._slots, self._mask
+        index = fingerprint & mask
+        while True:
+            value = slots[index]
+            if value == fingerprint:
+                return True
+            if value == 0:
+                return False
+            index = (index + 1) & mask
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the slot array."""
+        return self._slots.itemsize * len(self._slots)
+    
+    def add(self, fingerprint: int) -> bool:
+        """Insert a fingerprint; returns False when it was already present."""
+        if self._count + 1 > len(self._slots) * self.MAX_LOAD:
+            self._grow()
+        
+        slots, mask = self._slots, self._mask
+        index = fingerprint & mask
+        while True:
+            value = slots[index]
+            if value == 0:
+                slots[index] = fingerprint
+                self._count += 1
+                return True
+            if value == fingerprint:
+                return False
+            index = (index + 1) & mask
+    
+    def _grow(self) -> None:
+        """Double the slot array and reinsert every fingerprint."""
+        old_slots = self._slots
+        self._slots = array("Q", [0]) * (len(old_slots) * 2)
+        self._mask = len(self._slots) - 1
+        self._count = 0
+        for value in old_slots:
+            if value:
+                self.add(value)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 64-bit fingerprints with a target false-positive rate."""
+    
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, capacity)
+        self.num_bits = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+    
+    def __len__(self) -> int:
+        """Number of fingerprints added."""
+        return self._count
+    
+    def __contains__(self, fingerprint: int) -> bool:
+        """Whether the fingerprint was probably added."""
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(fingerprint))
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the bit array."""
+        return len(self._bits)
+    
+    @property
+    def error_rate(self) -> float:
+        """Expected false-positive rate at the current fill."""
+        return (1 - math.exp(-self.num_hashes * self._count / self.num_bits)) ** self.num_hashes
+    
+    def add(self, fingerprint: int) -> bool:
+        """Insert a fingerprint; returns False when it was (probably) already present."""
+        bits = self._bits
+        added = False
+        for position in self._positions(fingerprint):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                added = True
+        if added:
+            self._count += 1
+        return added
+    
+    def _positions(self, fingerprint: int):
+        """Bit positions of a fingerprint by double hashing its two 32-bit halves."""
+        first, second = fingerprint & 0xFFFFFFFF, (fingerprint >> 32) | 1
+        for i in range(self.num_hashes):
+            yield (first + i * second) % self.num_bits
+
+
+class CrawlState:
+    """Visited URLs of a crawl, interned to 64-bit fingerprints in a compact structure."""
+    
+    def __init__(
+        self,
+        backend: Optional[str] = None,
+        capacity: Optional[int] = None,
+        error_rate: Optional[float] = None
+    ):
+        self.backend = backend or settings.crawl_visited_backend
+        if self.backend not in VISITED_BACKENDS:
+            raise ValueError(f"Unknown visited set backend: {self.backend}")
+        
+        if self.backend == "bloom":
+            self._visited = BloomFilter(
+                capacity or settings.crawl_bloom_capacity,
+                error_rate or settings.crawl_bloom_error_rate
+            )
+        else:
+            self._visited = FingerprintSet(capacity or 1024)
+        self.warm = False
+    
+    def __len__(self) -> int:
+        """Number of URLs marked visited."""
+        return len(self._visited)
+    
+    def __contains__(self, url: str) -> bool:
+        """Whether the URL was marked visited."""
+        return url_fingerprint(url) in self._visited
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the visited structure."""
+        return self._visited.nbytes
+    
+    def claim(self, url: str) -> bool:
+        """Mark a URL visited; returns False when it was seen before."""
+        return self._visited.add(url_fingerprint(url))
+    
+    async def warm_start(self, article_repository) -> int:
+        """Mark every stored article visited, so known links need no database lookup."""
+        count = 0
+        async for url in article_repository.iter_urls():
+            self.claim(url)
+            count += 1
+        self.warm = True
+        logger.info(f"Warm-started crawl state with {count} stored URLs ({self.nbytes} bytes)")
+        return count
\ No newline at end of file
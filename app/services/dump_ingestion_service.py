@@ -0,0 +1,188 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+from loguru import logger
+
+from app.repositories.article_repository import ArticleRepository
+from app.parsers.dump_parser import DumpArticle, DumpPage, extract_pages, iter_dump_pages
+from app.parsers.mediawiki_api import article_url
+from app.schemas import ArticleCreate
+from app.config import settings
+
+
+@dataclass
+class DumpIngestionStats:
+    """Counters collected while a dump is being ingested."""
+    
+    pages_read: int = 0
+    articles_written: int = 0
+    parents_linked: int = 0
+    links_written: int = 0
+    batches_written: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent ingesting so far."""
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+    
+    @property
+    def articles_per_second(self) -> float:
+        """Write throughput of the ingestion."""
+        elapsed = self.elapsed
+        return self.articles_written / elapsed if elapsed > 0 else 0.0
+
+
+def _read_chunk(pages: Iterator[DumpPage], size: int) -> List[DumpPage]:
+    """Pull the next chunk of pages off the dump stream."""
+    return list(islice(pages, size))
+
+
+class DumpIngestionService:
+    """Bulk-load articles from a pages-articles XML dump without touching the live site."""
+    
+    MAX_CHILDREN = 5
+    CHUNK_SIZE = 100
+    PENDING_PARENTS_LIMIT = 1_000_000
+    
+    def __init__(
+        self,
+        article_repository: ArticleRepository,
+        executor: Optional[Executor] = None,
+        batch_size: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE,
+        max_children: int = MAX_CHILDREN,
+        pending_parents_limit: int = PENDING_PARENTS_LIMIT
+    ):
+        self.article_repository = article_repository
+        self.executor = executor
+        self.batch_size = max(1, batch_size or settings.dump_batch_size)
+        self.chunk_size = max(1, chunk_size)
+        self.max_children = max_children
+        self.pending_parents_limit = pending_parents_limit
+        self.stats = DumpIngestionStats()
+        
+        # Linked url -> (parent id, parent index in the unwritten batch, depth); oldest evicted first.
+        self._pending_parents: "OrderedDict[str, Tuple[Optional[int], Optional[int], int]]" = OrderedDict()
+    
+    async def ingest(self, path: str, base_url: str) -> DumpIngestionStats:
+        """Stream the dump, extract pages in the executor and write them in batches."""
+        self.stats = DumpIngestionStats()
+        self._pending_parents.clear()
+        loop = asyncio.get_running_loop()
+        max_in_flight = 2 * (getattr(self.executor, "_max_workers", 1) or 1)
+        
+        pages = iter_dump_pages(path)
+        in_flight = deque()
+        exhausted = False
+        buffer: List[DumpArticle] = []
+        
+        while True:
+            while not exhausted and len(in_flight) < max_in_flight:
+                chunk = await loop.run_in_executor(None, _read_chunk, pages, self.chunk_size)
+                if not chunk:
+                    exhausted = True
+                    break
+                self.stats.pages_read += len(chunk)
+                in_flight.append(self._extract(loop, chunk, base_url))
+            
+            if not in_flight:
+                break
+            
+            buffer.extend(await in_flight.popleft())
+            while len(buffer) >= self.batch_size:
+                await self._write(buffer[:self.batch_size], base_url)
+                buffer = buffer[self.batch_size:]
+        
+        if buffer:
+            await self._write(buffer, base_url)
+        
+        self.stats.finished_at = time.monotonic()
+        logger.info(
+            f"Ingested {path}: {self.stats.articles_written} articles from "
+            f"{self.stats.pages_read} pages in {self.stats.elapsed:.2f}s "
+            f"({self.stats.articles_per_second:.2f} articles/sec, {self.stats.parents_linked} parent links, "
+            f"{self.stats.links_written} links)"
+        )
+        return self.stats
+    
+    def _extract(self, loop: asyncio.AbstractEventLoop, chunk: List[DumpPage], base_url: str) -> asyncio.Future:
+        """Schedule extraction of one chunk, in the executor when there is one."""
+        if self.executor is not None:
+            return loop.run_in_executor(self.executor, extract_pages, chunk, base_url)
+        
+        future = loop.create_future()
+        future.set_result(extract_pages(chunk, base_url))
+        return future
+    
+    async def _write(self, parsed: List[DumpArticle], base_url: str) -> None:
+        """Write one batch of articles and remember where their links point."""
+        articles_data = []
+        local_parents = []
+        registered = []
+        
+        for index, (title, content, links) in enumerate(parsed):
+            url = article_url(base_url, title)
+            parent_id, parent_index, depth = self._pending_parents.pop(url, (None, None, 0))
+            if parent_index is not None:
+                local_parents.append((index, parent_index))
+            
+            articles_data.append(ArticleCreate(
+                url=url,
+                title=title,
+                content=content,
+                depth_level=depth,
+                parent_id=parent_id
+            ))
+            
+            for link in links[:self.max_children]:
+                if link == url or link in self._pending_parents:
+                    continue
+                self._pending_parents[link] = (None, index, depth + 1)
+                registered.append(link)
+                if len(self._pending_parents) > self.pending_parents_limit:
+                    self._pending_parents.popitem(last=False)
+        
+        # Articles, their links and the parents found within the batch are written in one transaction.
+        try:
+            ids = await self.article_repository.create_many(articles_data, commit=False)
+            links_written = await self.article_repository.add_links({
+                ids[article_data.url]: links
+                for article_data, (_, _, links) in zip(articles_data, parsed) if article_data.url in ids
+            }, commit=False)
+            
+            resolved_parents = [
+                (ids[articles_data[index].url], ids[articles_data[parent_index].url])
+                for index, parent_index in local_parents
+                if articles_data[index].url in ids and articles_data[parent_index].url in ids
+            ]
+            if resolved_parents:
+                await self.article_repository.set_parents(resolved_parents, commit=False)
+            await self.article_repository.session.commit()
+        except Exception:
+            await self.article_repository.session.rollback()
+            raise
+        self.stats.links_written += links_written
+        
+        for link in registered:
+            pending = self._pending_parents.get(link)
+            if pending is None or pending[1] is None:
+                continue
+            parent_id = ids.get(articles_data[pending[1]].url)
+            if parent_id is None:
+                del self._pending_parents[link]
+            else:
+                self._pending_parents[link] = (parent_id, None, pending[2])
+        
+        self.stats.articles_written += len(ids)
+        self.stats.parents_linked += len(resolved_parents) + sum(
+            1 for article_data in articles_data if article_data.parent_id and article_data.url in ids
+        )
+        self.stats.batches_written += 1
+        logger.info(f"Wrote batch of {len(ids)} articles ({self.stats.articles_written} total)")
\ No newline at end of file
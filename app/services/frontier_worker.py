@@ -0,0 +1,121 @@
+import asyncio
+import os
+import socket
+import time
+from typing import List, Optional
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.models import FrontierItem
+from app.parsers.wikipedia_parser import WikipediaParser
+from app.repositories.article_repository import ArticleRepository
+from app.repositories.frontier_repository import FrontierRepository, FRONTIER_LEASED, FRONTIER_PENDING
+from app.schemas import ArticleCreate
+from app.services.crawl_engine import CrawlEngine, CrawlStats
+
+
+class FrontierWorker:
+    """Crawl worker that leases batches from the crawl_frontier table shared by all processes and nodes."""
+    
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        parser: WikipediaParser,
+        owner: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        lease_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        max_children: int = CrawlEngine.MAX_CHILDREN
+    ):
+        self.session_maker = session_maker
+        self.parser = parser
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.batch_size = max(1, batch_size or settings.frontier_batch_size)
+        self.lease_seconds = lease_seconds or settings.frontier_lease_seconds
+        self.max_attempts = max(1, max_attempts or settings.frontier_max_attempts)
+        self.poll_interval = poll_interval or settings.frontier_poll_interval
+        self.max_children = max_children
+        self.stats = CrawlStats()
+    
+    async def run(self, exit_when_idle: bool = True) -> CrawlStats:
+        """Claim and crawl batches until the frontier is drained, or forever when exit_when_idle is off."""
+        self.stats = CrawlStats()
+        async with self.session_maker() as session:
+            frontier = FrontierRepository(session)
+            while True:
+                items = await frontier.claim(self.owner, self.batch_size, self.lease_seconds)
+                if items:
+                    await self._process(session, items)
+                    continue
+                
+                counts = await frontier.counts()
+                if exit_when_idle and not counts.get(FRONTIER_PENDING) and not counts.get(FRONTIER_LEASED):
+                    break
+                await asyncio.sleep(self.poll_interval)
+        
+        self.stats.finished_at = time.monotonic()
+        logger.info(
+            f"Frontier worker {self.owner} finished: {self.stats.pages_fetched} pages, "
+            f"{self.stats.pages_failed} failed, {self.stats.pages_skipped} skipped in {self.stats.elapsed:.2f}s "
+            f"({self.stats.pages_per_second:.2f} pages/sec, {self.stats.write_batches} batches)"
+        )
+        return self.stats
+    
+    async def _process(self, session: AsyncSession, items: List[FrontierItem]) -> None:
+        """Fetch a leased batch, then store its articles, enqueue their children and complete it in one transaction."""
+        frontier = FrontierRepository(session)
+        articles = ArticleRepository(session)
+        item_ids = [item.id for item in items]
+        try:
+            results = await self.parser.parse_articles([item.url for item in items])
+        except Exception as e:
+            results = {}
+            logger.error(f"Error parsing frontier batch: {str(e)}")
+        
+        parsed = [item for item in items if item.url in results]
+        failed_ids = [item.id for item in items if item.url not in results]
+        
+        links = {}
+        for item in parsed:
+            if item.depth < item.max_depth:
+                links[item.url] = results[item.url][2][:self.max_children]
+        try:
+            known = await articles.get_ids_by_urls(list({link for item_links in links.values() for link in item_links}))
+            created = await articles.create_many(
+                [
+                    ArticleCreate(
+                        url=item.url,
+                        title=results[item.url][0],
+                        content=results[item.url][1],
+                        depth_level=item.depth,
+                        parent_id=item.parent_id
+                    )
+                    for item in parsed
+                ],
+                commit=False
+            )
+            children = [
+                {"url": link, "depth": item.depth + 1, "max_depth": item.max_depth, "parent_id": created[item.url]}
+                for item in parsed if item.url in created
+                for link in links.get(item.url, []) if link not in known
+            ]
+            await articles.add_links(
+                {created[item.url]: results[item.url][2] for item in parsed if item.url in created}, commit=False
+            )
+            await frontier.enqueue(children, commit=False)
+            await frontier.complete([item.id for item in parsed], commit=True)
+        except Exception as e:
+            await session.rollback()
+            failed_ids = item_ids
+            parsed = []
+            created = {}
+            logger.error(f"Error saving frontier batch of {len(items)} pages: {str(e)}")
+        
+        self.stats.write_batches += 1 if parsed else 0
+        self.stats.pages_fetched += len(created)
+        self.stats.pages_skipped += len(parsed) - len(created)
+        self.stats.pages_failed += len(failed_ids)
+        if failed_ids:
+            await frontier.release(failed_ids, "page could not be fetched or stored", self.max_attempts)
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""Bring a database created by an earlier release up to the current models.
+
+Run from the repository root before starting a new release; it is safe to run again:
+    
+    python -m app.upgrade_schema [--database-url URL]
+
+create_all only creates missing tables, so columns and indexes added to existing tables are added here.
+"""
+import argparse
+import asyncio
+
+from loguru import logger
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from app.database import Base
+import app.models  # noqa: F401  registers the tables on Base.metadata
+
+
+# Column name and DDL of every column added to a table after the table was first released.
+ADDED_COLUMNS = {
+    "articles": [
+        ("summary_prompt_tokens", "INTEGER"),
+        ("summary_completion_tokens", "INTEGER"),
+        ("summary_extractive", "BOOLEAN DEFAULT false"),
+    ],
+    "crawl_jobs": [
+        ("lease_owner", "VARCHAR"),
+        ("lease_expires_at", "TIMESTAMP WITH TIME ZONE"),
+    ],
+}
+
+# Indexes added to tables after the tables were first released.
+ADDED_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_articles_parent_id_id ON articles (parent_id, id)",
+    "CREATE INDEX IF NOT EXISTS ix_articles_depth_level_id ON articles (depth_level, id)",
+]
+
+
+def upgrade_schema(conn: Connection) -> None:
+    """Create missing tables, columns and indexes; pass to AsyncConnection.run_sync."""
+    Base.metadata.create_all(conn)
+    inspector = inspect(conn)
+    for table_name, columns in ADDED_COLUMNS.items():
+        existing = {column["name"] for column in inspector.get_columns(table_name)}
+        for name, ddl in columns:
+            if name not in existing:
+                conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {name} {ddl}"))
+                logger.info(f"Added column {table_name}.{name}")
+    for statement in ADDED_INDEXES:
+        conn.execute(text(statement))
+
+
+async def run(database_url: str) -> None:
+    """Upgrade one database."""
+    engine = create_async_engine(database_url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(upgrade_schema)
+        logger.info("Database schema is up to date")
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Parse command line arguments and upgrade the schema."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=settings.database_url)
+    args = parser.parse_args()
+    
+    asyncio.run(run(args.database_url))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
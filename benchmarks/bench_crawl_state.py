@@ -0,0 +1,73 @@
+"""Bytes per tracked URL of crawl visited sets and frontier records.
+
+Run from the repository root:
+    
+    python -m benchmarks.bench_crawl_state [--urls N]
+"""
+import argparse
+import time
+import tracemalloc
+
+from app.services.crawl_state import BloomFilter, FingerprintSet, FrontierEntry, url_fingerprint
+
+
+def make_urls(count: int):
+    """Build distinct article URLs of realistic length."""
+    return [f"https://ru.wikipedia.org/wiki/%D0%A1%D1%82%D0%B0%D1%82%D1%8C%D1%8F_{i}" for i in range(count)]
+
+
+def measure(build) -> tuple:
+    """Return (bytes allocated, seconds) of building one structure."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    structure = build()
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del structure
+    return size, elapsed
+
+
+def main() -> None:
+    """Print memory per URL of every visited set and frontier representation."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--urls", type=int, default=1_000_000)
+    args = arg_parser.parse_args()
+    
+    urls = make_urls(args.urls)
+    fingerprints = [url_fingerprint(url) for url in urls]
+    
+    def build_fingerprint_set():
+        visited = FingerprintSet(capacity=len(fingerprints))
+        for fingerprint in fingerprints:
+            visited.add(fingerprint)
+        return visited
+    
+    def build_bloom(error_rate):
+        def build():
+            visited = BloomFilter(len(fingerprints), error_rate)
+            for fingerprint in fingerprints:
+                visited.add(fingerprint)
+            return visited
+        return build
+    
+    visited_sets = {
+        "set[str] (copied URLs)": lambda: {url.encode().decode() for url in urls},
+        "fingerprint array": build_fingerprint_set,
+        "bloom 1%": build_bloom(0.01),
+        "bloom 0.1%": build_bloom(0.001),
+    }
+    frontiers = {
+        "tuple entries": lambda: [(url, 3, None) for url in urls],
+        "__slots__ entries": lambda: [FrontierEntry(url, 3) for url in urls],
+    }
+    
+    print(f"{args.urls} URLs")
+    print(f"{'structure':<24} {'MB':>8} {'bytes/URL':>10} {'seconds':>8}")
+    for name, build in {**visited_sets, **frontiers}.items():
+        size, elapsed = measure(build)
+        print(f"{name:<24} {size / 2 ** 20:>8.1f} {size / args.urls:>10.1f} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""Micro-benchmark of the bs4 and lxml extraction backends.
+
+Run from the repository root:
+    
+    python -m benchmarks.bench_extraction [--rounds N]
+"""
+import argparse
+import time
+from pathlib import Path
+
+from app.parsers.wikipedia_parser import WikipediaParser, PARSER_BACKENDS
+
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "wikipedia"
+BASE_URL = "https://ru.wikipedia.org"
+
+
+def load_fixtures():
+    """Load saved Wikipedia pages."""
+    return {path.name: path.read_text(encoding="utf-8") for path in sorted(FIXTURES_DIR.glob("*.html"))}
+
+
+def measure(parser: WikipediaParser, html: str, rounds: int) -> float:
+    """Return mean CPU milliseconds per extraction."""
+    parser.extract(html, BASE_URL)
+    started = time.process_time()
+    for _ in range(rounds):
+        parser.extract(html, BASE_URL)
+    return (time.process_time() - started) / rounds * 1000
+
+
+def main() -> None:
+    """Print per-page CPU time of every backend."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--rounds", type=int, default=20)
+    args = arg_parser.parse_args()
+    
+    fixtures = load_fixtures()
+    parsers = {backend: WikipediaParser(backend=backend) for backend in PARSER_BACKENDS}
+    
+    print(f"{'page':<20} {'size KB':>8} " + " ".join(f"{b + ' ms':>10}" for b in PARSER_BACKENDS) + f" {'speedup':>8}")
+    totals = {backend: 0.0 for backend in PARSER_BACKENDS}
+    for name, html in fixtures.items():
+        results = {backend: measure(parser, html, args.rounds) for backend, parser in parsers.items()}
+        expected = parsers["bs4"].extract(html, BASE_URL)
+        assert parsers["lxml"].extract(html, BASE_URL) == expected, f"backends disagree on {name}"
+        for backend, value in results.items():
+            totals[backend] += value
+        print(
+            f"{name:<20} {len(html.encode('utf-8')) / 1024:>8.0f} "
+            + " ".join(f"{results[b]:>10.2f}" for b in PARSER_BACKENDS)
+            + f" {results['bs4'] / results['lxml']:>7.1f}x"
+        )
+    
+    pages = len(fixtures)
+    print(
+        f"{'mean per page':<20} {'':>8} "
+        + " ".join(f"{totals[b] / pages:>10.2f}" for b in PARSER_BACKENDS)
+        + f" {totals['bs4'] / totals['lxml']:>7.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""Throughput of the local extractive summarizer on one core.
+
+Run from the repository root:
+    
+    python -m benchmarks.bench_extractive [--rounds N]
+"""
+import argparse
+import time
+from pathlib import Path
+
+from app.ai.extractive_summarizer import ExtractiveSummarizer
+from app.parsers.wikipedia_parser import WikipediaParser
+
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "wikipedia"
+BASE_URL = "https://ru.wikipedia.org"
+
+
+def load_articles():
+    """Titles and text of the saved Wikipedia pages."""
+    parser = WikipediaParser()
+    articles = {}
+    for path in sorted(FIXTURES_DIR.glob("*.html")):
+        title, content, _ = parser.extract(path.read_text(encoding="utf-8"), BASE_URL)
+        articles[path.name] = (title, content)
+    return articles
+
+
+def measure(summarizer: ExtractiveSummarizer, title: str, content: str, rounds: int) -> float:
+    """Return mean CPU milliseconds per summary."""
+    summarizer.summarize(title, content)
+    started = time.process_time()
+    for _ in range(rounds):
+        summarizer.summarize(title, content)
+    return (time.process_time() - started) / rounds * 1000
+
+
+def main() -> None:
+    """Print per-article CPU time and articles per second."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--rounds", type=int, default=500)
+    args = arg_parser.parse_args()
+    
+    summarizer = ExtractiveSummarizer()
+    articles = load_articles()
+    
+    print(f"{'page':<20} {'text KB':>8} {'ms':>8} {'articles/s':>11}")
+    total = 0.0
+    for name, (title, content) in articles.items():
+        milliseconds = measure(summarizer, title, content, args.rounds)
+        total += milliseconds
+        print(f"{name:<20} {len(content.encode('utf-8')) / 1024:>8.1f} {milliseconds:>8.3f} {1000 / milliseconds:>11.0f}")
+    
+    mean = total / len(articles)
+    print(f"{'mean per article':<20} {'':>8} {mean:>8.3f} {1000 / mean:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""Event-loop lag and throughput of HTML parsing with and without an executor.
+
+Run from the repository root:
+    
+    python -m benchmarks.bench_parse_executor [--pages N] [--backend bs4|lxml] [--workers N]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.parsers.executor import PARSER_EXECUTORS, create_parse_executor
+from app.parsers.wikipedia_parser import WikipediaParser, PARSER_BACKENDS
+from benchmarks.bench_extraction import FIXTURES_DIR, BASE_URL
+
+
+LAG_INTERVAL = 0.005
+
+
+async def run_mode(mode: str, bodies, backend: str, workers: int, concurrency: int) -> dict:
+    """Parse all bodies with one executor mode while sampling event-loop lag."""
+    executor = create_parse_executor(mode, workers)
+    parser = WikipediaParser(backend=backend, streaming=False, executor=executor)
+    loop = asyncio.get_running_loop()
+    lags = []
+    running = True
+    
+    async def monitor():
+        while running:
+            started = loop.time()
+            await asyncio.sleep(LAG_INTERVAL)
+            lags.append(loop.time() - started - LAG_INTERVAL)
+    
+    async def parse(body: bytes, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            if executor is None:
+                parser.extract(body.decode("utf-8"), BASE_URL)
+                await asyncio.sleep(0)
+            else:
+                await parser.extract_in_executor(executor, body, "utf-8", BASE_URL)
+    
+    if executor is not None:
+        await asyncio.gather(*(parser.extract_in_executor(executor, bodies[0], "utf-8", BASE_URL) for _ in range(workers)))
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    monitor_task = asyncio.create_task(monitor())
+    started = time.perf_counter()
+    await asyncio.gather(*(parse(body, semaphore) for body in bodies))
+    elapsed = time.perf_counter() - started
+    running = False
+    await monitor_task
+    
+    if executor is not None:
+        executor.shutdown()
+    
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    return {
+        "pages_per_sec": len(bodies) / elapsed,
+        "lag_mean_ms": statistics.fmean(lags_ms),
+        "lag_p99_ms": lags_ms[int(len(lags_ms) * 0.99) - 1] if len(lags_ms) > 1 else lags_ms[0],
+        "lag_max_ms": lags_ms[-1],
+    }
+
+
+async def main_async(args) -> None:
+    """Benchmark every executor mode on the saved fixtures."""
+    fixtures = [path.read_bytes() for path in sorted(FIXTURES_DIR.glob("*.html"))]
+    bodies = [fixtures[i % len(fixtures)] for i in range(args.pages)]
+    
+    print(f"{args.pages} pages, backend={args.backend}, workers={args.workers}, concurrency={args.concurrency}")
+    print(f"{'mode':<8} {'pages/s':>9} {'lag mean ms':>12} {'lag p99 ms':>11} {'lag max ms':>11}")
+    for mode in PARSER_EXECUTORS:
+        result = await run_mode(mode, bodies, args.backend, args.workers, args.concurrency)
+        print(
+            f"{mode:<8} {result['pages_per_sec']:>9.1f} {result['lag_mean_ms']:>12.2f} "
+            f"{result['lag_p99_ms']:>11.2f} {result['lag_max_ms']:>11.2f}"
+        )
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--pages", type=int, default=48)
+    arg_parser.add_argument("--backend", choices=PARSER_BACKENDS, default="bs4")
+    arg_parser.add_argument("--workers", type=int, default=4)
+    arg_parser.add_argument("--concurrency", type=int, default=8)
+    asyncio.run(main_async(arg_parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""Database size and metadata scan time with inline article text against compressed, deduplicated bodies.
+
+Run from the repository root (SQLite files):
+    
+    python -m benchmarks.bench_storage [--articles N] [--mirrors N]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import Boolean, Column, Integer, MetaData, String, Table, Text, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import Base
+from app.models import Article
+from app.repositories.article_repository import ArticleRepository
+from app.schemas import ArticleCreate
+from benchmarks.bench_extractive import load_articles
+
+
+ROUNDS = 20
+
+# The articles table before bodies moved into article_bodies.
+inline_articles = Table(
+    "articles",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("url", String(500), unique=True, nullable=False),
+    Column("title", String(500), nullable=False),
+    Column("content", Text, nullable=False),
+    Column("summary_generated", Boolean, default=False),
+    Column("parent_id", Integer),
+)
+
+
+def make_articles(count: int, mirrors: int):
+    """Articles built from the saved pages, each text repeated under mirrors URLs as mirror hosts and redirects do."""
+    pages = list(load_articles().values())
+    articles = []
+    for index in range(count):
+        title, content = pages[index // mirrors % len(pages)]
+        # Distinct texts differ by their first line, mirrors of one text are identical.
+        text = f"{title} {index // mirrors}\n{content}"
+        articles.append(ArticleCreate(url=f"https://ru.wikipedia.org/wiki/Bench_{index}", title=title, content=text))
+    return articles
+
+
+async def measure(engine: AsyncEngine, statement) -> float:
+    """Return mean milliseconds of a full scan."""
+    async with engine.connect() as conn:
+        (await conn.execute(statement)).all()
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            (await conn.execute(statement)).all()
+    return (time.perf_counter() - started) / ROUNDS * 1000
+
+
+async def fill_inline(path: Path, articles) -> float:
+    """Store articles with text inline and return the scan time of their metadata."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(inline_articles.metadata.create_all)
+        await conn.execute(inline_articles.insert(), [
+            {"url": article.url, "title": article.title, "content": article.content, "summary_generated": False}
+            for article in articles
+        ])
+    milliseconds = await measure(engine, select(inline_articles.c.id, inline_articles.c.title).where(
+        inline_articles.c.summary_generated == False
+    ))
+    await engine.dispose()
+    return milliseconds
+
+
+async def fill_bodies(path: Path, articles) -> float:
+    """Store articles through the repository and return the scan time of their metadata."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, class_=AsyncSession)() as session:
+        repository = ArticleRepository(session)
+        for start in range(0, len(articles), 1000):
+            await repository.create_many(articles[start:start + 1000])
+    milliseconds = await measure(engine, select(Article.id, Article.title).where(Article.summary_generated == False))
+    await engine.dispose()
+    return milliseconds
+
+
+async def main_async(args) -> None:
+    """Fill both layouts with the same articles and compare file sizes and scan times."""
+    articles = make_articles(args.articles, args.mirrors)
+    text_bytes = sum(len(article.content.encode("utf-8")) for article in articles)
+    with tempfile.TemporaryDirectory() as directory:
+        inline_path = Path(directory) / "inline.db"
+        bodies_path = Path(directory) / "bodies.db"
+        inline_ms = await fill_inline(inline_path, articles)
+        bodies_ms = await fill_bodies(bodies_path, articles)
+        
+        print(f"{args.articles} articles, {args.articles // args.mirrors} distinct texts, {text_bytes / 2 ** 20:.1f} MB of text")
+        print(f"{'layout':<10} {'file MB':>8} {'scan ms':>8}")
+        print(f"{'inline':<10} {inline_path.stat().st_size / 2 ** 20:>8.1f} {inline_ms:>8.2f}")
+        print(f"{'bodies':<10} {bodies_path.stat().st_size / 2 ** 20:>8.1f} {bodies_ms:>8.2f}")
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--articles", type=int, default=5000)
+    arg_parser.add_argument("--mirrors", type=int, default=2, help="URLs sharing each text")
+    asyncio.run(main_async(arg_parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
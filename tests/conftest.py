@@ -1,9 +1,15 @@
 import pytest
 import pytest_asyncio
 import asyncio
+import gzip
+import json
+from pathlib import Path
 from typing import AsyncGenerator
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
@@ -42,6 +48,42 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
     await engine.dispose()
 
 
+# Schema of the articles table created by the first release, before any column or index was added to it.
+BASELINE_SCHEMA = [
+    """
+    CREATE TABLE articles (
+        id INTEGER NOT NULL,
+        url VARCHAR NOT NULL,
+        title VARCHAR NOT NULL,
+        content TEXT NOT NULL,
+        depth_level INTEGER NOT NULL,
+        summary TEXT,
+        summary_generated BOOLEAN,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME,
+        parent_id INTEGER,
+        PRIMARY KEY (id),
+        FOREIGN KEY(parent_id) REFERENCES articles (id)
+    )
+    """,
+    "CREATE INDEX ix_articles_id ON articles (id)",
+    "CREATE UNIQUE INDEX ix_articles_url ON articles (url)",
+]
+
+
+@pytest_asyncio.fixture
+async def baseline_engine(tmp_path) -> AsyncGenerator[AsyncEngine, None]:
+    """Create a database file with the articles table of the first release."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'baseline.db'}")
+    async with engine.begin() as conn:
+        for statement in BASELINE_SCHEMA:
+            await conn.execute(text(statement))
+    
+    yield engine
+    
+    await engine.dispose()
+
+
 @pytest_asyncio.fixture
 async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     """Create test client with dependency overrides."""
@@ -72,4 +114,208 @@ def sample_article_data() -> dict:
         "title": "Test Article",
         "content": "This is a test article content with enough text to be meaningful.",
         "depth_level": 0
-    } 
\ No newline at end of file
+    } 
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "wikipedia"
+
+
+class WikipediaStub:
+    """Local stand-in for a Wikipedia host serving a synthetic link tree."""
+    
+    def __init__(self, delay: float = 0.0, fanout: int = 10):
+        self.delay = delay
+        self.fanout = fanout
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.not_modified = 0
+        self.versions = {}
+        self.gzip_fixtures = False
+        self.app = web.Application()
+        self.app.router.add_get("/wiki/{name}", self.handle_article)
+        self.app.router.add_get("/fixtures/{name}", self.handle_fixture)
+    
+    def render(self, name: str) -> str:
+        """Render a Wikipedia-like page whose links form a tree below name."""
+        links = "".join(
+            f'<a href="/wiki/{name}_{i}">{name} {i}</a> ' for i in range(self.fanout)
+        )
+        return f"""
+        <html>
+            <body>
+                <h1 class="firstHeading">{name}</h1>
+                <div id="mw-content-text">
+                    <p>Article {name} has a first paragraph long enough to be kept as content.</p>
+                    <p>{links}</p>
+                    <p>Second paragraph of {name} with enough characters to pass the length check.</p>
+                    <a href="/wiki/File:{name}.jpg">File</a>
+                </div>
+            </body>
+        </html>
+        """
+    
+    async def handle_article(self, request: web.Request) -> web.Response:
+        """Serve one synthetic article."""
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            name = request.match_info["name"]
+            etag = f'"{name}-{self.versions.get(name, 1)}"'
+            if request.headers.get("If-None-Match") == etag:
+                self.not_modified += 1
+                return web.Response(status=304, headers={"ETag": etag})
+            return web.Response(text=self.render(name), content_type="text/html", headers={"ETag": etag})
+        finally:
+            self.in_flight -= 1
+    
+    async def handle_fixture(self, request: web.Request) -> web.Response:
+        """Serve a saved page from tests/fixtures/wikipedia, gzip-encoded if gzip_fixtures is set and the client accepts it."""
+        self.requests += 1
+        path = FIXTURES_DIR / request.match_info["name"]
+        if not path.is_file():
+            raise web.HTTPNotFound()
+        if self.gzip_fixtures and "gzip" in request.headers.get("Accept-Encoding", ""):
+            return web.Response(
+                body=gzip.compress(path.read_bytes()),
+                content_type="text/html",
+                charset="utf-8",
+                headers={"Content-Encoding": "gzip"}
+            )
+        return web.Response(body=path.read_bytes(), content_type="text/html", charset="utf-8")
+
+
+@pytest_asyncio.fixture
+async def wikipedia_stub() -> AsyncGenerator[TestServer, None]:
+    """Run a local Wikipedia stub server; the stub itself is exposed as server.stub."""
+    stub = WikipediaStub()
+    server = TestServer(stub.app)
+    server.stub = stub
+    await server.start_server()
+    yield server
+    await server.close()
+
+
+class OpenAIStub:
+    """Local stand-in for the chat completions endpoint, with scripted error responses."""
+    
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.stream_delay = 0.0
+        self.errors = []
+        self.omit = set()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompts = []
+        self.batch_sizes = []
+        self.app = web.Application()
+        self.app.router.add_post("/v1/chat/completions", self.handle_completion)
+    
+    async def handle_completion(self, request: web.Request) -> web.Response:
+        """Answer with the next scripted error status, or a summary echoing the article title."""
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if self.errors:
+                status = self.errors.pop(0)
+                return web.json_response(
+                    {"error": {"message": f"Stub error {status}", "type": "stub", "code": None}},
+                    status=status,
+                    headers={"Retry-After": "0"}
+                )
+            payload = await request.json()
+            if payload.get("stream"):
+                return await self.stream_completion(request, payload)
+            return web.json_response(self.complete(payload))
+        finally:
+            self.in_flight -= 1
+    
+    async def stream_completion(self, request: web.Request, payload: dict) -> web.StreamResponse:
+        """Send the completion word by word as server-sent chunks, stream_delay apart, then the usage chunk if asked."""
+        completion = self.complete(payload)
+        content = completion["choices"][0]["message"]["content"]
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        words = content.split(" ")
+        for index, word in enumerate(words):
+            chunk = {
+                "id": f"chatcmpl-{self.requests}",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": payload["model"],
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if index == 0 else " " + word},
+                    "finish_reason": "stop" if index == len(words) - 1 else None
+                }]
+            }
+            await response.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            if self.stream_delay:
+                await asyncio.sleep(self.stream_delay)
+        if payload.get("stream_options", {}).get("include_usage"):
+            chunk = {
+                "id": f"chatcmpl-{self.requests}",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": payload["model"],
+                "choices": [],
+                "usage": completion["usage"]
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+    
+    def complete(self, payload: dict) -> dict:
+        """Build a completion: "Summary of <title>", or structured summaries for a packed request."""
+        prompt = payload["messages"][-1]["content"]
+        self.prompts.append(prompt)
+        if payload.get("response_format", {}).get("type") == "json_object":
+            articles = json.loads(prompt)["articles"]
+            self.batch_sizes.append(len(articles))
+            content = json.dumps({"summaries": [
+                {"id": article["id"], "summary": f"Summary of {article['title']}"}
+                for article in articles if article["title"] not in self.omit
+            ]})
+        else:
+            title = prompt.split("Название:")[1].split("\n")[0].strip() if "Название:" in prompt else "?"
+            content = f"Summary of {title}"
+        return {
+            "id": f"chatcmpl-{self.requests}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": payload["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": 10, "total_tokens": len(prompt) // 4 + 10}
+        }
+    
+    def process_batch(self, input_path: Path, output_path: Path) -> None:
+        """Play the Batch API: answer every request line of an input file into an output file."""
+        with open(input_path, encoding="utf-8") as source, open(output_path, "w", encoding="utf-8") as target:
+            for number, line in enumerate(source):
+                request = json.loads(line)
+                record = {"id": f"batch_req_{number}", "custom_id": request["custom_id"], "error": None}
+                record["response"] = {"status_code": 200, "body": self.complete(request["body"])}
+                target.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+@pytest_asyncio.fixture
+async def openai_stub() -> AsyncGenerator[TestServer, None]:
+    """Run a local chat completions stub; the stub itself is exposed as server.stub."""
+    stub = OpenAIStub()
+    server = TestServer(stub.app)
+    server.stub = stub
+    await server.start_server()
+    yield server
+    await server.close()
\ No newline at end of file
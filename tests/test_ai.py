@@ -1,7 +1,14 @@
 import pytest
+import time
+from openai import RateLimitError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from unittest.mock import AsyncMock, patch, Mock
 
-from app.ai.summary_generator import SummaryGenerator
+from app.ai.extractive_summarizer import ExtractiveSummarizer
+from app.ai.rate_limiter import RateLimiter
+from app.ai.summary_cache import SummaryCache
+from app.ai.summary_generator import MODEL, SummaryGenerator, TokenUsage
+from app.ai.tokenizer import get_tokenizer
 
 
 class TestSummaryGenerator:
@@ -118,11 +125,460 @@ class TestSummaryGenerator:
         assert "3-5 предложений" in prompt
     
     def test_create_prompt_long_content_truncation(self, summary_generator):
-        """Test prompt creation truncates long content."""
+        """Test prompt creation truncates long content to the chunk token budget."""
         title = "Test Article"
-        long_content = "A" * 5000
+        long_content = "Очень длинный текст статьи. " * 2000
         
         prompt = summary_generator._create_prompt(title, long_content)
         
         content_in_prompt = prompt.split("Содержание:")[1].split("Требования")[0].strip()
-        assert len(content_in_prompt) <= 3000 
\ No newline at end of file
+        assert len(content_in_prompt) < len(long_content.strip())
+        assert summary_generator.tokenizer.count(content_in_prompt) <= summary_generator.chunk_tokens
+
+
+@pytest.fixture
+async def make_generator(openai_stub):
+    """Create generators pointed at the stub with fast retries, closing them afterwards."""
+    generators = []
+    
+    def make(**kwargs) -> SummaryGenerator:
+        generator = SummaryGenerator(
+            api_key="test-api-key",
+            base_url=str(openai_stub.make_url("/v1")),
+            rate_limiter=RateLimiter(),
+            retry_base_delay=0.01,
+            **kwargs
+        )
+        generators.append(generator)
+        return generator
+    
+    yield make
+    for generator in generators:
+        await generator.close()
+
+
+@pytest.fixture
+def cache_session_maker(db_session):
+    """Session maker on the test database for the persistent cache tier."""
+    return async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+
+
+class TestSummaryGeneratorRetries:
+    """Tests for SummaryGenerator against a local chat completions stub."""
+    
+    async def test_summarize_through_stub(self, openai_stub, make_generator):
+        """Test a summary is read from the completions response."""
+        generator = make_generator()
+        
+        assert await generator.summarize("Python", "Python is a language.") == "Summary of Python"
+        assert openai_stub.stub.requests == 1
+    
+    async def test_retries_rate_limits_and_server_errors(self, openai_stub, make_generator):
+        """Test 429 and 5xx responses are retried until a summary arrives."""
+        openai_stub.stub.errors = [429, 500, 503]
+        generator = make_generator(max_retries=3)
+        
+        assert await generator.summarize("Python", "Python is a language.") == "Summary of Python"
+        assert openai_stub.stub.requests == 4
+        assert generator.retries == 3
+    
+    async def test_gives_up_after_max_retries(self, openai_stub, make_generator):
+        """Test the last error is raised once retries are exhausted, and generate_summary reports it."""
+        openai_stub.stub.errors = [429] * 10
+        generator = make_generator(max_retries=2)
+        
+        with pytest.raises(RateLimitError):
+            await generator.summarize("Python", "Python is a language.")
+        assert openai_stub.stub.requests == 3
+        assert "Error generating summary" in await generator.generate_summary("Python", "Python is a language.")
+    
+    async def test_client_errors_are_not_retried(self, openai_stub, make_generator):
+        """Test a 400 response fails without retrying."""
+        openai_stub.stub.errors = [400]
+        generator = make_generator(max_retries=3)
+        
+        with pytest.raises(Exception):
+            await generator.summarize("Python", "Python is a language.")
+        assert openai_stub.stub.requests == 1
+
+
+class TestSummaryCache:
+    """Tests for skipping the API for content that was already summarized."""
+    
+    async def test_repeated_content_is_served_from_cache(self, openai_stub, make_generator, cache_session_maker):
+        """Test the second request for the same content is a hit that saves tokens."""
+        generator = make_generator(cache=SummaryCache(cache_session_maker))
+        
+        first = await generator.summarize("Python", "Python is a language.")
+        second = await generator.summarize("Python", "Python is a language.")
+        
+        assert first == second == "Summary of Python"
+        assert openai_stub.stub.requests == 1
+        assert generator.cache.stats.hits == 1
+        assert generator.cache.stats.misses == 1
+        assert generator.cache.stats.tokens_saved > 0
+    
+    async def test_persisted_summary_survives_restart(self, openai_stub, make_generator, cache_session_maker):
+        """Test a new process finds summaries in the database tier."""
+        await make_generator(cache=SummaryCache(cache_session_maker)).summarize("Python", "Python is a language.")
+        
+        generator = make_generator(cache=SummaryCache(cache_session_maker, memory_size=0))
+        
+        assert await generator.summarize("Python", "Python is a language.") == "Summary of Python"
+        assert openai_stub.stub.requests == 1
+        assert generator.cache.stats.hits == 1
+        assert generator.cache.stats.memory_hits == 0
+    
+    async def test_key_ignores_content_past_token_budget(self, openai_stub, make_generator):
+        """Test content beyond the article token budget does not change the key, while a different title does."""
+        generator = make_generator(cache=SummaryCache(), article_token_budget=200)
+        content = "Python is a language. " * 200
+        
+        await generator.summarize("Python", content)
+        await generator.summarize("Python", content + "More text nobody sends to the model.")
+        await generator.summarize("Mirror", content)
+        
+        assert openai_stub.stub.requests == 2
+        assert generator.cache.stats.memory_hits == 1
+    
+    async def test_memory_tier_evicts_least_recently_used(self):
+        """Test the LRU tier keeps only memory_size summaries."""
+        cache = SummaryCache(memory_size=2)
+        await cache.put("a", "model", "A")
+        await cache.put("b", "model", "B")
+        assert await cache.get("a") == "A"
+        await cache.put("c", "model", "C")
+        
+        assert await cache.get("b") is None
+        assert await cache.get("a") == "A"
+        assert await cache.get("c") == "C"
+
+
+class TestTokenizer:
+    """Tests for token budgeting, with tiktoken or with the size estimate."""
+    
+    @pytest.fixture
+    def tokenizer(self):
+        """Tokenizer of the summary model."""
+        return get_tokenizer(MODEL)
+    
+    def test_tokenizer_is_cached(self, tokenizer):
+        """Test the encoding is loaded once per model."""
+        assert get_tokenizer(MODEL) is tokenizer
+    
+    def test_cyrillic_costs_more_than_latin(self, tokenizer):
+        """Test token counts follow the text rather than its length in characters."""
+        assert tokenizer.count("Москва — столица России. " * 50) > tokenizer.count("Moscow is the capital. " * 50)
+    
+    def test_truncate_fits_budget(self, tokenizer):
+        """Test truncation keeps a prefix within the budget and leaves short text alone."""
+        text = "Первый абзац статьи о городе. " * 200
+        
+        truncated = tokenizer.truncate(text, 50)
+        
+        assert text.startswith(truncated)
+        assert 0 < tokenizer.count(truncated) <= 50
+        assert tokenizer.truncate("Коротко.", 50) == "Коротко."
+    
+    def test_split_breaks_between_paragraphs(self, tokenizer):
+        """Test chunks stay within budget, keep whole paragraphs and cut only oversized ones."""
+        paragraphs = [f"Абзац {i}: " + "история города и его жителей. " * 10 for i in range(12)]
+        text = "\n".join(paragraphs + ["Очень длинный абзац без переносов. " * 100])
+        
+        chunks = tokenizer.split(text, 200)
+        
+        assert len(chunks) > 3
+        assert all(tokenizer.count(chunk) <= 200 + 5 for chunk in chunks)
+        assert paragraphs[0] in chunks[0]
+        assert all(paragraph in "\n".join(chunks) for paragraph in paragraphs)
+
+
+class TestMapReduce:
+    """Tests for summarizing long articles chunk by chunk."""
+    
+    async def test_long_article_is_mapped_then_reduced(self, openai_stub, make_generator):
+        """Test chunks are summarized concurrently within the limit and reduced into one summary with usage."""
+        openai_stub.stub.delay = 0.02
+        generator = make_generator(chunk_tokens=150, chunk_concurrency=2)
+        content = "\n".join(f"Раздел {i}: " + "событие, дата и участники. " * 12 for i in range(10))
+        chunks = generator.tokenizer.split(content, 150)
+        
+        summary, usage = await generator.summarize_article("История", content)
+        
+        assert summary == "Summary of История"
+        assert len(chunks) > 2
+        assert openai_stub.stub.requests == len(chunks) + 1
+        assert openai_stub.stub.max_in_flight == 2
+        assert usage.requests == len(chunks) + 1
+        assert usage.prompt_tokens > 0 and usage.completion_tokens == 10 * usage.requests
+        assert "Пересказы фрагментов" in openai_stub.stub.prompts[-1]
+        assert all("Фрагмент:" in prompt for prompt in openai_stub.stub.prompts[:-1])
+    
+    async def test_short_article_is_one_request(self, openai_stub, make_generator):
+        """Test an article within the chunk budget is summarized by a single request."""
+        generator = make_generator(chunk_tokens=150)
+        
+        summary, usage = await generator.summarize_article("Python", "Python is a language.")
+        
+        assert summary == "Summary of Python"
+        assert usage.requests == 1
+        assert openai_stub.stub.requests == 1
+    
+    async def test_article_token_budget_limits_chunks(self, openai_stub, make_generator):
+        """Test content beyond the article token budget is not sent."""
+        generator = make_generator(chunk_tokens=100, article_token_budget=300)
+        content = "\n".join(f"Раздел {i}: " + "событие, дата и участники. " * 12 for i in range(30))
+        
+        await generator.summarize_article("История", content)
+        
+        assert openai_stub.stub.requests <= 300 // 100 + 2
+        assert "Раздел 29" not in "".join(openai_stub.stub.prompts)
+    
+    async def test_map_reduce_result_is_cached(self, openai_stub, make_generator):
+        """Test a long article summarized once is served from the cache with no usage."""
+        generator = make_generator(chunk_tokens=150, cache=SummaryCache())
+        content = "\n".join(f"Раздел {i}: " + "событие, дата и участники. " * 12 for i in range(6))
+        await generator.summarize_article("История", content)
+        requests = openai_stub.stub.requests
+        
+        summary, usage = await generator.summarize_article("История", content)
+        
+        assert summary == "Summary of История"
+        assert usage.requests == 0
+        assert openai_stub.stub.requests == requests
+        assert generator.cache.stats.hits == 1
+
+
+class TestStreamSummary:
+    """Tests for streaming a summary as the model produces it."""
+    
+    async def test_summary_arrives_in_pieces(self, openai_stub, make_generator):
+        """Test the streamed pieces join into the summary."""
+        generator = make_generator()
+        
+        pieces = [piece async for piece in generator.stream_summary("Big Bang", "The universe expanded.")]
+        
+        assert len(pieces) > 1
+        assert "".join(pieces) == "Summary of Big Bang"
+        assert openai_stub.stub.requests == 1
+    
+    async def test_stream_reports_usage(self, openai_stub, make_generator):
+        """Test the usage chunk at the end of the stream is added to usage."""
+        generator = make_generator()
+        usage = TokenUsage()
+        
+        [piece async for piece in generator.stream_summary("Big Bang", "The universe expanded.", usage=usage)]
+        
+        assert usage.requests == 1
+        assert usage.prompt_tokens > 0
+        assert usage.completion_tokens == 10
+    
+    async def test_stream_is_retried_before_first_piece(self, openai_stub, make_generator):
+        """Test a rate limited stream request is retried like a plain one."""
+        openai_stub.stub.errors = [429]
+        generator = make_generator(max_retries=2)
+        
+        pieces = [piece async for piece in generator.stream_summary("Python", "Python is a language.")]
+        
+        assert "".join(pieces) == "Summary of Python"
+        assert generator.retries == 1
+    
+    async def test_cached_summary_is_one_piece(self, openai_stub, make_generator):
+        """Test a streamed summary is cached and then served whole without a request."""
+        generator = make_generator(cache=SummaryCache())
+        [piece async for piece in generator.stream_summary("Python", "Python is a language.")]
+        
+        pieces = [piece async for piece in generator.stream_summary("Python", "Python is a language.")]
+        
+        assert pieces == ["Summary of Python"]
+        assert openai_stub.stub.requests == 1
+    
+    async def test_long_article_streams_reduce_step(self, openai_stub, make_generator):
+        """Test a long article is mapped first and only the reduce answer is streamed."""
+        generator = make_generator(chunk_tokens=150)
+        content = "\n".join(f"Раздел {i}: " + "событие, дата и участники. " * 12 for i in range(6))
+        
+        pieces = [piece async for piece in generator.stream_summary("История", content)]
+        
+        assert "".join(pieces) == "Summary of История"
+        assert openai_stub.stub.requests > 2
+        assert "Пересказы фрагментов" in openai_stub.stub.prompts[-1]
+
+
+class TestExtractiveSummaries:
+    """Tests for the local extractive summarizer and the engines that use it."""
+    
+    CONTENT = "\n".join([
+        "Python is a high-level programming language created by Guido van Rossum.",
+        "The weather in the mountains was cold that winter.",
+        "Python code is known for its readable syntax and significant indentation.",
+        "The programming language Python supports several programming paradigms.",
+        "Many people enjoy long walks on the beach at sunset.",
+        "Python has a large standard library for many programming tasks.",
+    ])
+    
+    def test_central_sentences_in_original_order(self):
+        """Test the sentences sharing the article's vocabulary are picked and keep their order."""
+        summary = ExtractiveSummarizer(sentences=3).summarize("Python", self.CONTENT)
+        
+        sentences = self.CONTENT.split("\n")
+        picked = [sentence for sentence in sentences if sentence in summary]
+        assert len(picked) == 3
+        assert summary == " ".join(picked)
+        assert "weather" not in summary and "beach" not in summary
+    
+    def test_short_article_is_kept_whole(self):
+        """Test an article with no more sentences than requested is returned as is, without headings."""
+        content = "History\nPython was released in 1991 by its author. It became popular later."
+        
+        assert ExtractiveSummarizer(sentences=3).summarize("Python", content) == (
+            "Python was released in 1991 by its author. It became popular later."
+        )
+    
+    async def test_extractive_engine_makes_no_request(self, openai_stub, make_generator):
+        """Test the extractive engine answers locally and marks the usage."""
+        generator = make_generator(engine="extractive")
+        
+        summary, usage = await generator.summarize_article("Python", self.CONTENT)
+        
+        assert summary.startswith("Python is a high-level programming language")
+        assert usage.extractive
+        assert usage.requests == 0
+        assert openai_stub.stub.requests == 0
+    
+    async def test_auto_engine_uses_api_within_budget(self, openai_stub, make_generator):
+        """Test the auto engine keeps the model's summary when it arrives in time."""
+        generator = make_generator(engine="auto", latency_budget=5)
+        
+        summary, usage = await generator.summarize_article("Python", self.CONTENT)
+        
+        assert summary == "Summary of Python"
+        assert not usage.extractive
+    
+    async def test_auto_engine_falls_back_after_budget(self, openai_stub, make_generator):
+        """Test a request slower than the latency budget is replaced by the extractive summary."""
+        openai_stub.stub.delay = 1.0
+        generator = make_generator(engine="auto", latency_budget=0.05)
+        
+        started = time.perf_counter()
+        summary, usage = await generator.summarize_article("Python", self.CONTENT)
+        
+        assert time.perf_counter() - started < 0.5
+        assert usage.extractive
+        assert "Guido van Rossum" in summary
+    
+    async def test_auto_engine_without_key(self, make_generator):
+        """Test generate_summary returns an extractive summary instead of an error when no key is set."""
+        generator = make_generator(engine="auto")
+        generator.api_key = ""
+        usage = TokenUsage()
+        
+        summary = await generator.generate_summary("Python", self.CONTENT, usage=usage)
+        
+        assert "Guido van Rossum" in summary
+        assert usage.extractive
+
+
+class TestBatchSummaries:
+    """Tests for packing several articles into one request and for offline batch files."""
+    
+    def test_pack_articles_respects_budget(self):
+        """Test packs are cut by article count and by the token budget."""
+        generator = SummaryGenerator(api_key="test-api-key", batch_max_articles=3)
+        short = [(i, f"Short {i}", "Short content.") for i in range(7)]
+        long = [(10, "Long A", "Long content. " * 300), (11, "Long B", "Long content. " * 300)]
+        generator.batch_max_tokens = generator._pack_tokens(long[:1]) + generator._pack_tokens(short[:1])
+        
+        assert [len(pack) for pack in generator.pack_articles(short)] == [3, 3, 1]
+        assert [[article[0] for article in pack] for pack in generator.pack_articles(long + short[:2])] == [[10], [11, 0], [1]]
+    
+    async def test_summarize_many_in_one_request(self, openai_stub, make_generator):
+        """Test a pack is answered by one request with a summary per article."""
+        generator = make_generator()
+        articles = [(i, f"Article {i}", f"Article {i} content.") for i in range(1, 5)]
+        
+        summaries = await generator.summarize_many(articles)
+        
+        assert summaries == {i: f"Summary of Article {i}" for i in range(1, 5)}
+        assert openai_stub.stub.requests == 1
+        assert openai_stub.stub.batch_sizes == [4]
+    
+    async def test_missing_answers_are_requested_alone(self, openai_stub, make_generator):
+        """Test an article the structured answer leaves out gets its own request."""
+        openai_stub.stub.omit = {"Article 2"}
+        generator = make_generator(cache=SummaryCache())
+        articles = [(i, f"Article {i}", f"Article {i} content.") for i in range(1, 4)]
+        
+        summaries = await generator.summarize_many(articles)
+        
+        assert summaries[2] == "Summary of Article 2"
+        assert len(summaries) == 3
+        assert openai_stub.stub.requests == 2
+        assert generator.cache.stats.misses == 3
+        
+        assert await generator.summarize_many(articles) == summaries
+        assert openai_stub.stub.requests == 2
+    
+    async def test_over_long_articles_are_summarized_concurrently(self, openai_stub, make_generator):
+        """Test over-long articles of a pack are map-reduced concurrently within the chunk concurrency limit."""
+        openai_stub.stub.delay = 0.02
+        generator = make_generator(chunk_tokens=150, chunk_concurrency=2)
+        content = "\n".join(f"Раздел {i}: " + "событие, дата и участники. " * 12 for i in range(10))
+        articles = [(1, "История", content), (2, "Хроника", content), (3, "Article 3", "Article 3 content.")]
+        
+        summaries = await generator.summarize_many(articles)
+        
+        assert summaries == {1: "Summary of История", 2: "Summary of Хроника", 3: "Summary of Article 3"}
+        assert openai_stub.stub.batch_sizes == [1]
+        assert 2 < openai_stub.stub.max_in_flight <= 2 * 2 + 1
+    
+    def test_offline_files_round_trip(self, openai_stub, tmp_path):
+        """Test request lines are answered by the batch stub and parsed back by article id."""
+        generator = SummaryGenerator(api_key="test-api-key", batch_max_articles=2)
+        articles = [(i, f"Article {i}", f"Article {i} content.") for i in range(1, 6)]
+        requests_path = tmp_path / "requests.jsonl"
+        results_path = tmp_path / "results.jsonl"
+        requests_path.write_text("\n".join(generator.batch_request_lines(articles)) + "\n", encoding="utf-8")
+        
+        openai_stub.stub.process_batch(requests_path, results_path)
+        with open(results_path, "a", encoding="utf-8") as file:
+            file.write('{"custom_id": "articles-9-9", "response": null, "error": {"message": "expired"}}\n')
+        
+        with open(results_path, encoding="utf-8") as file:
+            summaries = SummaryGenerator.parse_batch_results(file)
+        
+        assert summaries == {i: f"Summary of Article {i}" for i in range(1, 6)}
+        assert openai_stub.stub.batch_sizes == [2, 2, 1]
+
+
+class TestRateLimiter:
+    """Tests for the requests and tokens per minute budget."""
+    
+    async def test_burst_within_budget_does_not_wait(self):
+        """Test requests inside the per-minute budget pass immediately."""
+        limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=10000)
+        
+        waited = [await limiter.acquire(100) for _ in range(50)]
+        
+        assert sum(waited) == 0
+    
+    async def test_token_budget_throttles(self):
+        """Test a request waits until enough tokens have been refilled."""
+        limiter = RateLimiter(requests_per_minute=6000, tokens_per_minute=600)
+        await limiter.acquire(600)
+        
+        started = time.monotonic()
+        await limiter.acquire(5)
+        
+        assert time.monotonic() - started >= 0.4
+    
+    async def test_request_budget_throttles(self):
+        """Test the request count is limited independently of tokens."""
+        limiter = RateLimiter(requests_per_minute=120)
+        for _ in range(120):
+            await limiter.acquire()
+        
+        started = time.monotonic()
+        await limiter.acquire()
+        
+        assert time.monotonic() - started >= 0.4
\ No newline at end of file
@@ -0,0 +1,132 @@
+import pytest
+from sqlalchemy import inspect, select, text
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.compression import CODEC_TAGS, compress_text, content_hash, decompress_text
+from app.migrate_bodies import migrate
+from app.models import ArticleBody
+from app.repositories.article_repository import ArticleRepository
+from app.schemas import ArticleCreate
+
+
+TEXT = "Статья о тестировании сжатия. " * 50
+
+
+class TestCompression:
+    """Test body compression codecs."""
+    
+    @pytest.mark.parametrize("codec", ["none", "zlib"])
+    def test_round_trip(self, codec):
+        """Test text survives compression with its codec tag in front."""
+        data = compress_text(TEXT, codec)
+        
+        assert data[:1] == CODEC_TAGS[codec]
+        assert decompress_text(data) == TEXT
+    
+    def test_zlib_shrinks_repetitive_text(self):
+        """Test repetitive text is stored smaller than its UTF-8 encoding."""
+        assert len(compress_text(TEXT, "zlib")) < len(TEXT.encode("utf-8")) / 5
+    
+    def test_zstd_falls_back_to_a_readable_codec(self):
+        """Test zstd bodies decode whether or not zstandard is installed."""
+        assert decompress_text(compress_text(TEXT, "zstd")) == TEXT
+    
+    def test_unknown_codec(self):
+        """Test unknown codecs are rejected on both ends."""
+        with pytest.raises(ValueError):
+            compress_text(TEXT, "brotli")
+        with pytest.raises(ValueError):
+            decompress_text(b"?" + TEXT.encode("utf-8"))
+
+
+class TestBodyStorage:
+    """Test content-addressed article bodies."""
+    
+    @pytest.fixture
+    def repository(self, db_session: AsyncSession):
+        """Create ArticleRepository with test session."""
+        return ArticleRepository(db_session)
+    
+    async def test_identical_bodies_are_stored_once(self, repository, db_session):
+        """Test two URLs with the same text share one body row."""
+        await repository.create_many([
+            ArticleCreate(url="https://ru.wikipedia.org/wiki/A", title="A", content=TEXT),
+            ArticleCreate(url="https://ru.m.wikipedia.org/wiki/A", title="A", content=TEXT),
+            ArticleCreate(url="https://ru.wikipedia.org/wiki/B", title="B", content="Другой текст."),
+        ])
+        await repository.create(ArticleCreate(url="https://ru.wikipedia.org/wiki/C", title="C", content=TEXT))
+        
+        hashes = (await db_session.execute(select(ArticleBody.hash))).scalars().all()
+        assert sorted(hashes) == sorted([content_hash(TEXT), content_hash("Другой текст.")])
+    
+    async def test_body_is_loaded_only_on_request(self, repository, db_session):
+        """Test plain lookups leave the body unloaded and it is read on demand."""
+        created = await repository.create_many([
+            ArticleCreate(url="https://ru.wikipedia.org/wiki/A", title="A", content=TEXT)
+        ])
+        db_session.expunge_all()
+        
+        article = await repository.get_by_url("https://ru.wikipedia.org/wiki/A")
+        with pytest.raises(InvalidRequestError):
+            article.body
+        assert await repository.get_content(created["https://ru.wikipedia.org/wiki/A"]) == TEXT
+        
+        db_session.expunge_all()
+        article = await repository.get_by_url("https://ru.wikipedia.org/wiki/A", with_content=True)
+        assert article.content == TEXT
+
+
+class TestMigrateBodies:
+    """Test moving inline article text into article_bodies."""
+    
+    async def insert_legacy(self, engine):
+        """Store articles the way the first release did, with text inline."""
+        async with engine.begin() as conn:
+            await conn.execute(
+                text("INSERT INTO articles (url, title, content, depth_level, summary_generated) VALUES (:url, :title, :content, 0, 0)"),
+                [
+                    {"url": f"https://ru.wikipedia.org/wiki/{index}", "title": str(index), "content": TEXT if index % 2 else f"Текст {index}"}
+                    for index in range(7)
+                ]
+            )
+    
+    async def columns(self, engine):
+        """Names of the columns of articles."""
+        async with engine.connect() as conn:
+            return await conn.run_sync(lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns("articles")})
+    
+    async def test_migrate_legacy_database(self, baseline_engine):
+        """Test legacy rows get deduplicated bodies, lose the inline column and read through the repository."""
+        await self.insert_legacy(baseline_engine)
+        
+        stats = await migrate(baseline_engine, batch_size=3)
+        
+        assert stats.articles == 7
+        assert stats.bodies == 5
+        assert "content" not in await self.columns(baseline_engine)
+        async with async_sessionmaker(baseline_engine, class_=AsyncSession)() as session:
+            repository = ArticleRepository(session)
+            assert await repository.get_content(2) == TEXT
+            assert await repository.get_content(1) == "Текст 0"
+            article = await repository.get_by_url("https://ru.wikipedia.org/wiki/1", with_content=True)
+            assert (article.title, article.content, article.summary_extractive) == ("1", TEXT, False)
+            rows = await repository.list_page(["title", "content", "summary_prompt_tokens"], after_id=6)
+            assert [tuple(row) for row in rows] == [("6", "Текст 6", None)]
+        
+        assert (await migrate(baseline_engine)).articles == 0
+    
+    async def test_kept_column_accepts_new_articles(self, baseline_engine):
+        """Test articles written after a migration that kept articles.content are stored."""
+        await self.insert_legacy(baseline_engine)
+        
+        await migrate(baseline_engine, drop_column=False)
+        
+        assert "content" in await self.columns(baseline_engine)
+        async with async_sessionmaker(baseline_engine, class_=AsyncSession)() as session:
+            repository = ArticleRepository(session)
+            created = await repository.create_many([ArticleCreate(url="https://ru.wikipedia.org/wiki/New", title="New", content=TEXT)])
+            assert await repository.get_content(created["https://ru.wikipedia.org/wiki/New"]) == TEXT
+            assert (await repository.get_by_url("https://ru.wikipedia.org/wiki/3")).title == "3"
+        
+        assert (await migrate(baseline_engine, drop_column=False)).articles == 0
\ No newline at end of file
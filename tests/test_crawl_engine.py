@@ -0,0 +1,174 @@
+import asyncio
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from unittest.mock import AsyncMock
+
+from app.parsers.wikipedia_parser import WikipediaParser
+from app.repositories.article_repository import ArticleRepository
+from app.services.crawl_engine import CrawlEngine
+
+
+class TestCrawlEngine:
+    """Tests for CrawlEngine."""
+    
+    @pytest.fixture
+    def repository(self, db_session: AsyncSession):
+        """Create ArticleRepository with test session."""
+        return ArticleRepository(db_session)
+    
+    async def _crawl(self, server, repository, concurrency, max_depth=2):
+        """Crawl the stub tree from its root and return the engine."""
+        async with WikipediaParser() as parser:
+            engine = CrawlEngine(parser, repository, concurrency=concurrency, max_depth=max_depth)
+            root = await engine.crawl(str(server.make_url("/wiki/Root")))
+        return engine, root
+    
+    async def test_crawl_assigns_depth_and_parent(self, wikipedia_stub, repository):
+        """Test crawl respects depth, fan-out and parent links."""
+        engine, root = await self._crawl(wikipedia_stub, repository, concurrency=4)
+        
+        assert root is not None
+        assert root.title == "Root"
+        assert root.depth_level == 0
+        assert root.parent_id is None
+        assert engine.stats.pages_fetched == 1 + 5 + 25
+        assert engine.stats.pages_failed == 0
+        
+        child = await repository.get_by_url(str(wikipedia_stub.make_url("/wiki/Root_3")))
+        assert child.depth_level == 1
+        assert child.parent_id == root.id
+        
+        grandchild = await repository.get_by_url(str(wikipedia_stub.make_url("/wiki/Root_3_4")))
+        assert grandchild.depth_level == 2
+        assert grandchild.parent_id == child.id
+        
+        assert await repository.get_by_url(str(wikipedia_stub.make_url("/wiki/Root_5"))) is None
+        assert engine.stats.write_batches <= 3
+        assert await repository.get_by_url(str(wikipedia_stub.make_url("/wiki/Root_3_4_0"))) is None
+    
+    async def test_crawl_returns_existing_root(self, wikipedia_stub, repository):
+        """Test crawling an already stored root does not fetch anything."""
+        await self._crawl(wikipedia_stub, repository, concurrency=2, max_depth=0)
+        requests_before = wikipedia_stub.stub.requests
+        
+        engine, root = await self._crawl(wikipedia_stub, repository, concurrency=2)
+        
+        assert root is not None
+        assert engine.stats.pages_fetched == 0
+        assert wikipedia_stub.stub.requests == requests_before
+    
+    async def test_small_write_batches_keep_parents(self, wikipedia_stub, repository):
+        """Test children flushed in later batches still point at their parents."""
+        async with WikipediaParser() as parser:
+            engine = CrawlEngine(parser, repository, concurrency=2, max_depth=2, write_batch_size=4)
+            root = await engine.crawl(str(wikipedia_stub.make_url("/wiki/Root")))
+        
+        assert engine.stats.pages_fetched == 31
+        assert engine.stats.write_batches >= 31 // 4
+        
+        child = await repository.get_by_url(str(wikipedia_stub.make_url("/wiki/Root_1")))
+        grandchild = await repository.get_by_url(str(wikipedia_stub.make_url("/wiki/Root_1_2")))
+        assert child.parent_id == root.id
+        assert grandchild.parent_id == child.id
+    
+    async def test_link_filtering_uses_one_query_per_page(self, wikipedia_stub, repository, db_session):
+        """Test known children are filtered in bulk, so SELECTs grow with pages, not links."""
+        async with WikipediaParser() as parser:
+            await CrawlEngine(parser, repository, max_depth=1).crawl(str(wikipedia_stub.make_url("/wiki/Root_1")))
+        db_session.expunge_all()
+        selects = []
+        
+        def count_select(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                selects.append(statement)
+        
+        sync_engine = db_session.bind.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", count_select)
+        try:
+            engine, _ = await self._crawl(wikipedia_stub, repository, concurrency=2, max_depth=2)
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", count_select)
+        
+        pages_expanded = 1 + 4
+        assert engine.stats.pages_fetched == 1 + 4 + 4 * 5
+        assert engine.stats.pages_skipped == 1
+        assert len(selects) <= pages_expanded + 2
+    
+    async def test_resume_from_checkpoint(self, wikipedia_stub, repository):
+        """Test an interrupted crawl resumes from its checkpoint without re-walking finished pages."""
+        wikipedia_stub.stub.delay = 0.02
+        url = str(wikipedia_stub.make_url("/wiki/Root"))
+        checkpoints = []
+        checkpointed = asyncio.Event()
+        
+        async def save_checkpoint(state):
+            checkpoints.append(state)
+            if len(checkpoints) == 3:
+                checkpointed.set()
+        
+        async with WikipediaParser() as parser:
+            engine = CrawlEngine(
+                parser, repository, concurrency=2, max_depth=2, write_batch_size=3,
+                on_checkpoint=save_checkpoint, checkpoint_interval=0
+            )
+            crawl = asyncio.create_task(engine.crawl(url))
+            await checkpointed.wait()
+            crawl.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await crawl
+        
+        checkpoint = checkpoints[2]
+        assert checkpoint["frontier"] and checkpoint["pages_fetched"] > 0
+        requests_before = wikipedia_stub.stub.requests
+        
+        async with WikipediaParser() as parser:
+            engine = CrawlEngine(parser, repository, concurrency=2, max_depth=2)
+            root = await engine.crawl(url, checkpoint=checkpoint)
+        
+        assert root.title == "Root"
+        resumed_requests = wikipedia_stub.stub.requests - requests_before
+        assert resumed_requests < 31
+        assert resumed_requests <= len(checkpoint["frontier"]) + sum(
+            5 for _, depth, _ in checkpoint["frontier"] if depth == 1
+        )
+        assert engine.stats.pages_fetched >= 31
+        stored = await repository.get_ids_by_urls(
+            [str(wikipedia_stub.make_url(f"/wiki/Root_{i}_{j}")) for i in range(5) for j in range(5)]
+        )
+        assert len(stored) == 25
+        grandchild = await repository.get_by_url(str(wikipedia_stub.make_url("/wiki/Root_4_4")))
+        child = await repository.get_by_url(str(wikipedia_stub.make_url("/wiki/Root_4")))
+        assert grandchild.parent_id == child.id
+        assert child.parent_id == root.id
+    
+    async def test_crawl_counts_failures(self, repository):
+        """Test failing pages are counted and do not stop the crawl."""
+        parser = AsyncMock()
+        parser.parse_article.side_effect = ValueError("boom")
+        
+        engine = CrawlEngine(parser, repository, concurrency=2)
+        root = await engine.crawl("https://en.wikipedia.org/wiki/Broken")
+        
+        assert root is None
+        assert engine.stats.pages_failed == 1
+    
+    async def test_concurrency_speedup(self, wikipedia_stub, db_session):
+        """Test throughput scales close to linearly with the worker count."""
+        wikipedia_stub.stub.delay = 0.05
+        elapsed = {}
+        
+        for concurrency in (1, 4):
+            await db_session.execute(text("DELETE FROM articles"))
+            await db_session.commit()
+            db_session.expunge_all()
+            
+            engine, _ = await self._crawl(
+                wikipedia_stub, ArticleRepository(db_session), concurrency=concurrency
+            )
+            assert engine.stats.pages_fetched == 31
+            assert engine.stats.pages_per_second > 0
+            elapsed[concurrency] = engine.stats.elapsed
+        
+        assert wikipedia_stub.stub.max_in_flight <= 4
+        assert elapsed[1] / elapsed[4] > 2.5
\ No newline at end of file
@@ -0,0 +1,288 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, patch
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.database import Base
+from app.models import CrawlJob
+from app.repositories.article_repository import ArticleRepository
+from app.repositories.crawl_job_repository import CrawlJobRepository, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED
+from app.schemas import ArticleCreate
+from app.services.crawl_job_manager import CrawlJobManager
+
+
+@pytest_asyncio.fixture
+async def session_maker(tmp_path):
+    """Create a file database shared by the job and crawl sessions."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def summary_generator():
+    """Create a summary generator that never calls the API."""
+    generator = AsyncMock()
+    generator.generate_summary.return_value = "Summary"
+    return generator
+
+
+class TestCrawlJobManager:
+    """Tests for background crawl jobs."""
+    
+    @pytest.fixture(autouse=True)
+    def shallow_crawl(self, monkeypatch):
+        """Limit crawl depth and accept the local stub host as Wikipedia."""
+        monkeypatch.setattr(settings, "max_recursion_depth", 1)
+        with patch("app.parsers.wikipedia_parser.WikipediaParser.is_wikipedia_url", return_value=True):
+            yield
+    
+    async def test_submit_returns_queued_job(self, session_maker, summary_generator, wikipedia_stub):
+        """Test a submitted job is stored as queued before any page is fetched."""
+        manager = CrawlJobManager(session_maker, summary_generator, workers=1)
+        
+        job = await manager.submit(str(wikipedia_stub.make_url("/wiki/Root")))
+        
+        assert job.id is not None
+        assert job.status == JOB_QUEUED
+        assert wikipedia_stub.stub.requests == 0
+    
+    async def test_job_runs_to_completion(self, session_maker, summary_generator, wikipedia_stub):
+        """Test a worker crawls the job URL and stores the final counters."""
+        manager = CrawlJobManager(session_maker, summary_generator, workers=2)
+        await manager.start()
+        try:
+            job = await manager.submit(str(wikipedia_stub.make_url("/wiki/Root")))
+            await asyncio.wait_for(manager.join(), timeout=30)
+        finally:
+            await manager.stop()
+        
+        job = await manager.get_job(job.id)
+        assert job.status == JOB_SUCCEEDED
+        assert job.pages_fetched == 1 + 5
+        assert job.pages_queued == 0
+        assert job.pages_failed == 0
+        assert job.root_article_id is not None
+        assert job.started_at is not None and job.finished_at is not None
+        summary_generator.generate_summary.assert_awaited_once()
+    
+    async def test_progress_is_reported_while_running(self, session_maker, summary_generator, wikipedia_stub):
+        """Test counters of a running job are stored before it finishes."""
+        wikipedia_stub.stub.delay = 0.05
+        manager = CrawlJobManager(session_maker, summary_generator, workers=1, progress_interval=0.01)
+        progress = []
+        original = CrawlJobRepository.update_progress
+        
+        async def record_progress(repository, job_id, **counters):
+            progress.append(counters)
+            await original(repository, job_id, **counters)
+        
+        with patch.object(CrawlJobRepository, "update_progress", record_progress):
+            await manager.start()
+            try:
+                await manager.submit(str(wikipedia_stub.make_url("/wiki/Root")))
+                await asyncio.wait_for(manager.join(), timeout=30)
+            finally:
+                await manager.stop()
+        
+        assert len(progress) > 1
+        assert any(0 < counters["pages_fetched"] < 1 + 5 for counters in progress)
+    
+    async def test_queued_jobs_resume_on_start(self, session_maker, summary_generator, wikipedia_stub):
+        """Test jobs left queued by a previous process are picked up on start."""
+        async with session_maker() as session:
+            job = await CrawlJobRepository(session).create(str(wikipedia_stub.make_url("/wiki/Root")))
+        
+        manager = CrawlJobManager(session_maker, summary_generator, workers=1)
+        await manager.start()
+        try:
+            await asyncio.wait_for(manager.join(), timeout=30)
+        finally:
+            await manager.stop()
+        
+        assert (await manager.get_job(job.id)).status == JOB_SUCCEEDED
+    
+    async def test_failed_crawl_is_recorded(self, session_maker, summary_generator, wikipedia_stub):
+        """Test a crawl that stores nothing marks the job failed."""
+        manager = CrawlJobManager(session_maker, summary_generator, workers=1)
+        await manager.start()
+        try:
+            job = await manager.submit(str(wikipedia_stub.make_url("/fixtures/missing.html")))
+            await asyncio.wait_for(manager.join(), timeout=30)
+        finally:
+            await manager.stop()
+        
+        job = await manager.get_job(job.id)
+        assert job.status == JOB_FAILED
+        assert job.error
+        assert job.root_article_id is None
+    
+    async def test_interrupted_job_resumes_from_checkpoint(self, session_maker, summary_generator, wikipedia_stub):
+        """Test a job whose worker died, leaving its lease to expire, continues from its checkpoint on start."""
+        root_url = str(wikipedia_stub.make_url("/wiki/Root"))
+        async with session_maker() as session:
+            await ArticleRepository(session).create(ArticleCreate(url=root_url, title="Root", content="Stored before the restart."))
+            jobs = CrawlJobRepository(session)
+            job = await jobs.create(root_url)
+            await jobs.claim(job.id, "dead-host:1", lease_seconds=0)
+            await jobs.save_checkpoint(job.id, {
+                "frontier": [[str(wikipedia_stub.make_url(f"/wiki/Root_{i}")), 1, root_url] for i in (3, 4)],
+                "pages_fetched": 4,
+                "pages_failed": 0,
+                "pages_skipped": 0,
+            })
+        
+        manager = CrawlJobManager(session_maker, summary_generator, workers=1)
+        await manager.start()
+        try:
+            await asyncio.wait_for(manager.join(), timeout=30)
+        finally:
+            await manager.stop()
+        
+        job = await manager.get_job(job.id)
+        assert job.status == JOB_SUCCEEDED
+        assert job.pages_fetched == 4 + 2
+        assert job.checkpoint is None
+        assert wikipedia_stub.stub.requests == 2
+        async with session_maker() as session:
+            child = await ArticleRepository(session).get_by_url(str(wikipedia_stub.make_url("/wiki/Root_4")))
+        assert child.parent_id == job.root_article_id
+    
+    async def test_job_is_claimed_once(self, session_maker, summary_generator, wikipedia_stub):
+        """Test replicas that all see a queued job on start crawl it only once."""
+        async with session_maker() as session:
+            job = await CrawlJobRepository(session).create(str(wikipedia_stub.make_url("/wiki/Root")))
+        
+        managers = [CrawlJobManager(session_maker, summary_generator, workers=2, owner=f"replica-{i}") for i in range(3)]
+        for manager in managers:
+            await manager.start()
+        try:
+            await asyncio.wait_for(asyncio.gather(*(manager.join() for manager in managers)), timeout=30)
+        finally:
+            for manager in managers:
+                await manager.stop()
+        
+        assert (await managers[0].get_job(job.id)).status == JOB_SUCCEEDED
+        assert wikipedia_stub.stub.requests == 1 + 5
+        summary_generator.generate_summary.assert_awaited_once()
+    
+    async def test_job_with_live_lease_is_left_alone(self, session_maker, summary_generator, wikipedia_stub):
+        """Test a starting replica neither requeues nor resumes a job another live replica is running."""
+        async with session_maker() as session:
+            jobs = CrawlJobRepository(session)
+            job = await jobs.create(str(wikipedia_stub.make_url("/wiki/Root")))
+            assert await jobs.claim(job.id, "other-host:1", lease_seconds=60)
+            assert not await jobs.claim(job.id, "other-host:2", lease_seconds=60)
+        
+        manager = CrawlJobManager(session_maker, summary_generator, workers=1)
+        await manager.start()
+        try:
+            await asyncio.wait_for(manager.join(), timeout=30)
+            with pytest.raises(ValueError):
+                await manager.resume(job.id)
+        finally:
+            await manager.stop()
+        
+        job = await manager.get_job(job.id)
+        assert (job.status, job.lease_owner) == (JOB_RUNNING, "other-host:1")
+        assert wikipedia_stub.stub.requests == 0
+    
+    async def wait_for_status(self, manager, job_id, status):
+        """Poll a job until it reaches status."""
+        async def poll():
+            while (await manager.get_job(job_id)).status != status:
+                await asyncio.sleep(0.01)
+        await asyncio.wait_for(poll(), timeout=30)
+    
+    async def test_restart_within_lease_resumes_own_job(self, session_maker, summary_generator, wikipedia_stub):
+        """Test a replica restarted before its lease expires takes its interrupted job back at once."""
+        wikipedia_stub.stub.delay = 0.05
+        manager = CrawlJobManager(session_maker, summary_generator, workers=1, owner="node-a", lease_seconds=60)
+        await manager.start()
+        job = await manager.submit(str(wikipedia_stub.make_url("/wiki/Root")))
+        await self.wait_for_status(manager, job.id, JOB_RUNNING)
+        await manager.stop()
+        
+        restarted = CrawlJobManager(session_maker, summary_generator, workers=1, owner="node-a", lease_seconds=60)
+        await restarted.start()
+        try:
+            await asyncio.wait_for(restarted.join(), timeout=30)
+        finally:
+            await restarted.stop()
+        
+        assert (await restarted.get_job(job.id)).status == JOB_SUCCEEDED
+    
+    async def test_expired_lease_is_swept_without_restart(self, session_maker, summary_generator, wikipedia_stub):
+        """Test a running replica picks up the job of a crashed one once its lease expires."""
+        async with session_maker() as session:
+            jobs = CrawlJobRepository(session)
+            job = await jobs.create(str(wikipedia_stub.make_url("/wiki/Root")))
+            await jobs.claim(job.id, "crashed-node", lease_seconds=0.2)
+        
+        manager = CrawlJobManager(session_maker, summary_generator, workers=1, progress_interval=0.01, lease_seconds=0.2)
+        await manager.start()
+        try:
+            await self.wait_for_status(manager, job.id, JOB_SUCCEEDED)
+        finally:
+            await manager.stop()
+        
+        assert (await manager.get_job(job.id)).lease_owner is None
+    
+    async def test_lost_lease_stops_crawl(self, session_maker, summary_generator, wikipedia_stub):
+        """Test a worker whose lease another owner took stops crawling and leaves the job to that owner."""
+        wikipedia_stub.stub.delay = 0.1
+        manager = CrawlJobManager(session_maker, summary_generator, workers=1, progress_interval=0.01, owner="node-a")
+        await manager.start()
+        try:
+            job = await manager.submit(str(wikipedia_stub.make_url("/wiki/Root")))
+            await self.wait_for_status(manager, job.id, JOB_RUNNING)
+            async with session_maker() as session:
+                await session.execute(update(CrawlJob).where(CrawlJob.id == job.id).values(lease_owner="node-b"))
+                await session.commit()
+            await asyncio.wait_for(manager.join(), timeout=30)
+        finally:
+            await manager.stop()
+        
+        job = await manager.get_job(job.id)
+        assert (job.status, job.lease_owner) == (JOB_RUNNING, "node-b")
+        assert wikipedia_stub.stub.requests < 1 + 5
+        summary_generator.generate_summary.assert_not_awaited()
+    
+    async def test_resume_failed_job(self, session_maker, summary_generator, wikipedia_stub):
+        """Test a failed job can be resumed explicitly, and a succeeded one cannot."""
+        async with session_maker() as session:
+            jobs = CrawlJobRepository(session)
+            job = await jobs.create(str(wikipedia_stub.make_url("/wiki/Root")))
+            await jobs.mark_finished(job.id, JOB_FAILED, error="Connection reset")
+        
+        manager = CrawlJobManager(session_maker, summary_generator, workers=1)
+        resumed = await manager.resume(job.id)
+        assert resumed.status == JOB_QUEUED
+        assert resumed.error is None
+        assert await manager.resume(job.id + 1) is None
+        
+        await manager.start()
+        try:
+            await asyncio.wait_for(manager.join(), timeout=30)
+        finally:
+            await manager.stop()
+        
+        assert (await manager.get_job(job.id)).status == JOB_SUCCEEDED
+        with pytest.raises(ValueError):
+            await manager.resume(job.id)
+    
+    async def test_non_wikipedia_url_is_rejected(self, session_maker, summary_generator):
+        """Test submit validates the URL before creating a job."""
+        manager = CrawlJobManager(session_maker, summary_generator, workers=1)
+        
+        with patch("app.parsers.wikipedia_parser.WikipediaParser.is_wikipedia_url", return_value=False):
+            with pytest.raises(ValueError):
+                await manager.submit("https://google.com")
+        
+        async with session_maker() as session:
+            assert await CrawlJobRepository(session).get_ids_by_status(JOB_QUEUED) == []
\ No newline at end of file
@@ -0,0 +1,87 @@
+import pytest
+from unittest.mock import patch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.parsers.wikipedia_parser import WikipediaParser
+from app.repositories.article_repository import ArticleRepository
+from app.schemas import ArticleCreate
+from app.services.crawl_engine import CrawlEngine
+from app.services.crawl_state import (
+    BloomFilter,
+    CrawlState,
+    FingerprintSet,
+    FrontierEntry,
+    url_fingerprint,
+)
+
+
+class TestCrawlState:
+    """Tests for the compact visited set and frontier records."""
+    
+    def test_fingerprint_set_grows_and_deduplicates(self):
+        """Test the array-backed set keeps every fingerprint across resizes."""
+        fingerprints = FingerprintSet(capacity=4)
+        urls = [f"https://en.wikipedia.org/wiki/Page_{i}" for i in range(5000)]
+        
+        assert all(fingerprints.add(url_fingerprint(url)) for url in urls)
+        assert not any(fingerprints.add(url_fingerprint(url)) for url in urls)
+        assert len(fingerprints) == 5000
+        assert url_fingerprint("https://en.wikipedia.org/wiki/Other") not in fingerprints
+        assert fingerprints.nbytes <= 5000 * 8 * 4
+    
+    def test_bloom_filter_error_rate_is_bounded(self):
+        """Test false positives stay near the configured rate at full capacity."""
+        bloom = BloomFilter(capacity=20000, error_rate=0.01)
+        for i in range(20000):
+            bloom.add(url_fingerprint(f"https://en.wikipedia.org/wiki/Seen_{i}"))
+        
+        false_positives = sum(
+            url_fingerprint(f"https://en.wikipedia.org/wiki/Unseen_{i}") in bloom for i in range(20000)
+        )
+        
+        assert all(url_fingerprint(f"https://en.wikipedia.org/wiki/Seen_{i}") in bloom for i in range(0, 20000, 97))
+        assert false_positives / 20000 < 0.02
+        assert bloom.error_rate < 0.02
+        assert bloom.nbytes < 20000 * 2
+    
+    @pytest.mark.parametrize("backend", ["fingerprint", "bloom"])
+    def test_claim(self, backend):
+        """Test a URL can be claimed only once."""
+        state = CrawlState(backend=backend, capacity=1000, error_rate=0.001)
+        
+        assert state.claim("https://en.wikipedia.org/wiki/Python") is True
+        assert state.claim("https://en.wikipedia.org/wiki/Python") is False
+        assert "https://en.wikipedia.org/wiki/Python" in state
+        assert len(state) == 1
+    
+    def test_unknown_backend(self):
+        """Test unsupported visited set backends are rejected."""
+        with pytest.raises(ValueError):
+            CrawlState(backend="set")
+    
+    def test_frontier_entry_has_no_instance_dict(self):
+        """Test frontier records are slotted."""
+        entry = FrontierEntry("https://en.wikipedia.org/wiki/Python", 1, "https://en.wikipedia.org/wiki/Root")
+        
+        assert not hasattr(entry, "__dict__")
+        assert entry.depth == 1
+    
+    async def test_warm_start_skips_database_lookups(self, wikipedia_stub, db_session: AsyncSession):
+        """Test a warm-started crawl filters stored links from memory."""
+        repository = ArticleRepository(db_session)
+        stored_url = str(wikipedia_stub.make_url("/wiki/Root_2"))
+        await repository.create(ArticleCreate(url=stored_url, title="Root 2", content="Stored earlier."))
+        
+        state = CrawlState()
+        assert await state.warm_start(repository) == 1
+        assert stored_url in state
+        
+        with patch.object(ArticleRepository, "get_ids_by_urls") as lookup:
+            async with WikipediaParser() as parser:
+                engine = CrawlEngine(parser, repository, max_depth=1, warm_start=True)
+                root = await engine.crawl(str(wikipedia_stub.make_url("/wiki/Root")))
+        
+        lookup.assert_not_called()
+        assert root.title == "Root"
+        assert engine.stats.pages_fetched == 1 + 4
+        assert (await repository.get_by_url(stored_url)).parent_id is None
\ No newline at end of file
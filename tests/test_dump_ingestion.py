@@ -0,0 +1,117 @@
+import bz2
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.parsers.dump_parser import extract_wikitext, iter_dump_pages
+from app.repositories.article_repository import ArticleRepository
+from app.services.dump_ingestion_service import DumpIngestionService
+from tests.conftest import FIXTURES_DIR
+
+
+BASE_URL = "https://en.wikipedia.org"
+DUMP_FIXTURE = FIXTURES_DIR.parent / "dumps" / "pages-articles.xml"
+
+
+@pytest.fixture
+def dump_path(tmp_path):
+    """Compress the synthetic dump the way dumps.wikimedia.org ships it."""
+    path = tmp_path / "pages-articles.xml.bz2"
+    with open(DUMP_FIXTURE, "rb") as source, bz2.open(path, "wb") as target:
+        shutil.copyfileobj(source, target)
+    return str(path)
+
+
+class TestDumpParser:
+    """Tests for streaming wikitext extraction."""
+    
+    def test_iter_dump_pages_skips_redirects_and_other_namespaces(self, dump_path):
+        """Test only main-namespace articles come out of the dump."""
+        titles = [title for title, _ in iter_dump_pages(dump_path)]
+        
+        assert titles == [
+            "Python",
+            "Guido van Rossum",
+            "Programming language",
+            "Netherlands",
+            "Monty Python",
+            "ABC (language)",
+        ]
+    
+    def test_extract_wikitext(self):
+        """Test markup is stripped from the lead and links follow the HTML rules."""
+        wikitext = dict(iter_dump_pages(str(DUMP_FIXTURE)))["Python"]
+        
+        title, content, links = extract_wikitext("Python", wikitext, BASE_URL)
+        
+        assert title == "Python"
+        assert content.split("\n\n") == [
+            "Python is a high-level, general-purpose programming language created by Guido. "
+            "Its design emphasizes code readability.",
+            "It is named after Monty Python rather than the snake, see naming and the official site.",
+        ]
+        assert links == [
+            f"{BASE_URL}/wiki/Guido_van_Rossum",
+            f"{BASE_URL}/wiki/Logo",
+            f"{BASE_URL}/wiki/Programming_language",
+            f"{BASE_URL}/wiki/Monty_Python",
+            f"{BASE_URL}/wiki/ABC_(language)",
+        ]
+
+
+class TestDumpIngestionService:
+    """Tests for DumpIngestionService."""
+    
+    async def test_ingest_links_parents_across_batches(self, dump_path, db_session: AsyncSession):
+        """Test articles are written in batches with parents resolved inside and across them."""
+        repository = ArticleRepository(db_session)
+        
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            service = DumpIngestionService(repository, executor=executor, batch_size=2, chunk_size=2)
+            stats = await service.ingest(dump_path, BASE_URL)
+        
+        assert stats.pages_read == 6
+        assert stats.articles_written == 6
+        assert stats.batches_written == 3
+        
+        python = await repository.get_by_url(f"{BASE_URL}/wiki/Python")
+        guido = await repository.get_by_url(f"{BASE_URL}/wiki/Guido_van_Rossum")
+        netherlands = await repository.get_by_url(f"{BASE_URL}/wiki/Netherlands")
+        abc = await repository.get_by_url(f"{BASE_URL}/wiki/ABC_(language)", with_content=True)
+        
+        assert python.parent_id is None
+        assert python.depth_level == 0
+        assert guido.parent_id == python.id
+        assert guido.depth_level == 1
+        assert netherlands.parent_id == guido.id
+        assert netherlands.depth_level == 2
+        assert abc.parent_id == python.id
+        assert "imperative general-purpose" in abc.content
+        assert stats.parents_linked == 5
+    
+    async def test_ingest_again_skips_existing_articles(self, dump_path, db_session: AsyncSession):
+        """Test re-running an ingestion leaves already stored articles untouched."""
+        repository = ArticleRepository(db_session)
+        await DumpIngestionService(repository, batch_size=4).ingest(dump_path, BASE_URL)
+        
+        stats = await DumpIngestionService(repository, batch_size=4).ingest(dump_path, BASE_URL)
+        
+        assert stats.pages_read == 6
+        assert stats.articles_written == 0
+        assert stats.parents_linked == 0
+    
+    async def test_pending_parents_are_bounded(self, dump_path, db_session: AsyncSession):
+        """Test the oldest unresolved links are forgotten once the limit is reached."""
+        repository = ArticleRepository(db_session)
+        service = DumpIngestionService(repository, batch_size=10, pending_parents_limit=1)
+        
+        stats = await service.ingest(dump_path, BASE_URL)
+        
+        guido = await repository.get_by_url(f"{BASE_URL}/wiki/Guido_van_Rossum")
+        assert stats.articles_written == 6
+        assert stats.parents_linked == 0
+        assert guido.parent_id is None
+        assert guido.depth_level == 0
+        assert len(service._pending_parents) == 1
\ No newline at end of file
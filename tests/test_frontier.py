@@ -0,0 +1,183 @@
+import asyncio
+import sys
+import pytest_asyncio
+from pathlib import Path
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import Base
+from app.parsers.wikipedia_parser import WikipediaParser
+from app.repositories.article_repository import ArticleRepository
+from app.repositories.frontier_repository import (
+    FrontierRepository,
+    FRONTIER_DONE,
+    FRONTIER_FAILED,
+    FRONTIER_PENDING,
+)
+from app.services.frontier_worker import FrontierWorker
+
+
+ROOT_DIR = Path(__file__).parent.parent
+
+
+@pytest_asyncio.fixture
+async def database_url(tmp_path):
+    """Create a file database that several processes can share."""
+    url = f"sqlite+aiosqlite:///{tmp_path / 'frontier.db'}"
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+    return url
+
+
+@pytest_asyncio.fixture
+async def session_maker(database_url):
+    """Create a session maker on the shared file database."""
+    engine = create_async_engine(database_url, connect_args={"timeout": 30})
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+class TestFrontierRepository:
+    """Tests for leasing items from the shared frontier."""
+    
+    async def test_enqueue_skips_known_urls(self, session_maker):
+        """Test a URL enters the frontier once."""
+        async with session_maker() as session:
+            frontier = FrontierRepository(session)
+            
+            assert await frontier.enqueue([{"url": "https://en.wikipedia.org/wiki/A"}]) == 1
+            assert await frontier.enqueue([
+                {"url": "https://en.wikipedia.org/wiki/A"},
+                {"url": "https://en.wikipedia.org/wiki/B"},
+            ]) == 1
+            assert await frontier.counts() == {FRONTIER_PENDING: 2}
+    
+    async def test_claim_skips_leased_items(self, session_maker):
+        """Test two workers never lease the same item."""
+        async with session_maker() as first, session_maker() as second:
+            await FrontierRepository(first).enqueue(
+                [{"url": f"https://en.wikipedia.org/wiki/P{i}", "depth": i % 2} for i in range(5)]
+            )
+            
+            claimed_first = await FrontierRepository(first).claim("first", 3, lease_seconds=60)
+            claimed_second = await FrontierRepository(second).claim("second", 3, lease_seconds=60)
+            
+            assert [item.depth for item in claimed_first] == [0, 0, 0]
+            assert len(claimed_second) == 2
+            assert not {item.id for item in claimed_first} & {item.id for item in claimed_second}
+            assert await FrontierRepository(first).claim("first", 3, lease_seconds=60) == []
+    
+    async def test_expired_lease_is_reclaimed(self, session_maker):
+        """Test items of a crashed worker are handed out again after the lease expires."""
+        async with session_maker() as session:
+            frontier = FrontierRepository(session)
+            await frontier.enqueue([{"url": "https://en.wikipedia.org/wiki/A"}])
+            
+            crashed = await frontier.claim("crashed", 10, lease_seconds=-1)
+            reclaimed = await frontier.claim("alive", 10, lease_seconds=60)
+            
+            assert [item.url for item in reclaimed] == [crashed[0].url]
+            assert reclaimed[0].lease_owner == "alive"
+            assert reclaimed[0].attempts == 2
+    
+    async def test_release_fails_after_max_attempts(self, session_maker):
+        """Test failed items are retried until they run out of attempts."""
+        async with session_maker() as session:
+            frontier = FrontierRepository(session)
+            await frontier.enqueue([{"url": "https://en.wikipedia.org/wiki/A"}])
+            
+            item = (await frontier.claim("worker", 1, lease_seconds=60))[0]
+            await frontier.release([item.id], "boom", max_attempts=2)
+            assert await frontier.counts() == {FRONTIER_PENDING: 1}
+            
+            item = (await frontier.claim("worker", 1, lease_seconds=60))[0]
+            await frontier.release([item.id], "boom", max_attempts=2)
+            assert await frontier.counts() == {FRONTIER_FAILED: 1}
+            assert (await frontier.get_by_url(item.url)).error == "boom"
+
+
+class TestFrontierWorker:
+    """Tests for crawling through the shared frontier."""
+    
+    async def _seed(self, session_maker, url, max_depth=2):
+        """Put one root URL into the frontier."""
+        async with session_maker() as session:
+            await FrontierRepository(session).enqueue([{"url": url, "depth": 0, "max_depth": max_depth}])
+    
+    async def _assert_tree(self, session_maker, server):
+        """Check the stub tree was stored once with depths and parents."""
+        async with session_maker() as session:
+            repository = ArticleRepository(session)
+            root = await repository.get_by_url(str(server.make_url("/wiki/Root")))
+            child = await repository.get_by_url(str(server.make_url("/wiki/Root_3")))
+            grandchild = await repository.get_by_url(str(server.make_url("/wiki/Root_3_4")))
+            stored = await repository.get_ids_by_urls(
+                [str(server.make_url(f"/wiki/Root_{i}_{j}")) for i in range(5) for j in range(5)]
+            )
+            counts = await FrontierRepository(session).counts()
+            child_links = await repository.get_out_links(child.id)
+        
+        assert root.depth_level == 0 and root.parent_id is None
+        assert child.depth_level == 1 and child.parent_id == root.id
+        assert grandchild.depth_level == 2 and grandchild.parent_id == child.id
+        assert len(stored) == 25
+        assert counts == {FRONTIER_DONE: 1 + 5 + 25}
+        assert len(child_links) == 10
+    
+    async def test_worker_crawls_tree(self, session_maker, wikipedia_stub):
+        """Test one worker drains the frontier breadth first."""
+        await self._seed(session_maker, str(wikipedia_stub.make_url("/wiki/Root")))
+        
+        async with WikipediaParser() as parser:
+            stats = await FrontierWorker(session_maker, parser, batch_size=4).run()
+        
+        assert stats.pages_fetched == 1 + 5 + 25
+        assert stats.pages_failed == 0
+        await self._assert_tree(session_maker, wikipedia_stub)
+    
+    async def test_concurrent_workers_share_frontier(self, session_maker, wikipedia_stub):
+        """Test workers split the pages without fetching any twice."""
+        wikipedia_stub.stub.delay = 0.01
+        await self._seed(session_maker, str(wikipedia_stub.make_url("/wiki/Root")))
+        
+        async with WikipediaParser() as parser:
+            workers = [
+                FrontierWorker(session_maker, parser, owner=f"worker-{i}", batch_size=3, poll_interval=0.01)
+                for i in range(3)
+            ]
+            results = await asyncio.gather(*(worker.run() for worker in workers))
+        
+        assert sum(stats.pages_fetched for stats in results) == 1 + 5 + 25
+        assert sum(1 for stats in results if stats.pages_fetched) > 1
+        assert wikipedia_stub.stub.requests == 1 + 5 + 25
+        await self._assert_tree(session_maker, wikipedia_stub)
+    
+    async def test_failed_pages_are_retried_then_failed(self, session_maker, wikipedia_stub):
+        """Test a page that cannot be fetched ends up failed after its attempts."""
+        await self._seed(session_maker, str(wikipedia_stub.make_url("/fixtures/missing.html")))
+        
+        async with WikipediaParser() as parser:
+            stats = await FrontierWorker(session_maker, parser, max_attempts=2, poll_interval=0.01).run()
+        
+        assert stats.pages_failed == 2
+        async with session_maker() as session:
+            assert await FrontierRepository(session).counts() == {FRONTIER_FAILED: 1}
+    
+    async def test_worker_processes(self, session_maker, database_url, wikipedia_stub):
+        """Test separate worker processes crawl one tree through the shared database."""
+        await self._seed(session_maker, str(wikipedia_stub.make_url("/wiki/Root")))
+        
+        processes = [
+            await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "app.crawl_worker",
+                "--database-url", database_url, "--batch-size", "2", "--exit-when-idle",
+                cwd=ROOT_DIR
+            )
+            for _ in range(2)
+        ]
+        codes = await asyncio.wait_for(asyncio.gather(*(process.wait() for process in processes)), timeout=120)
+        
+        assert codes == [0, 0]
+        assert wikipedia_stub.stub.requests == 1 + 5 + 25
+        await self._assert_tree(session_maker, wikipedia_stub)
\ No newline at end of file
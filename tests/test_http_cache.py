@@ -0,0 +1,146 @@
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from app.parsers.http_cache import HttpCache
+from app.parsers.wikipedia_parser import WikipediaParser
+
+
+class TestHttpCache:
+    """Tests for the on-disk page cache under WikipediaParser."""
+    
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """Create an empty cache whose entries never expire."""
+        return HttpCache(str(tmp_path / "cache"), max_bytes=10 * 1024 * 1024, ttl=3600)
+    
+    async def parse(self, server, cache: HttpCache, path: str):
+        """Parse one stub page through a cached parser."""
+        async with WikipediaParser(cache=cache) as parser:
+            return await parser.parse_article(str(server.make_url(path)))
+    
+    async def test_fresh_entry_is_served_without_request(self, wikipedia_stub, cache):
+        """Test a fresh entry answers without touching the network."""
+        first = await self.parse(wikipedia_stub, cache, "/wiki/Python")
+        second = await self.parse(wikipedia_stub, cache, "/wiki/Python")
+        
+        assert second == first
+        assert first[0] == "Python"
+        assert wikipedia_stub.stub.requests == 1
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+        assert cache.stats.bytes_served == cache.stats.bytes_downloaded
+    
+    async def test_stale_entry_is_revalidated_without_reparse(self, wikipedia_stub, cache):
+        """Test a 304 answer reuses the stored parse result."""
+        first = await self.parse(wikipedia_stub, cache, "/wiki/Python")
+        cache.ttl = 0
+        
+        with patch("app.parsers.wikipedia_parser.extract_page") as extract_page:
+            second = await self.parse(wikipedia_stub, cache, "/wiki/Python")
+        
+        extract_page.assert_not_called()
+        assert second == first
+        assert wikipedia_stub.stub.requests == 2
+        assert wikipedia_stub.stub.not_modified == 1
+        assert cache.stats.revalidated == 1
+        assert cache.stats.misses == 1
+    
+    async def test_changed_page_is_downloaded_again(self, wikipedia_stub, cache):
+        """Test a new ETag replaces the stored body."""
+        await self.parse(wikipedia_stub, cache, "/wiki/Python")
+        cache.ttl = 0
+        wikipedia_stub.stub.versions["Python"] = 2
+        
+        await self.parse(wikipedia_stub, cache, "/wiki/Python")
+        
+        assert wikipedia_stub.stub.not_modified == 0
+        assert cache.stats.misses == 2
+        assert cache.stats.entries == 1
+        assert cache.get(str(wikipedia_stub.make_url("/wiki/Python"))).etag == '"Python-2"'
+    
+    async def test_least_recently_used_entry_is_evicted(self, wikipedia_stub, cache):
+        """Test eviction by size drops the entry that was used least recently."""
+        await self.parse(wikipedia_stub, cache, "/wiki/Page_A")
+        cache.max_bytes = 2 * cache.stats.bytes_stored + 10
+        await self.parse(wikipedia_stub, cache, "/wiki/Page_B")
+        await self.parse(wikipedia_stub, cache, "/wiki/Page_A")
+        
+        await self.parse(wikipedia_stub, cache, "/wiki/Page_C")
+        
+        assert cache.stats.evictions == 1
+        assert cache.get(str(wikipedia_stub.make_url("/wiki/Page_B"))) is None
+        assert cache.get(str(wikipedia_stub.make_url("/wiki/Page_A"))) is not None
+        assert cache.stats.bytes_stored <= cache.max_bytes
+        assert len(list((cache.directory / "meta").iterdir())) == 2
+    
+    async def test_identical_bodies_are_stored_once(self, wikipedia_stub, cache):
+        """Test bodies are addressed by content, not by URL."""
+        await self.parse(wikipedia_stub, cache, "/fixtures/en_python.html?revision=1")
+        await self.parse(wikipedia_stub, cache, "/fixtures/en_python.html?revision=2")
+        
+        body_files = [path for path in (cache.directory / "bodies").rglob("*") if path.is_file()]
+        assert cache.stats.entries == 2
+        assert len(body_files) == 1
+        assert cache.stats.bytes_stored == cache.stats.bytes_downloaded // 2
+    
+    async def test_concurrent_stores_of_one_body(self, cache):
+        """Test concurrent writes of one page leave complete files and no temporary ones."""
+        body = "<html>Python</html>".encode("utf-8") * 1000
+        parsed = ("Python", "Python", [])
+        
+        await asyncio.gather(*(
+            cache.store(f"https://en.wikipedia.org/wiki/Python?mirror={i % 2}", body, "utf-8", parsed) for i in range(20)
+        ))
+        
+        files = [path for path in cache.directory.rglob("*") if path.is_file()]
+        assert not [path for path in files if path.name.endswith(".tmp")]
+        assert [path.read_bytes() for path in (cache.directory / "bodies").rglob("*") if path.is_file()] == [body]
+        assert len(list((cache.directory / "meta").iterdir())) == 2
+    
+    async def test_eviction_keeps_body_of_store_in_flight(self, cache):
+        """Test evicting an entry spares its body while another URL's store of the same body is being written."""
+        body = b"<html>Python</html>" * 10
+        parsed = ("Python", "Python", [])
+        cache.max_bytes = 4 * len(body)
+        await cache.store("https://en.wikipedia.org/wiki/Python", body, "utf-8", parsed)
+        await cache.store("https://en.wikipedia.org/wiki/Java", b"J" * (2 * len(body)), "utf-8", parsed)
+        
+        started, release = threading.Event(), threading.Event()
+        write_meta = cache._write_meta
+        
+        def blocked_write_meta(entry):
+            if entry.url.endswith("Python_(language)"):
+                started.set()
+                release.wait(5)
+            write_meta(entry)
+        
+        with patch.object(cache, "_write_meta", blocked_write_meta):
+            mirror = asyncio.create_task(
+                cache.store("https://en.wikipedia.org/wiki/Python_(language)", body, "utf-8", parsed)
+            )
+            await asyncio.to_thread(started.wait, 5)
+            await cache.store("https://en.wikipedia.org/wiki/Rust", b"R" * (2 * len(body)), "utf-8", parsed)
+            assert cache.get("https://en.wikipedia.org/wiki/Python") is None
+            release.set()
+            entry = await mirror
+        
+        assert cache.read_body(entry) == body
+        assert cache.get("https://en.wikipedia.org/wiki/Python_(language)") is entry
+        assert cache.stats.bytes_stored <= cache.max_bytes
+        
+        reopened = HttpCache(str(cache.directory), max_bytes=cache.max_bytes, ttl=3600)
+        assert reopened.get("https://en.wikipedia.org/wiki/Python_(language)") is not None
+    
+    async def test_index_survives_restart(self, wikipedia_stub, cache):
+        """Test a reopened cache serves entries written by a previous process."""
+        first = await self.parse(wikipedia_stub, cache, "/wiki/Python")
+        
+        reopened = HttpCache(str(cache.directory), max_bytes=cache.max_bytes, ttl=3600)
+        second = await self.parse(wikipedia_stub, reopened, "/wiki/Python")
+        
+        assert second == first
+        assert reopened.stats.hits == 1
+        assert wikipedia_stub.stub.requests == 1
\ No newline at end of file
@@ -0,0 +1,61 @@
+import pytest
+import pytest_asyncio
+
+from app.parsers.http_client import HttpClient
+from app.parsers.wikipedia_parser import WikipediaParser
+
+
+class TestHttpClient:
+    """Tests for the pooled HttpClient."""
+    
+    @pytest_asyncio.fixture
+    async def http_client(self):
+        """Create and start a pooled client."""
+        client = HttpClient(limit_per_host=4)
+        await client.start()
+        yield client
+        await client.close()
+    
+    async def test_start_is_idempotent(self, http_client):
+        """Test starting an open client keeps the same session."""
+        session = http_client.session
+        
+        await http_client.start()
+        
+        assert http_client.session is session
+        assert not http_client.closed
+    
+    async def test_close(self):
+        """Test closing the client releases the session."""
+        client = HttpClient()
+        await client.start()
+        
+        await client.close()
+        
+        assert client.closed
+    
+    async def test_connections_are_reused_across_parsers(self, wikipedia_stub, http_client):
+        """Test sequential crawls share keep-alive connections."""
+        for name in ("First", "Second", "Third"):
+            async with WikipediaParser(http_client=http_client) as parser:
+                title, _, _ = await parser.parse_article(str(wikipedia_stub.make_url(f"/wiki/{name}")))
+            assert title == name
+        
+        stats = http_client.stats
+        assert stats.requests == 3
+        assert stats.connections_created == 1
+        assert stats.connections_reused == 2
+        assert stats.as_dict()["reuse_ratio"] == pytest.approx(2 / 3, abs=1e-3)
+        assert not http_client.closed
+    
+    async def test_parser_owns_session_without_started_client(self, wikipedia_stub):
+        """Test parser falls back to a private session when the shared one is closed."""
+        client = HttpClient()
+        
+        async with WikipediaParser(http_client=client) as parser:
+            title, _, _ = await parser.parse_article(str(wikipedia_stub.make_url("/wiki/Solo")))
+            own_session = parser.session
+        
+        assert title == "Solo"
+        assert own_session.closed
+        assert client.closed
\ No newline at end of file
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.parsers.wikipedia_parser import WikipediaParser
+from app.repositories.article_repository import ArticleRepository
+from app.schemas import ArticleCreate
+from app.services.crawl_engine import CrawlEngine
+
+
+BASE = "https://ru.wikipedia.org/wiki/"
+
+
+class TestArticleLinks:
+    """Test storage and queries of the article link graph."""
+    
+    @pytest.fixture
+    def repository(self, db_session: AsyncSession):
+        """Create ArticleRepository with test session."""
+        return ArticleRepository(db_session)
+    
+    async def _store(self, repository, *names):
+        """Store articles by name and return their ids."""
+        created = await repository.create_many([
+            ArticleCreate(url=BASE + name, title=name, content=f"Текст {name}") for name in names
+        ])
+        return [created[BASE + name] for name in names]
+    
+    async def test_out_links_resolve_stored_targets(self, repository):
+        """Test out-links keep page order and resolve targets stored before or after the links."""
+        source, known = await self._store(repository, "A", "B")
+        assert await repository.add_links({source: [BASE + "B", BASE + "C", BASE + "D"]}) == 3
+        later, = await self._store(repository, "C")
+        
+        links = await repository.get_out_links(source)
+        
+        assert [(link.position, link.target_url) for link in links] == [(0, BASE + "B"), (1, BASE + "C"), (2, BASE + "D")]
+        assert [link.target_id for link in links] == [known, later, None]
+        assert links[0].target_title == "B"
+    
+    async def test_in_links_from_several_parents(self, repository):
+        """Test every article linking to a page is found, not only its parent, page by page."""
+        sources = await self._store(repository, "A", "B", "C")
+        await repository.add_links({source: [BASE + "X", BASE + "Y"] for source in sources})
+        
+        first = await repository.get_in_links(BASE + "Y", limit=2)
+        rest = await repository.get_in_links(BASE + "Y", after_id=first[-1].id, limit=2)
+        
+        assert [row.id for row in first + rest] == sources
+        assert {row.position for row in first + rest} == {1}
+    
+    async def test_links_of_a_source_are_replaced(self, repository):
+        """Test storing links again for a source replaces its previous ones."""
+        sources = await self._store(repository, "A", "B")
+        await repository.add_links({source: [BASE + "X", BASE + "Y"] for source in sources})
+        await repository.add_links({sources[1]: [BASE + "Y"]})
+        
+        assert [row.id for row in await repository.get_in_links(BASE + "X")] == [sources[0]]
+        assert [(row.id, row.position) for row in await repository.get_in_links(BASE + "Y")] == [(sources[0], 1), (sources[1], 0)]
+    
+    async def test_crawl_stores_every_extracted_link(self, wikipedia_stub, repository):
+        """Test a crawl keeps all links of each page while following only the first children."""
+        async with WikipediaParser() as parser:
+            root = await CrawlEngine(parser, repository, max_depth=1).crawl(str(wikipedia_stub.make_url("/wiki/Root")))
+        
+        links = await repository.get_out_links(root.id)
+        assert [link.target_url for link in links] == [str(wikipedia_stub.make_url(f"/wiki/Root_{i}")) for i in range(10)]
+        assert sum(link.target_id is not None for link in links) == CrawlEngine.MAX_CHILDREN
+        
+        child = await repository.get_by_url(str(wikipedia_stub.make_url("/wiki/Root_3")))
+        assert len(await repository.get_out_links(child.id)) == 10
+        assert [row.id for row in await repository.get_in_links(child.url)] == [root.id]
\ No newline at end of file
@@ -0,0 +1,183 @@
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.parsers.mediawiki_api import MediaWikiApi, article_url, split_article_url
+from app.parsers.wikipedia_parser import WikipediaParser
+from app.repositories.article_repository import ArticleRepository
+from app.services.crawl_engine import CrawlEngine
+
+
+class MediaWikiApiStub:
+    """Local imitation of api.php with extract and link continuation."""
+    
+    EXTRACT_LIMIT = 20
+    LINK_LIMIT = 500
+    
+    def __init__(self, links_per_page: int = 8):
+        self.links_per_page = links_per_page
+        self.requests = 0
+        self.app = web.Application()
+        self.app.router.add_get("/w/api.php", self.handle)
+    
+    def page_links(self, title: str):
+        """Linked titles of a synthetic page, as the API would list them."""
+        return [f"{title} {i}" for i in range(self.links_per_page)] + [f"{title}: subpage"]
+    
+    def extract(self, title: str) -> str:
+        """Plain-text intro of a synthetic page."""
+        return (
+            f"{title} is a synthetic article whose lead paragraph is long enough to keep.\n"
+            f"Short line.\n"
+            f"The second paragraph of {title} also has more than fifty characters."
+        )
+    
+    async def handle(self, request: web.Request) -> web.Response:
+        """Answer one action=query request."""
+        self.requests += 1
+        params = request.query
+        assert params["action"] == "query"
+        assert params["prop"] == "extracts|links"
+        
+        normalized, redirects, titles = [], [], []
+        for requested in params["titles"].split("|"):
+            title = requested
+            if title[0].islower():
+                title = title[0].upper() + title[1:]
+                normalized.append({"from": requested, "to": title})
+            if title.startswith("Old "):
+                target = title[len("Old "):]
+                redirects.append({"from": title, "to": target})
+                title = target
+            titles.append(title)
+        
+        extract_offset = int(params.get("excontinue", 0))
+        link_offset = int(params.get("plcontinue", 0))
+        flat_links = [(t, link) for t in titles if not t.startswith("Missing") for link in self.page_links(t)]
+        link_slice = flat_links[link_offset:link_offset + self.LINK_LIMIT]
+        
+        pages = []
+        for index, title in enumerate(titles):
+            if title.startswith("Missing"):
+                pages.append({"ns": 0, "title": title, "missing": True})
+                continue
+            page = {"pageid": index + 1, "ns": 0, "title": title}
+            if extract_offset <= index < extract_offset + self.EXTRACT_LIMIT:
+                page["extract"] = self.extract(title)
+            page_links = [{"ns": 0, "title": link} for owner, link in link_slice if owner == title]
+            if page_links:
+                page["links"] = page_links
+            pages.append(page)
+        
+        data = {"batchcomplete": True, "query": {"pages": pages}}
+        if normalized:
+            data["query"]["normalized"] = normalized
+        if redirects:
+            data["query"]["redirects"] = redirects
+        
+        continuation = {}
+        if extract_offset + self.EXTRACT_LIMIT < len(titles):
+            continuation["excontinue"] = extract_offset + self.EXTRACT_LIMIT
+        if link_offset + self.LINK_LIMIT < len(flat_links):
+            continuation["plcontinue"] = link_offset + self.LINK_LIMIT
+        if continuation:
+            data["continue"] = {**continuation, "continue": "||"}
+            del data["batchcomplete"]
+        return web.json_response(data)
+
+
+@pytest_asyncio.fixture
+async def api_stub():
+    """Run a local api.php stub; the stub itself is exposed as server.stub."""
+    stub = MediaWikiApiStub()
+    server = TestServer(stub.app)
+    server.stub = stub
+    await server.start_server()
+    yield server
+    await server.close()
+
+
+class TestMediaWikiApi:
+    """Tests for the MediaWiki Action API fetch backend."""
+    
+    def test_url_title_round_trip(self):
+        """Test article URLs and titles convert both ways."""
+        url = "https://ru.wikipedia.org/wiki/%D0%A2%D0%B5%D1%81%D1%82_(%D0%B7%D0%BD%D0%B0%D1%87%D0%B5%D0%BD%D0%B8%D1%8F)"
+        
+        base_url, title = split_article_url(url)
+        
+        assert base_url == "https://ru.wikipedia.org"
+        assert title == "Тест (значения)"
+        assert article_url(base_url, title) == url
+    
+    async def test_parse_article_shape(self, api_stub):
+        """Test the API backend returns the (title, content, links) shape."""
+        url = str(api_stub.make_url("/wiki/Root"))
+        
+        async with WikipediaParser(fetch_backend="api") as parser:
+            title, content, links = await parser.parse_article(url)
+        
+        assert title == "Root"
+        assert content.split("\n\n") == [
+            "Root is a synthetic article whose lead paragraph is long enough to keep.",
+            "The second paragraph of Root also has more than fifty characters.",
+        ]
+        assert links == [str(api_stub.make_url(f"/wiki/Root_{i}")) for i in range(8)]
+    
+    async def test_batch_with_continuation_normalization_and_missing(self, api_stub):
+        """Test a multi-title batch follows continuations and maps titles back to URLs."""
+        api_stub.stub.LINK_LIMIT = 25
+        urls = [str(api_stub.make_url(f"/wiki/Page_{i}")) for i in range(45)]
+        urls += [
+            str(api_stub.make_url("/wiki/lower_case")),
+            str(api_stub.make_url("/wiki/Old_Name")),
+            str(api_stub.make_url("/wiki/Missing_page")),
+        ]
+        
+        async with WikipediaParser(fetch_backend="api") as parser:
+            results = await parser.parse_articles(urls)
+        
+        assert len(results) == 47
+        assert urls[-1] not in results
+        assert results[urls[44]][0] == "Page 44"
+        assert len(results[urls[44]][2]) == 8
+        assert "Page 44 is a synthetic article" in results[urls[44]][1]
+        assert results[urls[-3]][0] == "Lower case"
+        assert results[urls[-2]][0] == "Name"
+        assert api_stub.stub.requests > 1
+    
+    async def test_batches_are_limited(self, api_stub):
+        """Test more titles than the batch size are split into several queries."""
+        urls = [str(api_stub.make_url(f"/wiki/Page_{i}")) for i in range(120)]
+        
+        async with WikipediaParser(fetch_backend="api") as parser:
+            fetcher = MediaWikiApi(parser.session, batch_size=50)
+            results = await fetcher.fetch(urls)
+        
+        assert len(results) == 120
+        assert fetcher.requests == 3 + 3 + 1
+    
+    async def test_parse_article_missing(self, api_stub):
+        """Test missing pages raise the same error type as HTML fetch failures."""
+        async with WikipediaParser(fetch_backend="api") as parser:
+            with pytest.raises(ValueError):
+                await parser.parse_article(str(api_stub.make_url("/wiki/Missing_one")))
+    
+    async def test_crawl_resolves_levels_in_few_round_trips(self, api_stub, db_session: AsyncSession):
+        """Test the crawler batches whole levels into API queries."""
+        repository = ArticleRepository(db_session)
+        
+        async with WikipediaParser(fetch_backend="api") as parser:
+            engine = CrawlEngine(parser, repository, concurrency=1, max_depth=2)
+            root = await engine.crawl(str(api_stub.make_url("/wiki/Root")))
+        
+        assert root.title == "Root"
+        assert engine.stats.pages_fetched == 31
+        assert engine.stats.pages_failed == 0
+        assert api_stub.stub.requests <= 4
+        
+        child = await repository.get_by_url(str(api_stub.make_url("/wiki/Root_2")))
+        assert child.parent_id == root.id
+        assert child.depth_level == 1
\ No newline at end of file
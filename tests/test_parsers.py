@@ -1,8 +1,15 @@
+import gzip
 import pytest
+from pathlib import Path
 from unittest.mock import AsyncMock, patch
 from bs4 import BeautifulSoup
 
 from app.parsers.wikipedia_parser import WikipediaParser
+from app.parsers import lxml_extractor
+from app.parsers.executor import create_parse_executor
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "wikipedia"
 
 
 class TestWikipediaParser:
@@ -154,4 +161,170 @@ class TestWikipediaParser:
         soup = BeautifulSoup(html, 'lxml')
         
         content = parser._extract_content(soup)
-        assert content == "" 
\ No newline at end of file
+        assert content == "" 
+
+
+class TestLxmlExtractor:
+    """Tests for the lxml extraction backend."""
+    
+    BASE_URL = "https://ru.wikipedia.org"
+    
+    @pytest.fixture
+    def bs4_parser(self):
+        """Create WikipediaParser with the BeautifulSoup backend."""
+        return WikipediaParser(backend="bs4")
+    
+    @pytest.mark.parametrize("fixture", sorted(p.name for p in FIXTURES_DIR.glob("*.html")))
+    def test_matches_bs4_on_saved_pages(self, bs4_parser, fixture):
+        """Test lxml backend returns exactly what the bs4 backend returns."""
+        html = (FIXTURES_DIR / fixture).read_text(encoding="utf-8")
+        
+        expected = bs4_parser.extract(html, self.BASE_URL)
+        result = lxml_extractor.extract_article(html, self.BASE_URL)
+        
+        assert result == expected
+        assert len(result[2]) == 10
+    
+    @pytest.mark.parametrize("html", [
+        "",
+        "<p>Some paragraph</p>",
+        '<h1 class="firstHeading mw-first-heading"><span>Title</span></h1>',
+        """
+        <h1 class="firstHeading">T</h1>
+        <div id="mw-content-text">
+            <p>Text with <style>.a{color:red}</style> inline style and a <script>var x = 1;</script> script tag.</p>
+            <p>Ruby <ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby> and a <template><b>hidden</b></template> template in a long paragraph.</p>
+            <p>Entities &amp; comments <!-- skipped --> and <b>nested <i>markup</i></b> inside one long paragraph.</p>
+            <a href="/wiki/A">A</a><a href="/wiki/A">A again</a><a href="/wiki/B#section">B</a>
+            <a href="/wiki/File:C.png">C</a><a>no href</a><a href="">empty</a><a href="/wiki/D">D</a>
+        </div>
+        """,
+    ])
+    def test_matches_bs4_on_edge_cases(self, bs4_parser, html):
+        """Test lxml backend mirrors bs4 text and link rules on tricky markup."""
+        assert lxml_extractor.extract_article(html, self.BASE_URL) == bs4_parser.extract(html, self.BASE_URL)
+    
+    def test_stops_after_limits(self):
+        """Test extraction keeps only the first 10 paragraphs and links."""
+        paragraphs = "".join(
+            f'<p>Paragraph number {i} is long enough to be kept in the extracted content. <a href="/wiki/L{i}">L{i}</a></p>'
+            for i in range(30)
+        )
+        html = f'<h1 class="firstHeading">T</h1><div id="mw-content-text">{paragraphs}</div>'
+        
+        title, content, links = lxml_extractor.extract_article(html, self.BASE_URL)
+        
+        assert title == "T"
+        assert content.count("\n\n") == 9
+        assert "Paragraph number 9 " in content
+        assert "Paragraph number 10 " not in content
+        assert links == [f"{self.BASE_URL}/wiki/L{i}" for i in range(10)]
+    
+    def test_unknown_backend(self):
+        """Test unknown backend name is rejected."""
+        with pytest.raises(ValueError):
+            WikipediaParser(backend="regex")
+
+
+class TestStreamingExtraction:
+    """Tests for streaming extraction with early download termination."""
+    
+    BASE_URL = "https://ru.wikipedia.org"
+    
+    @pytest.mark.parametrize("chunk_size", [256, 4096, 65536])
+    @pytest.mark.parametrize("fixture", sorted(p.name for p in FIXTURES_DIR.glob("*.html")))
+    def test_matches_buffered_extraction(self, fixture, chunk_size):
+        """Test streamed chunks produce the buffered result and stop early."""
+        body = (FIXTURES_DIR / fixture).read_bytes()
+        expected = lxml_extractor.extract_article(body.decode("utf-8"), self.BASE_URL)
+        
+        extractor = lxml_extractor.StreamingExtractor(self.BASE_URL)
+        consumed = 0
+        for offset in range(0, len(body), chunk_size):
+            consumed += chunk_size
+            if extractor.feed(body[offset:offset + chunk_size]):
+                break
+        
+        assert extractor.close() == expected
+        assert extractor.done
+        assert consumed < len(body) / 2
+    
+    def test_reads_to_end_when_limits_not_reached(self):
+        """Test short pages are parsed completely."""
+        html = (
+            '<h1 class="firstHeading">Short</h1><div id="mw-content-text">'
+            '<p>Only one paragraph here, but it is long enough to be kept.</p>'
+            '<a href="/wiki/One">One</a></div>'
+        )
+        
+        extractor = lxml_extractor.StreamingExtractor(self.BASE_URL)
+        extractor.feed(html.encode("utf-8"))
+        
+        assert extractor.close() == lxml_extractor.extract_article(html, self.BASE_URL)
+    
+    async def test_parse_article_streaming_saves_bytes(self, wikipedia_stub):
+        """Test streaming mode closes the download early and counts saved bytes."""
+        url = str(wikipedia_stub.make_url("/fixtures/ru_moscow.html"))
+        size = (FIXTURES_DIR / "ru_moscow.html").stat().st_size
+        
+        async with WikipediaParser(backend="bs4", streaming=False) as parser:
+            expected = await parser.parse_article(url)
+        
+        async with WikipediaParser(streaming=True) as parser:
+            result = await parser.parse_article(url)
+        
+        assert result == expected
+        assert parser.stats.pages_streamed == 1
+        assert parser.stats.pages_truncated == 1
+        assert parser.stats.bytes_read < size / 4
+        assert parser.stats.bytes_saved == size - parser.stats.bytes_read
+    
+    async def test_parse_article_streaming_counts_compressed_bytes(self, wikipedia_stub):
+        """Test a gzip-encoded page is decoded while streaming and the saving is measured in wire bytes."""
+        url = str(wikipedia_stub.make_url("/fixtures/ru_moscow.html"))
+        body = (FIXTURES_DIR / "ru_moscow.html").read_bytes()
+        wire_size = len(gzip.compress(body))
+        
+        async with WikipediaParser(backend="bs4", streaming=False) as parser:
+            expected = await parser.parse_article(url)
+        
+        wikipedia_stub.stub.gzip_fixtures = True
+        async with WikipediaParser(streaming=True) as parser:
+            result = await parser.parse_article(url)
+        
+        assert result == expected
+        assert parser.stats.pages_truncated == 1
+        assert 0 < parser.stats.bytes_read < wire_size
+        assert parser.stats.bytes_saved == wire_size - parser.stats.bytes_read
+
+
+class TestParseExecutor:
+    """Tests for parsing pages off the event loop."""
+    
+    @pytest.mark.parametrize("mode", ["thread", "process"])
+    @pytest.mark.parametrize("backend", ["bs4", "lxml"])
+    async def test_executor_matches_inline_parsing(self, wikipedia_stub, mode, backend):
+        """Test executor parsing returns the same tuple as parsing on the loop."""
+        url = str(wikipedia_stub.make_url("/fixtures/en_python.html"))
+        executor = create_parse_executor(mode, workers=2)
+        
+        try:
+            async with WikipediaParser(backend=backend, streaming=False) as parser:
+                expected = await parser.parse_article(url)
+            
+            async with WikipediaParser(backend=backend, streaming=False, executor=executor) as parser:
+                result = await parser.parse_article(url)
+        finally:
+            executor.shutdown()
+        
+        assert result == expected
+        assert result[0] == "Python (programming language)"
+    
+    def test_none_mode_has_no_executor(self):
+        """Test the default mode keeps parsing on the event loop."""
+        assert create_parse_executor("none") is None
+    
+    def test_unknown_mode(self):
+        """Test unknown executor mode is rejected."""
+        with pytest.raises(ValueError):
+            create_parse_executor("gpu")
\ No newline at end of file
@@ -1,7 +1,9 @@
 import pytest
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories.article_repository import ArticleRepository
+from app.repositories.unit_of_work import ArticleUnitOfWork
 from app.schemas import ArticleCreate
 
 
@@ -92,6 +94,15 @@ class TestArticleRepository:
         assert updated_article.summary == test_summary
         assert updated_article.summary_generated is True
     
+    async def test_update_summary_with_usage(self, repository, sample_article_data):
+        """Test a summary is stored with its prompt and completion tokens."""
+        article = await repository.create(sample_article_data)
+        
+        await repository.update_summary(article.id, "Summary", usage=(120, 30))
+        
+        updated_article = await repository.get_by_id(article.id)
+        assert (updated_article.summary_prompt_tokens, updated_article.summary_completion_tokens) == (120, 30)
+    
     async def test_get_root_articles_without_summary(self, repository):
         """Test getting root articles without summary."""
         root_data = ArticleCreate(
@@ -139,4 +150,153 @@ class TestArticleRepository:
         
         parent_with_children = await repository.get_by_id(parent_article.id)
         assert len(parent_with_children.children) == 1
-        assert parent_with_children.children[0].id == child_article.id 
\ No newline at end of file
+        assert parent_with_children.children[0].id == child_article.id 
+    
+    async def test_create_many_skips_existing_urls(self, repository, sample_article_data):
+        """Test bulk insert returns ids of new rows and ignores URL conflicts."""
+        existing = await repository.create(sample_article_data)
+        articles_data = [
+            ArticleCreate(url=f"https://en.wikipedia.org/wiki/Bulk_{i}", title=f"Bulk {i}", content="Bulk content.")
+            for i in range(3)
+        ]
+        articles_data.append(sample_article_data)
+        
+        created = await repository.create_many(articles_data)
+        
+        assert set(created) == {article_data.url for article_data in articles_data[:3]}
+        assert existing.id not in created.values()
+        stored = await repository.get_by_url("https://en.wikipedia.org/wiki/Bulk_1")
+        assert stored.id == created[stored.url]
+        assert stored.summary_generated is False
+        assert await repository.create_many([]) == {}
+    
+    async def test_get_ids_by_urls(self, repository, sample_article_data):
+        """Test a list of URLs resolves to ids of stored articles only."""
+        article = await repository.create(sample_article_data)
+        
+        ids = await repository.get_ids_by_urls([article.url, "https://en.wikipedia.org/wiki/Missing"])
+        
+        assert ids == {article.url: article.id}
+        assert await repository.get_ids_by_urls([]) == {}
+    
+    async def test_get_tree_in_one_query(self, repository, sample_article_data):
+        """Test a crawl tree is read by a single statement, parents before children, down to max_depth."""
+        root = await repository.create(sample_article_data)
+        parents = [root]
+        for depth in range(1, 4):
+            children = []
+            for parent in parents:
+                for i in range(2):
+                    children.append(await repository.create(ArticleCreate(
+                        url=f"{parent.url}_{i}",
+                        title=f"{parent.title} {i}",
+                        content="Child content",
+                        depth_level=depth,
+                        parent_id=parent.id
+                    )))
+            parents = children
+        statements = []
+        
+        def listener(conn, cursor, statement, *args):
+            """Record every statement sent to the database."""
+            statements.append(statement)
+        
+        event.listen(repository.session.bind.sync_engine, "before_cursor_execute", listener)
+        
+        try:
+            rows = await repository.get_tree(root.url, max_depth=2, include_content=False)
+        finally:
+            event.remove(repository.session.bind.sync_engine, "before_cursor_execute", listener)
+        
+        assert len(statements) == 1
+        assert [row.level for row in rows] == [0] + [1] * 2 + [2] * 4
+        assert rows[0].id == root.id
+        assert "content" not in rows[0]._fields
+        seen = set()
+        for row in rows:
+            assert row.level == 0 or row.parent_id in seen
+            seen.add(row.id)
+        assert len(await repository.get_tree(root.url, max_depth=5)) == 1 + 2 + 4 + 8
+        assert await repository.get_tree("https://en.wikipedia.org/wiki/Missing", max_depth=5) == []
+    
+    async def test_list_page_seeks_past_cursor(self, repository):
+        """Test pages continue after the cursor id, apply filters and select only the requested columns."""
+        for i in range(7):
+            await repository.create(ArticleCreate(
+                url=f"https://en.wikipedia.org/wiki/Page_{i}",
+                title=f"Page {i}",
+                content="Large content.",
+                depth_level=i % 2
+            ))
+        statements = []
+        
+        def listener(conn, cursor, statement, *args):
+            """Record every statement sent to the database."""
+            statements.append(statement)
+        
+        event.listen(repository.session.bind.sync_engine, "before_cursor_execute", listener)
+        try:
+            first = await repository.list_page(["id", "title"], limit=3)
+            second = await repository.list_page(["id", "title"], after_id=first[-1].id, limit=3)
+        finally:
+            event.remove(repository.session.bind.sync_engine, "before_cursor_execute", listener)
+        
+        assert [row.title for row in first + second] == [f"Page {i}" for i in range(6)]
+        assert first[0]._fields == ("id", "title")
+        assert all("content" not in statement for statement in statements)
+        odd = await repository.list_page(["id", "depth_level"], depth_level=1, limit=10)
+        assert [row.depth_level for row in odd] == [1, 1, 1]
+        assert await repository.list_page(["id"], summary_generated=True) == []
+
+
+class TestArticleUnitOfWork:
+    """Tests for ArticleUnitOfWork."""
+    
+    @pytest.fixture
+    def repository(self, db_session: AsyncSession):
+        """Create ArticleRepository with test session."""
+        return ArticleRepository(db_session)
+    
+    def article(self, name: str, depth: int = 0) -> ArticleCreate:
+        """Build article data for a page name."""
+        return ArticleCreate(
+            url=f"https://en.wikipedia.org/wiki/{name}",
+            title=name,
+            content=f"Content of {name}.",
+            depth_level=depth
+        )
+    
+    async def test_flush_resolves_parents_inside_one_batch(self, repository):
+        """Test a parent and its descendants buffered together are linked by id."""
+        unit_of_work = ArticleUnitOfWork(repository, batch_size=10)
+        unit_of_work.add(self.article("Root"))
+        unit_of_work.add(self.article("Child", 1), parent_url="https://en.wikipedia.org/wiki/Root")
+        unit_of_work.add(self.article("Grandchild", 2), parent_url="https://en.wikipedia.org/wiki/Child")
+        
+        assert await unit_of_work.flush() == 3
+        
+        root = await repository.get_by_url("https://en.wikipedia.org/wiki/Root")
+        child = await repository.get_by_url("https://en.wikipedia.org/wiki/Child")
+        grandchild = await repository.get_by_url("https://en.wikipedia.org/wiki/Grandchild")
+        assert child.parent_id == root.id
+        assert grandchild.parent_id == child.id
+        assert unit_of_work.flushes == 3
+    
+    async def test_flush_resolves_parents_across_batches(self, repository, sample_article_data):
+        """Test children flushed later find parents written earlier or by another writer."""
+        existing = await repository.create(ArticleCreate(**sample_article_data))
+        unit_of_work = ArticleUnitOfWork(repository, batch_size=2)
+        
+        assert unit_of_work.add(self.article("Root")) is False
+        assert unit_of_work.add(self.article("Other")) is True
+        await unit_of_work.flush()
+        unit_of_work.add(self.article("Child", 1), parent_url="https://en.wikipedia.org/wiki/Root")
+        unit_of_work.add(self.article("Adopted", 1), parent_url=existing.url)
+        await unit_of_work.flush()
+        
+        child = await repository.get_by_url("https://en.wikipedia.org/wiki/Child")
+        adopted = await repository.get_by_url("https://en.wikipedia.org/wiki/Adopted")
+        assert child.parent_id == unit_of_work.get_id("https://en.wikipedia.org/wiki/Root")
+        assert adopted.parent_id == existing.id
+        assert unit_of_work.inserted == 4
+        assert unit_of_work.pending == 0
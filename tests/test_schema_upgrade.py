@@ -0,0 +1,53 @@
+from sqlalchemy import inspect, text
+
+from app.upgrade_schema import upgrade_schema
+
+
+class TestSchemaUpgrade:
+    """Test upgrading a database created by the first release."""
+    
+    async def columns(self, engine, table_name):
+        """Names of the columns of a table."""
+        async with engine.connect() as conn:
+            return await conn.run_sync(lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns(table_name)})
+    
+    async def test_added_columns_are_created(self, baseline_engine):
+        """Test the upgrade adds the summary columns and keeps existing rows."""
+        async with baseline_engine.begin() as conn:
+            await conn.execute(text(
+                "INSERT INTO articles (url, title, content, depth_level, summary_generated) "
+                "VALUES ('https://ru.wikipedia.org/wiki/A', 'A', 'Текст', 0, 0)"
+            ))
+        
+        async with baseline_engine.begin() as conn:
+            await conn.run_sync(upgrade_schema)
+        
+        assert {"summary_prompt_tokens", "summary_completion_tokens", "summary_extractive"} <= await self.columns(baseline_engine, "articles")
+        async with baseline_engine.begin() as conn:
+            await conn.execute(text("UPDATE articles SET summary_prompt_tokens = 120, summary_completion_tokens = 30"))
+            row = (await conn.execute(text(
+                "SELECT title, summary_prompt_tokens, summary_completion_tokens, summary_extractive FROM articles"
+            ))).one()
+        assert tuple(row) == ("A", 120, 30, False)
+    
+    async def test_keyset_indexes_are_created(self, baseline_engine):
+        """Test the upgrade adds the indexes that tree and list pages are read by."""
+        async with baseline_engine.begin() as conn:
+            await conn.run_sync(upgrade_schema)
+            indexes = await conn.run_sync(lambda sync_conn: {
+                index["name"]: index["column_names"] for index in inspect(sync_conn).get_indexes("articles")
+            })
+        
+        assert indexes["ix_articles_parent_id_id"] == ["parent_id", "id"]
+        assert indexes["ix_articles_depth_level_id"] == ["depth_level", "id"]
+    
+    async def test_upgrade_is_repeatable(self, baseline_engine):
+        """Test running the upgrade on an upgraded database changes nothing."""
+        async with baseline_engine.begin() as conn:
+            await conn.run_sync(upgrade_schema)
+        columns = await self.columns(baseline_engine, "articles")
+        
+        async with baseline_engine.begin() as conn:
+            await conn.run_sync(upgrade_schema)
+        
+        assert await self.columns(baseline_engine, "articles") == columns
\ No newline at end of file
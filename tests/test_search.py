@@ -0,0 +1,115 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.index_search import index_missing
+from app.repositories.article_repository import ArticleRepository
+from app.schemas import ArticleCreate
+from app.services.article_service import ArticleService
+
+
+ARTICLES = [
+    ArticleCreate(
+        url="https://ru.wikipedia.org/wiki/Википедия",
+        title="Википедия",
+        content="Википедия — общедоступная многоязычная универсальная интернет-энциклопедия со свободным контентом."
+    ),
+    ArticleCreate(
+        url="https://ru.wikipedia.org/wiki/Энциклопедия",
+        title="Энциклопедия",
+        content="Энциклопедия — научное или научно-популярное справочное издание. Первые энциклопедии появились в Античности."
+    ),
+    ArticleCreate(
+        url="https://ru.wikipedia.org/wiki/Москва",
+        title="Москва",
+        content="Москва — столица России. В Москве расположены многие музеи и библиотеки."
+    ),
+]
+
+
+class TestArticleSearch:
+    """Test full-text search over the SQLite FTS5 index."""
+    
+    @pytest.fixture
+    def repository(self, db_session: AsyncSession):
+        """Create ArticleRepository with test session."""
+        return ArticleRepository(db_session)
+    
+    @pytest.fixture
+    def service(self, repository):
+        """Create ArticleService over the real repository."""
+        return ArticleService(repository, None, None)
+    
+    async def test_inflected_forms_match(self, repository):
+        """Test a query in one grammatical form finds the other forms."""
+        await repository.create_many(ARTICLES)
+        
+        hits = await repository.search("энциклопедии")
+        
+        assert {hit["title"] for hit in hits} == {"Википедия", "Энциклопедия"}
+        assert [hit["title"] for hit in await repository.search("москвы")] == ["Москва"]
+    
+    async def test_title_match_ranks_first_with_snippet(self, repository):
+        """Test an article whose title matches outranks a mention in the text and its snippet is highlighted."""
+        await repository.create_many(ARTICLES)
+        
+        hits = await repository.search("энциклопедия")
+        
+        assert hits[0]["title"] == "Энциклопедия"
+        assert hits[0]["rank"] > hits[1]["rank"]
+        assert "<b>" in hits[0]["snippet"]
+    
+    async def test_snippet_is_escaped(self, repository):
+        """Test markup in the article text reaches the snippet escaped while matches stay highlighted."""
+        await repository.create_many([ArticleCreate(
+            url="https://ru.wikipedia.org/wiki/Разметка",
+            title="Разметка",
+            content="Пример <script>alert(1)</script> & <b>ложная</b> Москва \ue000метка\ue001."
+        )])
+        
+        snippet = (await repository.search("москва"))[0]["snippet"]
+        
+        assert "&lt;script&gt;alert(1)&lt;/script&gt; &amp; &lt;b&gt;ложная&lt;/b&gt; <b>Москва</b> метка." in snippet
+        assert snippet.count("<b>") == 1
+    
+    async def test_no_words(self, repository):
+        """Test a query without words finds nothing instead of failing."""
+        await repository.create_many(ARTICLES)
+        
+        assert await repository.search("—") == []
+    
+    async def test_pages_follow_the_cursor(self, repository, service):
+        """Test keyset pages cover every hit once, in rank order."""
+        await repository.create_many([
+            ArticleCreate(url=f"https://ru.wikipedia.org/wiki/Город_{i}", title=f"Город {i}", content="Город " * (i + 1))
+            for i in range(7)
+        ])
+        
+        seen = []
+        cursor = None
+        while True:
+            page = await service.search_articles("город", cursor, limit=3)
+            seen.extend(hit.id for hit in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        
+        everything = await service.search_articles("город", limit=10)
+        assert seen == [hit.id for hit in everything.items]
+        assert len(seen) == 7
+    
+    async def test_invalid_cursor(self, service):
+        """Test a malformed cursor is rejected."""
+        with pytest.raises(ValueError):
+            await service.search_articles("город", cursor="abc")
+    
+    async def test_backfill_indexes_missing_articles(self, repository, db_session):
+        """Test articles stored without index entries are indexed once."""
+        await repository.create_many(ARTICLES)
+        await db_session.execute(text("INSERT INTO article_search_fts (article_search_fts) VALUES ('delete-all')"))
+        await db_session.commit()
+        assert await repository.search("москва") == []
+        
+        assert await index_missing(db_session.bind) == 3
+        assert await index_missing(db_session.bind) == 0
+        assert [hit["title"] for hit in await repository.search("москва")] == ["Москва"]
\ No newline at end of file
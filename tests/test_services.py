@@ -1,10 +1,12 @@
+import time
 import pytest
 from unittest.mock import AsyncMock, Mock, patch
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.article_service import ArticleService
 from app.repositories.article_repository import ArticleRepository
-from app.ai.summary_generator import SummaryGenerator
+from app.ai.rate_limiter import RateLimiter
+from app.ai.summary_generator import SummaryGenerator, TokenUsage
 from app.models import Article
 from app.schemas import ArticleCreate
 
@@ -38,6 +40,8 @@ class TestArticleService:
         article.depth_level = 0
         article.summary = None
         article.summary_generated = False
+        article.summary_prompt_tokens = None
+        article.summary_completion_tokens = None
         article.parent_id = None
         return article
     
@@ -97,9 +101,17 @@ class TestArticleService:
             "Test Title", "Test Content", ["https://en.wikipedia.org/wiki/Link1"]
         )
         
-        mock_repository.get_by_url.return_value = None
-        mock_repository.exists_by_url.return_value = False
-        mock_repository.create.return_value = sample_article
+        link = "https://en.wikipedia.org/wiki/Link1"
+        ids = {sample_article.url: sample_article.id, link: 2}
+        
+        mock_repository.get_by_url.side_effect = [None, None, sample_article]
+        mock_repository.get_ids_by_urls.return_value = {}
+        mock_repository.create_many.side_effect = lambda articles, commit=True: {
+            article.url: ids[article.url] for article in articles
+        }
+        mock_repository.add_links.side_effect = lambda links, commit=True: sum(map(len, links.values()))
+        mock_repository.session = AsyncMock()
+        mock_repository.get_content.return_value = "Test Content"
         mock_repository.update_summary.return_value = None
         
         mock_summary_generator.generate_summary.return_value = "Generated summary"
@@ -108,7 +120,14 @@ class TestArticleService:
             result = await article_service.parse_and_save_article(sample_article.url)
         
         assert result == sample_article
-        mock_repository.create.assert_called_once()
+        batches = [call.args[0] for call in mock_repository.create_many.call_args_list]
+        assert [[(article.url, article.parent_id) for article in batch] for batch in batches] == [
+            [(sample_article.url, None)],
+            [(link, sample_article.id)]
+        ]
+        mock_repository.add_links.assert_any_call({sample_article.id: [link]}, commit=False)
+        assert mock_repository.session.commit.await_count == len(batches)
+        mock_repository.create.assert_not_called()
         mock_summary_generator.generate_summary.assert_called_once()
     
     async def test_generate_pending_summaries(
@@ -116,12 +135,323 @@ class TestArticleService:
     ):
         """Test generating summaries for pending articles."""
         articles = [Mock(id=1, title="Test1", content="Content1")]
-        mock_repository.get_root_articles_without_summary.return_value = articles
-        mock_summary_generator.generate_summary.return_value = "Generated summary"
-        mock_repository.update_summary.return_value = None
         
-        count = await article_service.generate_pending_summaries()
+        async def iter_articles(batch_size):
+            for article in articles:
+                yield article
         
-        assert count == 1
-        mock_summary_generator.generate_summary.assert_called_once()
-        mock_repository.update_summary.assert_called_once_with(1, "Generated summary") 
\ No newline at end of file
+        mock_repository.iter_root_articles_without_summary = iter_articles
+        mock_summary_generator.summarize_article.return_value = (
+            "Generated summary", TokenUsage(prompt_tokens=120, completion_tokens=30, requests=1)
+        )
+        mock_repository.update_summaries.return_value = None
+        
+        stats = await article_service.generate_pending_summaries(mode="single")
+        
+        assert stats.generated == 1
+        assert stats.failed == 0
+        assert stats.prompt_tokens == 120
+        mock_summary_generator.summarize_article.assert_called_once()
+        mock_repository.update_summaries.assert_called_once_with({1: "Generated summary"}, {1: (120, 30)})
+
+
+class TestGeneratePendingSummaries:
+    """Tests for concurrent summary generation against a stub OpenAI server."""
+    
+    async def test_generates_all_summaries_concurrently(self, db_session, openai_stub):
+        """Test every root article gets a summary with bounded concurrency and batched updates."""
+        repository = ArticleRepository(db_session)
+        for i in range(30):
+            await repository.create(ArticleCreate(
+                url=f"https://en.wikipedia.org/wiki/Article_{i}",
+                title=f"Article {i}",
+                content=f"Article {i} content.",
+                depth_level=0
+            ))
+        openai_stub.stub.delay = 0.02
+        openai_stub.stub.errors = [429, 500]
+        generator = SummaryGenerator(
+            api_key="test-api-key",
+            base_url=str(openai_stub.make_url("/v1")),
+            rate_limiter=RateLimiter(),
+            retry_base_delay=0.01
+        )
+        
+        try:
+            stats = await ArticleService(repository, generator).generate_pending_summaries(concurrency=5, batch_size=10)
+        finally:
+            await generator.close()
+        
+        assert stats.generated == 30
+        assert stats.failed == 0
+        assert stats.retries == 2
+        assert stats.write_batches >= 3
+        assert 1 < openai_stub.stub.max_in_flight <= 5
+        assert await repository.get_root_articles_without_summary() == []
+        article = await repository.get_by_url("https://en.wikipedia.org/wiki/Article_7")
+        assert article.summary == "Summary of Article 7"
+        assert article.summary_generated
+        assert article.summary_prompt_tokens > 0
+        assert article.summary_completion_tokens == 10
+        assert stats.completion_tokens == 30 * 10
+    
+    async def test_batch_mode_packs_articles(self, db_session, openai_stub):
+        """Test batch mode sends several articles per request and stores every summary."""
+        repository = ArticleRepository(db_session)
+        for i in range(12):
+            await repository.create(ArticleCreate(
+                url=f"https://en.wikipedia.org/wiki/Article_{i}",
+                title=f"Article {i}",
+                content=f"Article {i} content.",
+                depth_level=0
+            ))
+        generator = SummaryGenerator(
+            api_key="test-api-key",
+            base_url=str(openai_stub.make_url("/v1")),
+            rate_limiter=RateLimiter(),
+            batch_max_articles=5
+        )
+        
+        try:
+            stats = await ArticleService(repository, generator).generate_pending_summaries(batch_size=20, mode="batch")
+        finally:
+            await generator.close()
+        
+        assert stats.generated == 12
+        assert openai_stub.stub.batch_sizes == [5, 5, 2]
+        assert await repository.get_root_articles_without_summary() == []
+    
+    async def test_offline_export_and_import(self, db_session, openai_stub, tmp_path):
+        """Test pending articles go out as a request file and come back from a results file."""
+        repository = ArticleRepository(db_session)
+        for i in range(7):
+            await repository.create(ArticleCreate(
+                url=f"https://en.wikipedia.org/wiki/Article_{i}",
+                title=f"Article {i}",
+                content=f"Article {i} content.",
+                depth_level=0
+            ))
+        service = ArticleService(repository, SummaryGenerator(api_key="test-api-key", batch_max_articles=3))
+        requests_path = tmp_path / "requests.jsonl"
+        results_path = tmp_path / "results.jsonl"
+        
+        assert await service.export_summary_requests(str(requests_path), batch_size=4) == 7
+        openai_stub.stub.process_batch(requests_path, results_path)
+        assert await service.import_summary_results(str(results_path), batch_size=4) == 7
+        
+        assert openai_stub.stub.batch_sizes == [3, 1, 3]
+        assert await repository.get_root_articles_without_summary() == []
+        article = await repository.get_by_url("https://en.wikipedia.org/wiki/Article_5")
+        assert article.summary == "Summary of Article 5"
+    
+    async def test_auto_engine_stores_extractive_fallback(self, db_session, openai_stub):
+        """Test summaries the API cannot deliver in time are extracted locally and marked in the record."""
+        repository = ArticleRepository(db_session)
+        for i in range(6):
+            await repository.create(ArticleCreate(
+                url=f"https://en.wikipedia.org/wiki/Article_{i}",
+                title=f"Article {i}",
+                content=f"Article {i} is about topic number {i}. It has a second sentence about topic {i}.",
+                depth_level=0
+            ))
+        openai_stub.stub.delay = 1.0
+        generator = SummaryGenerator(
+            api_key="test-api-key",
+            base_url=str(openai_stub.make_url("/v1")),
+            rate_limiter=RateLimiter(),
+            latency_budget=0.05
+        )
+        
+        try:
+            stats = await ArticleService(repository, generator).generate_pending_summaries(engine="auto")
+        finally:
+            await generator.close()
+        
+        assert stats.generated == 6
+        assert stats.extractive == 6
+        article = await repository.get_by_url("https://en.wikipedia.org/wiki/Article_3")
+        assert article.summary == "Article 3 is about topic number 3. It has a second sentence about topic 3."
+        assert article.summary_extractive
+        assert (await ArticleService(repository, generator).get_article_summary(article.url)).summary_extractive
+    
+    async def test_batch_mode_falls_back_for_failed_pack(self, db_session, openai_stub):
+        """Test a pack that fails in auto mode is summarized locally instead of counted as failed."""
+        repository = ArticleRepository(db_session)
+        for i in range(4):
+            await repository.create(ArticleCreate(
+                url=f"https://en.wikipedia.org/wiki/Article_{i}",
+                title=f"Article {i}",
+                content=f"Article {i} is about topic number {i}.",
+                depth_level=0
+            ))
+        openai_stub.stub.errors = [400]
+        generator = SummaryGenerator(
+            api_key="test-api-key",
+            base_url=str(openai_stub.make_url("/v1")),
+            rate_limiter=RateLimiter(),
+            batch_max_articles=2
+        )
+        
+        try:
+            stats = await ArticleService(repository, generator).generate_pending_summaries(mode="batch", engine="auto")
+        finally:
+            await generator.close()
+        
+        assert stats.generated == 4
+        assert stats.extractive == 2
+        articles = [await repository.get_by_url(f"https://en.wikipedia.org/wiki/Article_{i}") for i in range(4)]
+        assert sorted(article.summary_extractive for article in articles) == [False, False, True, True]
+
+
+class TestStreamArticleSummary:
+    """Tests for streaming an article summary as service events."""
+    
+    @pytest.fixture
+    async def service(self, db_session, openai_stub):
+        """Service over the test database with a generator pointed at the stub."""
+        repository = ArticleRepository(db_session)
+        await repository.create(ArticleCreate(
+            url="https://en.wikipedia.org/wiki/Python",
+            title="Python programming language",
+            content="Python is a programming language.",
+            depth_level=0
+        ))
+        generator = SummaryGenerator(
+            api_key="test-api-key",
+            base_url=str(openai_stub.make_url("/v1")),
+            rate_limiter=RateLimiter()
+        )
+        yield ArticleService(repository, generator)
+        await generator.close()
+    
+    async def test_tokens_then_done_and_saved(self, service, openai_stub):
+        """Test tokens arrive before the whole generation ends and the summary is stored."""
+        openai_stub.stub.stream_delay = 0.05
+        started = time.perf_counter()
+        first_token = None
+        events = []
+        
+        async for event, data in await service.stream_article_summary("https://en.wikipedia.org/wiki/Python"):
+            if first_token is None:
+                first_token = time.perf_counter() - started
+            events.append((event, data))
+        total = time.perf_counter() - started
+        
+        assert [event for event, _ in events[:-1]] == ["token"] * (len(events) - 1)
+        assert "".join(data["text"] for _, data in events[:-1]) == "Summary of Python programming language"
+        assert events[-1] == ("done", {"summary": "Summary of Python programming language"})
+        assert first_token < total / 2
+        article = await service.article_repository.get_by_url("https://en.wikipedia.org/wiki/Python")
+        assert article.summary == "Summary of Python programming language"
+        assert article.summary_generated
+        assert article.summary_prompt_tokens > 0
+        assert article.summary_completion_tokens == 10
+    
+    async def test_stored_summary_is_one_event(self, service, openai_stub):
+        """Test an article that already has a summary is answered without a request."""
+        [event async for event in await service.stream_article_summary("https://en.wikipedia.org/wiki/Python")]
+        
+        events = [event async for event in await service.stream_article_summary("https://en.wikipedia.org/wiki/Python")]
+        
+        assert events == [("summary", {"summary": "Summary of Python programming language"})]
+        assert openai_stub.stub.requests == 1
+    
+    async def test_unknown_article(self, service):
+        """Test no stream is returned for an article that is not stored."""
+        assert await service.stream_article_summary("https://en.wikipedia.org/wiki/Missing") is None
+    
+    async def test_error_event(self, service, openai_stub):
+        """Test a failed generation ends the stream with an error event."""
+        openai_stub.stub.errors = [400]
+        
+        events = [event async for event in await service.stream_article_summary("https://en.wikipedia.org/wiki/Python")]
+        
+        assert [event for event, _ in events] == ["error"]
+
+
+class TestArticleTree:
+    """Tests for reading a whole crawl tree as nested articles."""
+    
+    async def test_tree_is_nested(self, db_session):
+        """Test every stored descendant ends up under its parent, with content only on request."""
+        repository = ArticleRepository(db_session)
+        root = await repository.create(ArticleCreate(
+            url="https://en.wikipedia.org/wiki/Root", title="Root", content="Root content.", depth_level=0
+        ))
+        parents = [root]
+        for depth in range(1, 3):
+            children = []
+            for parent in parents:
+                for i in range(3):
+                    children.append(await repository.create(ArticleCreate(
+                        url=f"{parent.url}_{i}",
+                        title=f"{parent.title} {i}",
+                        content=f"{parent.title} {i} content.",
+                        depth_level=depth,
+                        parent_id=parent.id
+                    )))
+            parents = children
+        service = ArticleService(repository, Mock())
+        
+        tree = await service.get_article_tree(root.url)
+        
+        assert tree.id == root.id
+        assert tree.content is None
+        assert [child.title for child in tree.children] == ["Root 0", "Root 1", "Root 2"]
+        assert [grandchild.title for grandchild in tree.children[1].children] == ["Root 1 0", "Root 1 1", "Root 1 2"]
+        assert all(not grandchild.children for child in tree.children for grandchild in child.children)
+        
+        shallow = await service.get_article_tree(root.url, max_depth=1, include_content=True)
+        assert shallow.content == "Root content."
+        assert shallow.children[0].content == "Root 0 content."
+        assert all(not child.children for child in shallow.children)
+        assert await service.get_article_tree("https://en.wikipedia.org/wiki/Missing") is None
+
+
+class TestListArticles:
+    """Tests for listing articles page by page."""
+    
+    async def test_pages_cover_all_articles(self, db_session):
+        """Test following next_cursor visits every matching article once and stops on the last page."""
+        repository = ArticleRepository(db_session)
+        for i in range(10):
+            await repository.create(ArticleCreate(
+                url=f"https://en.wikipedia.org/wiki/Page_{i}", title=f"Page {i}", content="Content.", depth_level=0
+            ))
+        service = ArticleService(repository, Mock())
+        
+        titles = []
+        cursor = None
+        pages = 0
+        while True:
+            page = await service.list_articles(["title"], cursor=cursor, limit=4)
+            titles.extend(item.title for item in page.items)
+            pages += 1
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+        
+        assert titles == [f"Page {i}" for i in range(10)]
+        assert pages == 3
+        assert page.items[0].model_fields_set == {"id", "title"}
+    
+    async def test_exact_last_page_has_no_cursor(self, db_session):
+        """Test a page that ends exactly at the last article reports no next page."""
+        repository = ArticleRepository(db_session)
+        for i in range(4):
+            await repository.create(ArticleCreate(
+                url=f"https://en.wikipedia.org/wiki/Page_{i}", title=f"Page {i}", content="Content.", depth_level=0
+            ))
+        
+        page = await ArticleService(repository, Mock()).list_articles(limit=4)
+        
+        assert len(page.items) == 4
+        assert page.next_cursor is None
+        assert page.items[0].content is None
+    
+    async def test_unknown_field(self, db_session):
+        """Test a field that is not an article column is rejected."""
+        service = ArticleService(ArticleRepository(db_session), Mock())
+        
+        with pytest.raises(ValueError, match="password"):
+            await service.list_articles(["title", "password"])
\ No newline at end of file